@@ -5,12 +5,19 @@ This module contains the entry point for the Mega Tic Tac Toe game.
 import asyncio
 import argparse
 from src.main_menu import main_menu
+from src.agent.choose_agent import get_agents
+from src.agent.numpy_q_network import export_model
+from src.tournament.league import LeagueResult, run_league
+from src.tournament.tournament import DEFAULT_OPENING_MOVES, TournamentResult, run_tournament
 
 def main() -> None:
     """
     The main function that starts the Mega Tic Tac Toe game and parses the command-line arguments:
-    - test if the game is to be opened in test mode. 
+    - test if the game is to be opened in test mode.
     Test mode enables all moves and doesn't switch players.
+    - tournament to play games between two bots without the console game instead.
+    - league to rate all trained models in a round-robin instead.
+    - export to export the Q-Networks of trained models for NumPy inference instead.
     """
 
     parser: argparse.ArgumentParser = \
@@ -23,7 +30,68 @@ def main() -> None:
                             "This will allow you to play anywhere" +
                             "on the board and not to switch players.")
 
+    subparsers = parser.add_subparsers(dest="command")
+    tournament: argparse.ArgumentParser = \
+        subparsers.add_parser("tournament", help="Play games between two bots headlessly.")
+
+    tournament.add_argument("bot_a",
+                            help="The first bot: random, ai:<model> or mcts[:<budget>].")
+    tournament.add_argument("bot_b",
+                            help="The second bot: random, ai:<model> or mcts[:<budget>].")
+    tournament.add_argument("-n", "--games", type=int, default=100,
+                            help="The number of games, the bots alternate colours.")
+    tournament.add_argument("-w", "--workers", type=int, default=1,
+                            help="The number of worker processes.")
+    tournament.add_argument("--seed", type=int, default=None,
+                            help="The seed of the random choices.")
+    tournament.add_argument("--openings", type=int, default=DEFAULT_OPENING_MOVES,
+                            help="The number of random moves opening every game.")
+
+    league: argparse.ArgumentParser = \
+        subparsers.add_parser("league", help="Rate all trained models in a round-robin.")
+
+    league.add_argument("-n", "--games", type=int, default=100,
+                        help="The number of games of every pairing.")
+    league.add_argument("-w", "--workers", type=int, default=1,
+                        help="The number of worker processes.")
+    league.add_argument("--seed", type=int, default=None,
+                        help="The seed of the random choices.")
+    league.add_argument("--openings", type=int, default=DEFAULT_OPENING_MOVES,
+                        help="The number of random moves opening every game.")
+
+    export: argparse.ArgumentParser = \
+        subparsers.add_parser("export", help="Export Q-Networks for NumPy inference.")
+
+    export.add_argument("models", nargs="*",
+                        help="The names of the models, all trained models if none are given.")
+
     args: argparse.Namespace = parser.parse_args()
+
+    if args.command == "export":
+        for model in args.models or get_agents():
+            print(f"Exported {model} to {export_model(model)}")
+        return
+
+    if args.command == "league":
+        league_result: LeagueResult = run_league(args.games, args.workers, args.seed,
+                                                 opening_moves=args.openings)
+
+        print(league_result.report())
+        print("Best trainers for O:", ", ".join(league_result.top_models("x_")))
+        print("Best trainers for X:", ", ".join(league_result.top_models("o_")))
+        return
+
+    if args.command == "tournament":
+        try:
+            result: TournamentResult = \
+                run_tournament(args.bot_a, args.bot_b, args.games, args.workers, args.seed,
+                               args.openings)
+        except ValueError as e:
+            parser.error(str(e))
+
+        print(result.report())
+        return
+
     asyncio.run(main_menu(args))
 
 if __name__ == "__main__":
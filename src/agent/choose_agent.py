@@ -3,7 +3,7 @@ This module contains functions for choosing a trained AI agent.
 """
 
 import os
-from .training import MODELS_PATH
+from .models_path import MODELS_PATH
 from ..utils import cond_input_or_quit
 
 def get_agents(prefix: str = "") -> list[str]:
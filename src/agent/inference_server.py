@@ -0,0 +1,119 @@
+"""
+This module contains InferenceServer, an asyncio service which batches the moves of AIPlayers.
+Games running concurrently in one event loop await the Q-values of their positions from
+the server, which gathers the pending requests of every model and evaluates them in a single
+forward pass once a batch is full or the oldest request has waited long enough.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+import numpy as np
+from numpy.typing import NDArray
+
+if TYPE_CHECKING:
+    from src.players.ai_player import AIPlayer
+
+@dataclass
+class _Request:
+    """
+    A pending request.
+
+    Attributes:
+        observation (NDArray[np.int8]): The flat observation of the position.
+        future (asyncio.Future[NDArray[np.float32]]): The future of the position's Q-values.
+    """
+    observation: NDArray[np.int8]
+    future: "asyncio.Future[NDArray[np.float32]]"
+
+class InferenceServer:
+    """
+    Batches the Q-value requests of AIPlayers by model. A batch is evaluated when it has
+    max_batch_size requests or max_wait seconds after its first request.
+    """
+    def __init__(self, max_batch_size: int = 64, max_wait: float = 0.001):
+        """
+        Initializes the InferenceServer.
+
+        Args:
+            max_batch_size (int, optional): The most requests evaluated at once. Defaults to 64.
+            max_wait (float, optional): The most seconds a request waits for others.
+                Defaults to 0.001.
+        """
+        self.max_batch_size: int = max_batch_size
+        self.max_wait: float = max_wait
+
+        self.batches: int = 0
+        self.requests: int = 0
+
+        self._players: dict[tuple[str, str], "AIPlayer"] = {}
+        self._pending: dict[tuple[str, str], list[_Request]] = {}
+        self._timers: dict[tuple[str, str], asyncio.TimerHandle] = {}
+
+    @property
+    def mean_batch_size(self) -> float:
+        """The mean number of requests of the evaluated batches."""
+        return self.requests / self.batches if self.batches else 0.0
+
+    async def get_q_values(self,
+                           player: "AIPlayer",
+                           observation: NDArray[np.int8]) -> NDArray[np.float32]:
+        """
+        Evaluates the Q-values of an AI player's position, batched with the other requests
+        for its model.
+
+        Args:
+            player (AIPlayer): The player.
+            observation (NDArray[np.int8]): The flat observation of the position,
+                which must not be changed until the Q-values are evaluated.
+
+        Returns:
+            NDArray[np.float32]: The Q-value of every flat action, shape (81,).
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        key: tuple[str, str] = player.model_path, player.backend
+        future: asyncio.Future[NDArray[np.float32]] = loop.create_future()
+
+        pending: list[_Request] = self._pending.setdefault(key, [])
+        pending.append(_Request(observation, future))
+        self._players.setdefault(key, player)
+
+        if len(pending) >= self.max_batch_size:
+            self._flush(key)
+        elif len(pending) == 1:
+            self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+
+        return await future
+
+    def _flush(self, key: tuple[str, str]) -> None:
+        """
+        Evaluates the pending requests for a model in one batch.
+
+        Args:
+            key (tuple[str, str]): The model path and backend of the requests.
+        """
+        timer: asyncio.TimerHandle | None = self._timers.pop(key, None)
+
+        if timer is not None:
+            timer.cancel()
+
+        requests: list[_Request] = self._pending.pop(key, [])
+
+        if not requests:
+            return
+
+        try:
+            q_values: NDArray[np.float32] = self._players[key].q_values(
+                np.stack([request.observation for request in requests]))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.requests += len(requests)
+
+        for index, request in enumerate(requests):
+            if not request.future.done():
+                request.future.set_result(q_values[index])
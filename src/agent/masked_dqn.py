@@ -0,0 +1,209 @@
+"""
+This module contains MaskedDQN, a Deep Q-Network which only ever chooses legal moves
+and bootstraps its targets from legal moves only.
+The legal moves are read from the flat observations of TicTacToeEnv and TicTacToeVecEnv.
+"""
+
+from typing import Any
+import numpy as np
+from numpy.typing import NDArray
+import torch as th
+from torch.nn import functional as F
+from stable_baselines3 import DQN
+from stable_baselines3.common.type_aliases import PyTorchObs
+from stable_baselines3.dqn.policies import DQNPolicy, QNetwork
+from src.agent.observation import ACTION_MASK, BIG_BOARD, BOARD, NEXT, OBSERVATION_SIZE
+from src.tictactoe.batch_board import ACTION_CELLS
+
+_CELL_SMALLS: NDArray[np.intp] = np.arange(81) // 9
+
+def observation_action_masks(observations: th.Tensor) -> th.Tensor:
+    """
+    Finds the legal actions of flat observations. Observations which end with
+    an action mask (see TicTacToeEnv's mask_observation) use it directly.
+
+    Args:
+        observations (th.Tensor): The observations, shape (N, OBSERVATION_SIZE) or
+            (N, MASKED_OBSERVATION_SIZE) with the action mask.
+
+    Returns:
+        th.Tensor: The legal action masks in flat action order, shape (N, 81).
+    """
+    if observations.shape[1] > OBSERVATION_SIZE:
+        return observations[:, ACTION_MASK] > 0
+
+    big_board: th.Tensor = observations[:, BIG_BOARD]
+    cells: th.Tensor = observations[:, BOARD]
+    next_board: th.Tensor = observations[:, NEXT]
+
+    next_small: th.Tensor = 3 * next_board[:, 1:] + next_board[:, :1]
+    playable: th.Tensor = (big_board == 0) & ((next_board[:, :1] < 0) | (
+        th.arange(9, device=observations.device) == next_small))
+
+    legal: th.Tensor = (cells == 0) & playable[:, _CELL_SMALLS]
+    return legal[:, ACTION_CELLS]
+
+def max_legal_q_values(q_values: th.Tensor, observations: th.Tensor) -> th.Tensor:
+    """
+    Finds the highest Q-values of the legal actions of flat observations.
+
+    Args:
+        q_values (th.Tensor): The Q-values of all actions, shape (N, 81).
+        observations (th.Tensor): The observations the Q-values were evaluated for.
+
+    Returns:
+        th.Tensor: The highest legal Q-values, 0 for observations without legal actions,
+            shape (N,).
+    """
+    masks: th.Tensor = observation_action_masks(observations)
+    max_q_values: th.Tensor = q_values.masked_fill(~masks, -th.inf).max(dim=1)[0]
+
+    # Finished games have no legal actions, and a -inf value would turn their target into NaN
+    return th.where(masks.any(dim=1), max_q_values, th.zeros_like(max_q_values))
+
+class MaskedQNetwork(QNetwork):
+    """A Q-Network which sets the Q-values of illegal actions to -inf before choosing one."""
+    def _predict(self, observation: PyTorchObs, deterministic: bool = True) -> th.Tensor:
+        """
+        Chooses the legal actions with the highest Q-values.
+
+        Args:
+            observation (PyTorchObs): The flat observations.
+            deterministic (bool, optional): Unused, the choice is always greedy.
+
+        Returns:
+            th.Tensor: The actions.
+        """
+        assert isinstance(observation, th.Tensor), "The observations must be flat"
+
+        q_values: th.Tensor = self(observation)
+        q_values = q_values.masked_fill(~observation_action_masks(observation), -th.inf)
+
+        return q_values.argmax(dim=1).reshape(-1)
+
+class MaskedDQNPolicy(DQNPolicy):
+    """A DQN policy with MaskedQNetworks."""
+    def make_q_net(self) -> MaskedQNetwork:
+        """
+        Creates a Q-Network with its own features extractor.
+
+        Returns:
+            MaskedQNetwork: The Q-Network.
+        """
+        net_args: dict[str, Any] = self._update_features_extractor(self.net_args,
+                                                                   features_extractor=None)
+        return MaskedQNetwork(**net_args).to(self.device)
+
+class MaskedDQN(DQN):
+    """
+    A DQN which chooses only legal actions, both greedily and when exploring,
+    so no training episodes are lost to illegal moves. The TD targets take the highest
+    Q-value of the next state's legal actions, as the illegal ones are never played or trained.
+    """
+    policy_aliases = {"MlpPolicy": MaskedDQNPolicy}
+
+    def _random_actions(self, observation: NDArray) -> NDArray[np.intp]:
+        """
+        Chooses random legal actions.
+
+        Args:
+            observation (NDArray): The flat observations, shape (N, size).
+
+        Returns:
+            NDArray[np.intp]: The actions, shape (N,).
+        """
+        masks: NDArray[np.bool_] = observation_action_masks(th.as_tensor(observation)).numpy()
+        return np.argmax(np.random.random(masks.shape) * masks, axis=1)
+
+    def predict(self,
+                observation: NDArray | dict[str, NDArray],
+                state: tuple[NDArray, ...] | None = None,
+                episode_start: NDArray | None = None,
+                deterministic: bool = False) -> tuple[NDArray, tuple[NDArray, ...] | None]:
+        """
+        Chooses actions with epsilon-greedy exploration among the legal actions.
+
+        Args:
+            observation (NDArray | dict[str, NDArray]): A flat observation or a batch of them,
+                the dict of other observation spaces being unsupported.
+            state (tuple[NDArray, ...] | None, optional): Unused, for recurrent policies.
+            episode_start (NDArray | None, optional): Unused, for recurrent policies.
+            deterministic (bool, optional): Whether to never explore. Defaults to False.
+
+        Returns:
+            tuple[NDArray, tuple[NDArray, ...] | None]: The actions and the unchanged state.
+        """
+        if deterministic or np.random.rand() >= self.exploration_rate:
+            return self.policy.predict(observation, state, episode_start, deterministic)
+
+        assert isinstance(observation, np.ndarray), "The observations must be flat"
+
+        if self.policy.is_vectorized_observation(observation):
+            return self._random_actions(observation), state
+
+        return self._random_actions(observation.reshape(1, -1))[0], state
+
+    def _sample_action(self,
+                       learning_starts: int,
+                       action_noise: Any = None,
+                       n_envs: int = 1) -> tuple[NDArray, NDArray]:
+        """
+        Chooses the actions to play while training, at random during the warm-up.
+
+        Args:
+            learning_starts (int): The number of warm-up steps before learning.
+            action_noise (Any, optional): Unused, for continuous actions.
+            n_envs (int, optional): The number of environments. Defaults to 1.
+
+        Returns:
+            tuple[NDArray, NDArray]: The actions to play and to store in the replay buffer.
+        """
+        assert isinstance(self._last_obs, np.ndarray), "The observations must be flat"
+
+        action: NDArray = self._random_actions(self._last_obs) \
+            if self.num_timesteps < learning_starts \
+            else self.predict(self._last_obs, deterministic=False)[0]
+
+        return action, action
+
+    def train(self, gradient_steps: int, batch_size: int = 100) -> None:
+        """
+        Trains the Q-Network on batches from the replay buffer, as DQN does,
+        but with the TD targets bootstrapped from the legal next actions.
+
+        Args:
+            gradient_steps (int): The number of gradient steps.
+            batch_size (int, optional): The size of the batches. Defaults to 100.
+        """
+        self.policy.set_training_mode(True)
+        self._update_learning_rate(self.policy.optimizer)
+
+        assert self.replay_buffer is not None, "The replay buffer must be set up to train"
+
+        losses: list[float] = []
+
+        for _ in range(gradient_steps):
+            replay_data = self.replay_buffer.sample(batch_size, env=self._vec_normalize_env)
+
+            with th.no_grad():
+                next_q_values: th.Tensor = max_legal_q_values(
+                    self.q_net_target(replay_data.next_observations),
+                    replay_data.next_observations).reshape(-1, 1)
+                target_q_values: th.Tensor = replay_data.rewards + \
+                    (1 - replay_data.dones) * self.gamma * next_q_values
+
+            current_q_values: th.Tensor = th.gather(self.q_net(replay_data.observations),
+                                                    dim=1, index=replay_data.actions.long())
+
+            loss: th.Tensor = F.smooth_l1_loss(current_q_values, target_q_values)
+            losses.append(loss.item())
+
+            self.policy.optimizer.zero_grad()
+            loss.backward()
+            th.nn.utils.clip_grad_norm_(self.policy.parameters(), self.max_grad_norm)
+            self.policy.optimizer.step()
+
+        self._n_updates += gradient_steps
+
+        self.logger.record("train/n_updates", self._n_updates, exclude="tensorboard")
+        self.logger.record("train/loss", np.mean(losses))
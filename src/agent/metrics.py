@@ -0,0 +1,160 @@
+"""
+This module contains ThroughputCallback, which measures where the training time goes:
+environment steps per second, the shares of the time spent in the environment's step,
+in the opponents' turns and in gradient updates, the episode length and the illegal move rate.
+"""
+
+import csv
+import json
+import os
+import time
+from dataclasses import replace
+from typing import Any
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.vec_env import VecEnv
+from src.agent.tictactoe_env import EnvTimers
+from src.agent.tictactoe_vec_env import TicTacToeVecEnv
+
+def env_timers(env: VecEnv) -> EnvTimers:
+    """
+    Adds up the timers of all environments of a vectorized environment.
+
+    Args:
+        env (VecEnv): The environment, a TicTacToeVecEnv or a vectorized set of TicTacToeEnvs,
+            either possibly wrapped.
+
+    Returns:
+        EnvTimers: The total counters and timers.
+    """
+    if isinstance(env.unwrapped, TicTacToeVecEnv):
+        return replace(env.unwrapped.timers)
+
+    total: EnvTimers = EnvTimers()
+
+    for timers in env.get_attr("timers"):
+        total += timers
+
+    return total
+
+class ThroughputCallback(BaseCallback):
+    """
+    Appends training throughput metrics to a CSV or JSON Lines file (chosen by its extension)
+    every log_interval timesteps and at the end of training. The metrics are also recorded
+    to the model's logger.
+
+    Every row covers the time since the previous one. The env step and opponent shares are
+    measured inside the environments, so with worker processes they are the shares of
+    the workers' time rather than of the wall time and can add up to more than 1.
+    """
+    def __init__(self, path: str, log_interval: int = 10000, verbose: int = 0):
+        """
+        Initializes the ThroughputCallback.
+
+        Args:
+            path (str): The path of the metrics file, ending with ".csv" or ".jsonl".
+            log_interval (int, optional): The number of timesteps between rows.
+                Defaults to 10000.
+            verbose (int, optional): The verbosity level. Defaults to 0.
+        """
+        super().__init__(verbose)
+
+        self.path: str = path
+        self.log_interval: int = log_interval
+
+        self._timers: EnvTimers = EnvTimers()
+        self._time: float = 0.0
+        self._timesteps: int = 0
+        self._train_time: float = 0.0
+        self._rollout_end: float | None = None
+
+    def _on_training_start(self) -> None:
+        """Starts measuring from the current state of the environments."""
+        self._timers = env_timers(self.training_env)
+        self._time = time.perf_counter()
+        self._timesteps = self.num_timesteps
+        self._train_time = 0.0
+        self._rollout_end = None
+
+    def _on_rollout_start(self) -> None:
+        """Adds the time since the end of the last rollout, spent in gradient updates."""
+        if self._rollout_end is not None:
+            self._train_time += time.perf_counter() - self._rollout_end
+            self._rollout_end = None
+
+    def _on_rollout_end(self) -> None:
+        """Starts timing the gradient updates which follow the rollout."""
+        self._rollout_end = time.perf_counter()
+
+    def _on_step(self) -> bool:
+        """
+        Writes a row if one is due.
+
+        Returns:
+            bool: True, training always continues.
+        """
+        if self.num_timesteps - self._timesteps >= self.log_interval:
+            self._write_row()
+
+        return True
+
+    def _on_training_end(self) -> None:
+        """Writes a row for the last timesteps."""
+        self._on_rollout_start()
+
+        if self.num_timesteps > self._timesteps:
+            self._write_row()
+
+    def _write_row(self) -> None:
+        """Writes the metrics since the last row and starts the next one."""
+        now: float = time.perf_counter()
+        timers: EnvTimers = env_timers(self.training_env)
+        change: EnvTimers = timers - self._timers
+        elapsed: float = max(now - self._time, 1e-9)
+
+        row: dict[str, Any] = {
+            "timesteps": self.num_timesteps,
+            "steps_per_second": change.steps / elapsed,
+            "env_step_share": change.step_time / elapsed,
+            "opponent_share": change.opponent_time / elapsed,
+            "train_share": self._train_time / elapsed,
+            "episode_length": change.episode_steps / change.episodes if change.episodes else 0.0,
+            "illegal_move_rate": change.illegal_moves / change.steps if change.steps else 0.0
+        }
+
+        for key, value in row.items():
+            if key != "timesteps":
+                self.logger.record(f"throughput/{key}", value)
+
+        self._append(row)
+
+        self._timers = timers
+        self._time = now
+        self._timesteps = self.num_timesteps
+        self._train_time = 0.0
+
+    def _append(self, row: dict[str, Any]) -> None:
+        """
+        Appends a row to the metrics file, starting CSV files with a header.
+
+        Args:
+            row (dict[str, Any]): The metrics.
+        """
+        directory: str = os.path.dirname(self.path)
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if self.path.endswith(".jsonl"):
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(row) + "\n")
+            return
+
+        new_file: bool = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+
+        with open(self.path, "a", newline="", encoding="utf-8") as file:
+            writer: csv.DictWriter = csv.DictWriter(file, fieldnames=list(row))
+
+            if new_file:
+                writer.writeheader()
+
+            writer.writerow(row)
@@ -0,0 +1,215 @@
+"""
+This module contains ModelRegistry, a process-wide cache of the trained models used by AIPlayers.
+A model is loaded once, on first use, and shared by every AIPlayer playing with it.
+The least recently used models are evicted when their parameters take more memory than a cap,
+and a model is reloaded if its file has changed since it was loaded.
+
+Models are DQNs saved as ".zip" files or their Q-Networks exported as ".npz" files
+(see numpy_q_network.py). Torch and Stable Baselines 3 are only imported to load DQNs.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from src.agent.numpy_q_network import NumpyQNetwork
+
+if TYPE_CHECKING:
+    from stable_baselines3 import DQN
+
+DEFAULT_MEMORY_CAP: int = 512 * 1024 * 1024
+"""The default memory cap of the registry, in bytes."""
+
+@dataclass
+class _Entry:
+    """
+    A loaded model.
+
+    Attributes:
+        model (DQN | NumpyQNetwork): The model.
+        mtime (float): The modification time of the model's file when it was loaded.
+        size (int): The bytes taken by the model's parameters.
+    """
+    model: "DQN | NumpyQNetwork"
+    mtime: float
+    size: int
+
+def model_size(model: "DQN | NumpyQNetwork") -> int:
+    """
+    Finds the memory taken by a model's parameters. A DQN has a Q-Network
+    and a target network, a NumpyQNetwork only the Q-Network.
+
+    Args:
+        model (DQN | NumpyQNetwork): The model.
+
+    Returns:
+        int: The size in bytes.
+    """
+    if isinstance(model, NumpyQNetwork):
+        return model.nbytes
+
+    return sum(parameter.numel() * parameter.element_size()
+               for parameter in model.policy.parameters())
+
+def _key(path: str) -> str:
+    """
+    Gets the key of a model in the registry, the normalized path of its file.
+
+    Args:
+        path (str): The path of the model. Paths without an extension are ".zip" files.
+
+    Returns:
+        str: The key.
+    """
+    return os.path.normpath(path if path.endswith((".zip", ".npz")) else f"{path}.zip")
+
+def _load(path: str) -> "DQN | NumpyQNetwork":
+    """
+    Loads a model from its file.
+
+    Args:
+        path (str): The path of the file, ending with ".zip" or ".npz".
+
+    Returns:
+        DQN | NumpyQNetwork: The model.
+    """
+    if path.endswith(".npz"):
+        return NumpyQNetwork.load(path)
+
+    from stable_baselines3 import DQN  # pylint: disable=import-outside-toplevel
+    return DQN.load(path)
+
+class ModelRegistry:
+    """
+    A cache of loaded models by the paths of their files, with LRU eviction under a memory cap.
+    The most recently used model is always kept, even if it alone exceeds the cap.
+    """
+    def __init__(self, memory_cap: int = DEFAULT_MEMORY_CAP):
+        """
+        Initializes the ModelRegistry.
+
+        Args:
+            memory_cap (int, optional): The bytes the loaded models' parameters may take.
+                Defaults to DEFAULT_MEMORY_CAP.
+        """
+        self.memory_cap: int = memory_cap
+        self.loads: int = 0
+
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def memory(self) -> int:
+        """The bytes taken by the loaded models' parameters."""
+        return sum(entry.size for entry in self._entries.values())
+
+    def __contains__(self, path: str) -> bool:
+        """Checks whether the model of a path is loaded."""
+        return _key(path) in self._entries
+
+    def __len__(self) -> int:
+        """The number of loaded models."""
+        return len(self._entries)
+
+    def get(self, path: str) -> "DQN | NumpyQNetwork":
+        """
+        Gets a model, loading it if it isn't loaded or its file has changed.
+
+        Args:
+            path (str): The path of the model. Paths without an extension are ".zip" files.
+
+        Returns:
+            DQN | NumpyQNetwork: The model, a NumpyQNetwork for ".npz" files.
+
+        Raises:
+            FileNotFoundError: If the model isn't loaded and its file doesn't exist.
+        """
+        key: str = _key(path)
+
+        # A loaded model whose file was removed is still used
+        try:
+            mtime: float | None = os.stat(key).st_mtime
+        except FileNotFoundError:
+            mtime = None
+
+        with self._lock:
+            entry: _Entry | None = self._entries.get(key)
+
+            if entry is None or mtime not in (None, entry.mtime):
+                model: DQN | NumpyQNetwork = _load(key)
+                entry = _Entry(model, os.path.getmtime(key), model_size(model))
+
+                self._entries[key] = entry
+                self.loads += 1
+
+            self._entries.move_to_end(key)
+            self._evict()
+
+            return entry.model
+
+    def get_dqn(self, path: str) -> "DQN":
+        """
+        Gets a DQN, loading it if it isn't loaded or its file has changed.
+
+        Args:
+            path (str): The path of the model. Paths without an extension are ".zip" files.
+
+        Returns:
+            DQN: The model.
+
+        Raises:
+            FileNotFoundError: If the model isn't loaded and its file doesn't exist.
+            TypeError: If the path is an exported Q-Network.
+        """
+        model: DQN | NumpyQNetwork = self.get(path)
+
+        if isinstance(model, NumpyQNetwork):
+            raise TypeError(f"{path} is not a DQN!")
+
+        return model
+
+    def get_network(self, path: str) -> NumpyQNetwork:
+        """
+        Gets an exported Q-Network, loading it if it isn't loaded or its file has changed.
+
+        Args:
+            path (str): The path of the ".npz" file.
+
+        Returns:
+            NumpyQNetwork: The Q-Network.
+
+        Raises:
+            FileNotFoundError: If the Q-Network isn't loaded and its file doesn't exist.
+            TypeError: If the path isn't a ".npz" file.
+        """
+        network: DQN | NumpyQNetwork = self.get(path)
+
+        if not isinstance(network, NumpyQNetwork):
+            raise TypeError(f"{path} is not an exported Q-Network!")
+
+        return network
+
+    def set_memory_cap(self, memory_cap: int) -> None:
+        """
+        Changes the memory cap, evicting models if they take more memory.
+
+        Args:
+            memory_cap (int): The bytes the loaded models' parameters may take.
+        """
+        with self._lock:
+            self.memory_cap = memory_cap
+            self._evict()
+
+    def clear(self) -> None:
+        """Evicts all models."""
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self) -> None:
+        """Evicts the least recently used models until the others fit in the memory cap."""
+        while len(self._entries) > 1 and self.memory > self.memory_cap:
+            self._entries.popitem(last=False)
+
+MODEL_REGISTRY: ModelRegistry = ModelRegistry()
+"""The registry shared by the AIPlayers of the process."""
@@ -5,4 +5,6 @@ Attributes:
     MODELS_PATH (str): The relative path to the models directory.
 """
 
-MODELS_PATH = "src\\agent\\models"
+import os.path
+
+MODELS_PATH = os.path.join("src", "agent", "models")
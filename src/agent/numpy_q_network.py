@@ -0,0 +1,168 @@
+"""
+This module contains NumpyQNetwork, the Q-Network of a trained DQN evaluated with NumPy.
+The weights are exported from a saved model into a compact ".npz" file next to it,
+so AIPlayers can choose moves in microseconds without torch or Stable Baselines 3.
+"""
+
+import os
+from typing import TYPE_CHECKING, Any, Callable
+import numpy as np
+from numpy.typing import NDArray
+from src.agent.models_path import MODELS_PATH
+
+if TYPE_CHECKING:
+    from stable_baselines3 import DQN
+
+ACTIVATIONS: dict[str, Callable[[NDArray[np.float32]], NDArray[np.float32]]] = {
+    "ReLU": lambda x: np.maximum(x, 0, out=x),
+    "Tanh": lambda x: np.tanh(x, out=x)
+}
+"""The supported activation functions by the names of their torch modules."""
+
+def export_path(model_path: str) -> str:
+    """
+    Gets the path of a model's exported Q-Network.
+
+    Args:
+        model_path (str): The path of the model, with or without the ".zip" extension.
+
+    Returns:
+        str: The path of the ".npz" file.
+    """
+    return f"{model_path.removesuffix('.zip')}.npz"
+
+def is_exported(model_path: str) -> bool:
+    """
+    Checks whether a model's Q-Network is exported and the export is not older than the model.
+
+    Args:
+        model_path (str): The path of the model, with or without the ".zip" extension.
+
+    Returns:
+        bool: True if the export can be used, False otherwise.
+    """
+    npz_path: str = export_path(model_path)
+    zip_path: str = f"{model_path.removesuffix('.zip')}.zip"
+
+    return os.path.exists(npz_path) and \
+        (not os.path.exists(zip_path) or os.path.getmtime(npz_path) >= os.path.getmtime(zip_path))
+
+def export_q_network(model: "DQN", path: str) -> None:
+    """
+    Saves the weights of a DQN's Q-Network into a ".npz" file.
+
+    Args:
+        model (DQN): The model.
+        path (str): The path of the file.
+
+    Raises:
+        ValueError: If the Q-Network has a layer which can't be exported.
+    """
+    # Exporting loads a DQN, so torch is already imported
+    from torch import nn  # pylint: disable=import-outside-toplevel
+
+    # Any values, as savez's keyword arguments include allow_pickle
+    arrays: dict[str, Any] = {}
+    activations: list[str] = []
+
+    for layer in model.q_net.q_net:
+        name: str = type(layer).__name__
+
+        if isinstance(layer, nn.Linear):
+            index: int = len(arrays) // 2
+            arrays[f"weight_{index}"] = \
+                np.ascontiguousarray(layer.weight.detach().cpu().numpy().T, dtype=np.float32)
+            arrays[f"bias_{index}"] = layer.bias.detach().cpu().numpy().astype(np.float32)
+        elif name in ACTIVATIONS:
+            activations.append(name)
+        else:
+            raise ValueError(f"The layer {name} can't be exported!")
+
+    np.savez(path, activations=np.array(activations), **arrays)
+
+def export_model(model_name: str) -> str:
+    """
+    Exports the Q-Network of a saved model next to it.
+
+    Args:
+        model_name (str): The name of the model in the models directory.
+
+    Returns:
+        str: The path of the ".npz" file.
+    """
+    # Only exporting needs torch and Stable Baselines 3
+    from stable_baselines3 import DQN  # pylint: disable=import-outside-toplevel
+
+    model_path: str = os.path.join(MODELS_PATH, model_name)
+    path: str = export_path(model_path)
+
+    export_q_network(DQN.load(model_path), path)
+    return path
+
+class NumpyQNetwork:
+    """
+    A Q-Network of alternating linear layers and activations, evaluated with NumPy.
+    """
+    def __init__(self, weights: list[NDArray[np.float32]],
+                 biases: list[NDArray[np.float32]],
+                 activations: list[str]):
+        """
+        Initializes the NumpyQNetwork.
+
+        Args:
+            weights (list[NDArray[np.float32]]): The weights of the linear layers,
+                shape (inputs, outputs).
+            biases (list[NDArray[np.float32]]): The biases of the linear layers.
+            activations (list[str]): The activation after every linear layer but the last.
+        """
+        self.weights: list[NDArray[np.float32]] = weights
+        self.biases: list[NDArray[np.float32]] = biases
+        self.activations: list[str] = activations
+
+    @classmethod
+    def load(cls, path: str) -> "NumpyQNetwork":
+        """
+        Loads a Q-Network exported by export_q_network.
+
+        Args:
+            path (str): The path of the ".npz" file.
+
+        Returns:
+            NumpyQNetwork: The Q-Network.
+        """
+        with np.load(path) as data:
+            layers: int = (len(data.files) - 1) // 2
+            activations: NDArray[np.str_] = np.asarray(data["activations"], dtype=np.str_)
+
+            return cls([data[f"weight_{i}"] for i in range(layers)],
+                       [data[f"bias_{i}"] for i in range(layers)],
+                       [str(name) for name in activations])
+
+    @property
+    def observation_shape(self) -> tuple[int, ...]:
+        """The shape of an observation."""
+        return self.weights[0].shape[:1]
+
+    @property
+    def nbytes(self) -> int:
+        """The bytes taken by the weights and biases."""
+        return sum(array.nbytes for array in self.weights + self.biases)
+
+    def q_values(self, observations: NDArray) -> NDArray[np.float32]:
+        """
+        Evaluates the Q-values of all actions in a batch of observations.
+
+        Args:
+            observations (NDArray): The flat observations, shape (N, observation size).
+
+        Returns:
+            NDArray[np.float32]: The Q-value of every action, shape (N, actions).
+        """
+        x: NDArray[np.float32] = observations.astype(np.float32) @ self.weights[0]
+        x += self.biases[0]
+
+        for activation, weight, bias in zip(self.activations, self.weights[1:], self.biases[1:]):
+            x = ACTIVATIONS[activation](x) @ weight
+            x += bias
+
+        return x
@@ -0,0 +1,110 @@
+"""
+This module defines the flat int8 observation of a Mega Tic Tac Toe position, shared by
+TicTacToeEnv, TicTacToeVecEnv and AIPlayer. An observation is laid out as:
+    - BIG_BOARD: the 9 big board cells in [big y, big x] order
+    - BOARD: the 81 cells in [big y, big x, small y, small x] order
+    - NEXT: the (x, y) of the small board to play on, (-1, -1) for any
+    - ACTION_MASK (optional): 1 for the legal flat actions, 0 for the others
+
+Observations are written in place into preallocated buffers. The 81 flat actions of the
+models are numbered 9 * (3 * big y + small y) + 3 * big x + small x.
+"""
+
+import numpy as np
+from numpy.typing import NDArray
+from gymnasium import spaces
+from src.tictactoe.batch_board import BatchBoard
+from src.tictactoe.board import Board
+
+OBSERVATION_SIZE: int = 92
+"""The size of an observation without the action mask."""
+
+MASKED_OBSERVATION_SIZE: int = OBSERVATION_SIZE + 81
+"""The size of an observation with the action mask."""
+
+BIG_BOARD: slice = slice(0, 9)
+BOARD: slice = slice(9, 90)
+NEXT: slice = slice(90, 92)
+ACTION_MASK: slice = slice(OBSERVATION_SIZE, MASKED_OBSERVATION_SIZE)
+
+def action_coordinates(action: int) -> tuple[int, int, int, int]:
+    """
+    Converts a flat coordinate (0 - 80) to board coordinates (big x, big y, small x, small y).
+
+    Args:
+        action (int): The flat action coordinate.
+
+    Returns:
+        tuple[int, int, int, int]: The board coordinates.
+    """
+    return (action % 9) // 3, (action // 9) // 3, action % 3, (action // 9) % 3
+
+def coordinates_action(big_x: int, big_y: int, small_x: int, small_y: int) -> int:
+    """
+    Converts board coordinates to a flat coordinate (0 - 80), the inverse of action_coordinates.
+
+    Args:
+        big_x (int): The big board x-coordinate.
+        big_y (int): The big board y-coordinate.
+        small_x (int): The small board x-coordinate.
+        small_y (int): The small board y-coordinate.
+
+    Returns:
+        int: The flat action coordinate.
+    """
+    return 9 * (3 * big_y + small_y) + 3 * big_x + small_x
+
+def observation_space(mask_observation: bool = False) -> spaces.Box:
+    """
+    Creates the space of the observations.
+
+    Args:
+        mask_observation (bool, optional): Whether the observations end with the action mask.
+            Defaults to False.
+
+    Returns:
+        spaces.Box: The observation space.
+    """
+    mask_size: int = 81 if mask_observation else 0
+
+    # The board's high bound of 1 (not 2) is the one models were trained with,
+    # so it is kept for the spaces of loaded models to match
+    return spaces.Box(low=np.array([-1] * OBSERVATION_SIZE + [0] * mask_size),
+                      high=np.array([2] * 9 + [1] * 81 + [2] * 2 + [1] * mask_size),
+                      shape=(OBSERVATION_SIZE + mask_size,),
+                      dtype=np.int8)
+
+def write_observation(out: NDArray[np.int8], board: Board, next_board: tuple[int, int]) -> None:
+    """
+    Writes the observation of a position into a buffer.
+
+    Args:
+        out (NDArray[np.int8]): The buffer, of OBSERVATION_SIZE or MASKED_OBSERVATION_SIZE.
+        board (Board): The game board.
+        next_board (tuple[int, int]): The small board to play on.
+    """
+    out[BIG_BOARD] = board.big_board.reshape(9)
+    out[BOARD] = board.board.reshape(81)
+    out[NEXT] = next_board
+
+    if out.shape[0] > OBSERVATION_SIZE:
+        out[ACTION_MASK] = board.legal_action_mask(next_board)
+
+def write_batch_observations(out: NDArray[np.int8],
+                             batch: BatchBoard,
+                             masks: NDArray[np.bool_] | None = None) -> None:
+    """
+    Writes the observations of all games of a batch into a buffer.
+
+    Args:
+        out (NDArray[np.int8]): The buffer, shape (N, OBSERVATION_SIZE or MASKED_OBSERVATION_SIZE).
+        batch (BatchBoard): The games.
+        masks (NDArray[np.bool_] | None, optional): The legal action masks of the games,
+            found from the batch if the buffer has room for them and they are not given.
+    """
+    out[:, BIG_BOARD] = batch.big_boards.reshape(batch.count, 9)
+    out[:, BOARD] = batch.boards.reshape(batch.count, 81)
+    out[:, NEXT] = batch.next_boards
+
+    if out.shape[1] > OBSERVATION_SIZE:
+        out[:, ACTION_MASK] = batch.legal_action_masks() if masks is None else masks
@@ -0,0 +1,204 @@
+"""
+This module contains PackedReplayBuffer, a DQN replay buffer which stores observations in
+the packed position encoding (see encoding.py) and decodes them when sampling.
+"""
+
+from typing import Any
+import numpy as np
+from numpy.typing import NDArray
+import torch as th
+from gymnasium import spaces
+from stable_baselines3.common.buffers import ReplayBuffer
+from stable_baselines3.common.type_aliases import ReplayBufferSamples
+from stable_baselines3.common.vec_env import VecNormalize
+from src.agent.masked_dqn import observation_action_masks
+from src.agent.observation import ACTION_MASK, BIG_BOARD, BOARD, NEXT, OBSERVATION_SIZE, \
+    MASKED_OBSERVATION_SIZE
+from src.tictactoe.encoding import POSITION_BYTES, pack_positions, unpack_positions
+
+def pack_observations(observations: NDArray[np.int8]) -> NDArray[np.uint8]:
+    """
+    Packs flat observations. The action masks, if any, are left out.
+
+    Args:
+        observations (NDArray[np.int8]): The observations, shape (N, observation size).
+
+    Returns:
+        NDArray[np.uint8]: The packed positions, shape (N, POSITION_BYTES).
+    """
+    count: int = observations.shape[0]
+
+    return pack_positions(observations[:, BOARD].reshape(count, 3, 3, 3, 3),
+                          observations[:, BIG_BOARD],
+                          observations[:, NEXT],
+                          np.ones(count, dtype=np.int8))
+
+def unpack_observations(packed: NDArray[np.uint8], size: int) -> NDArray[np.int8]:
+    """
+    Unpacks flat observations, recalculating the action masks if they are included.
+
+    Args:
+        packed (NDArray[np.uint8]): The packed positions, shape (N, POSITION_BYTES).
+        size (int): The observation size, OBSERVATION_SIZE or MASKED_OBSERVATION_SIZE.
+
+    Returns:
+        NDArray[np.int8]: The observations, shape (N, size).
+    """
+    count: int = packed.shape[0]
+    boards, big_boards, next_boards, _ = unpack_positions(packed)
+
+    observations: NDArray[np.int8] = np.empty((count, size), dtype=np.int8)
+    observations[:, BIG_BOARD] = big_boards.reshape(count, 9)
+    observations[:, BOARD] = boards.reshape(count, 81)
+    observations[:, NEXT] = next_boards
+
+    if size > OBSERVATION_SIZE:
+        observations[:, ACTION_MASK] = \
+            observation_action_masks(th.as_tensor(observations[:, :OBSERVATION_SIZE])).numpy()
+
+    return observations
+
+class PackedReplayBuffer(ReplayBuffer):
+    """
+    A replay buffer for the flat Mega Tic Tac Toe observations. A transition takes
+    2 * POSITION_BYTES bytes for the observations, one byte for the action and
+    6 bytes for the reward and flags - about a quarter of SB3's ReplayBuffer.
+    """
+    def __init__(self,
+                 buffer_size: int,
+                 observation_space: spaces.Space,
+                 action_space: spaces.Space,
+                 device: th.device | str = "auto",
+                 n_envs: int = 1,
+                 optimize_memory_usage: bool = False,
+                 handle_timeout_termination: bool = True):
+        """
+        Initializes the buffer. The arguments are the ones of ReplayBuffer.
+
+        Args:
+            buffer_size (int): The maximum number of transitions, shared by all environments.
+            observation_space (spaces.Space): The flat observation space.
+            action_space (spaces.Space): The flat action space.
+            device (th.device | str, optional): The device of the sampled tensors.
+                Defaults to "auto".
+            n_envs (int, optional): The number of environments. Defaults to 1.
+            optimize_memory_usage (bool, optional): Unused, the next observations are always
+                stored as they are already small. Defaults to False.
+            handle_timeout_termination (bool, optional): Whether truncated episodes are
+                not treated as finished. Defaults to True.
+
+        Raises:
+            ValueError: If the observation space is not a flat Mega Tic Tac Toe observation.
+        """
+        if observation_space.shape not in ((OBSERVATION_SIZE,), (MASKED_OBSERVATION_SIZE,)):
+            raise ValueError(f"Unsupported observation space {observation_space}!")
+
+        # ReplayBuffer's own arrays are skipped, only BaseBuffer is initialized
+        super(ReplayBuffer, self).__init__(buffer_size, observation_space, action_space,
+                                           device, n_envs=n_envs)
+
+        self.buffer_size = max(buffer_size // n_envs, 1)
+        self.optimize_memory_usage = False
+        self.handle_timeout_termination = handle_timeout_termination
+
+        self.observations = np.zeros((self.buffer_size, n_envs, POSITION_BYTES), dtype=np.uint8)
+        self.next_observations = np.zeros_like(self.observations)
+        self.actions = np.zeros((self.buffer_size, n_envs, 1), dtype=np.uint8)
+        self.rewards = np.zeros((self.buffer_size, n_envs), dtype=np.float32)
+        self.dones = np.zeros((self.buffer_size, n_envs), dtype=np.bool_)
+        self.timeouts = np.zeros((self.buffer_size, n_envs), dtype=np.bool_)
+
+    def add(self,
+            obs: NDArray,
+            next_obs: NDArray,
+            action: NDArray,
+            reward: NDArray,
+            done: NDArray,
+            infos: list[dict[str, Any]]) -> None:
+        """
+        Adds a transition of every environment.
+
+        Args:
+            obs (NDArray): The observations, shape (n_envs, observation size).
+            next_obs (NDArray): The next observations.
+            action (NDArray): The actions.
+            reward (NDArray): The rewards.
+            done (NDArray): Whether the episodes have ended.
+            infos (list[dict[str, Any]]): The infos of the environments.
+        """
+        self.observations[self.pos] = pack_observations(obs.reshape(self.n_envs, -1))
+        self.next_observations[self.pos] = pack_observations(next_obs.reshape(self.n_envs, -1))
+        self.actions[self.pos] = np.asarray(action).reshape(self.n_envs, 1)
+        self.rewards[self.pos] = reward
+        self.dones[self.pos] = done
+
+        if self.handle_timeout_termination:
+            self.timeouts[self.pos] = [info.get("TimeLimit.truncated", False) for info in infos]
+
+        self.pos += 1
+
+        if self.pos == self.buffer_size:
+            self.full = True
+            self.pos = 0
+
+    def _get_samples(self,
+                     batch_inds: NDArray,
+                     env: VecNormalize | None = None) -> ReplayBufferSamples:
+        """
+        Decodes the transitions at the given indexes, each from a random environment.
+
+        Args:
+            batch_inds (NDArray): The indexes of the transitions.
+            env (VecNormalize | None, optional): Unused, the observations are not normalized.
+
+        Returns:
+            ReplayBufferSamples: The observations, actions, next observations, dones and rewards.
+        """
+        env_indices: NDArray = np.random.randint(0, high=self.n_envs, size=(len(batch_inds),))
+        size: int = self.obs_shape[0]
+
+        data: tuple[NDArray, ...] = (
+            unpack_observations(self.observations[batch_inds, env_indices], size),
+            self.actions[batch_inds, env_indices].astype(np.int64),
+            unpack_observations(self.next_observations[batch_inds, env_indices], size),
+            (self.dones[batch_inds, env_indices] & ~self.timeouts[batch_inds, env_indices])
+                .astype(np.float32).reshape(-1, 1),
+            self.rewards[batch_inds, env_indices].reshape(-1, 1)
+        )
+
+        return ReplayBufferSamples(*tuple(map(self.to_torch, data)))
+
+    def resize_envs(self, n_envs: int) -> None:
+        """
+        Regroups the stored transitions for another number of environments, such as when
+        training is resumed with other workers. The transitions are sampled independently,
+        so they are kept in order of age, the newest if fewer fit.
+
+        Args:
+            n_envs (int): The new number of environments.
+        """
+        if n_envs == self.n_envs:
+            return
+
+        rows: int = self.buffer_size if self.full else self.pos
+        oldest: int = self.pos if self.full else 0
+        order: NDArray[np.intp] = (np.arange(rows) + oldest) % self.buffer_size
+
+        buffer_size: int = max(self.buffer_size * self.n_envs // n_envs, 1)
+        kept: int = min(rows * self.n_envs // n_envs, buffer_size)
+
+        for name in ("observations", "next_observations", "actions",
+                     "rewards", "dones", "timeouts"):
+            stored: NDArray = getattr(self, name)[order]
+            item_shape: tuple[int, ...] = stored.shape[2:]
+            transitions: NDArray = stored.reshape((rows * self.n_envs, *item_shape))
+
+            resized: NDArray = np.zeros((buffer_size, n_envs, *item_shape), dtype=stored.dtype)
+            resized[:kept] = transitions[len(transitions) - kept * n_envs:] \
+                .reshape((kept, n_envs, *item_shape))
+            setattr(self, name, resized)
+
+        self.buffer_size = buffer_size
+        self.n_envs = n_envs
+        self.full = kept == buffer_size
+        self.pos = kept % buffer_size
@@ -0,0 +1,167 @@
+"""
+This module contains PredictionCache, a bounded LRU cache of the Q-values an AIPlayer's model
+gave to positions, keyed by the positions' Zobrist keys. The AIPlayers of a model with the same
+cache size share a cache, which is cleared when the model's file changes.
+"""
+
+import os
+from collections import OrderedDict
+import numpy as np
+from numpy.typing import NDArray
+from src.tictactoe.board import Board
+from src.tictactoe.zobrist import NEXT_KEYS
+
+DEFAULT_CACHE_SIZE: int = 10000
+"""The default number of positions in a cache, about 5 MB."""
+
+def position_key(board: Board, next_board: tuple[int, int]) -> int:
+    """
+    Gets the key of a position as the models see it: the marks and the small board to play on.
+
+    Args:
+        board (Board): The game board.
+        next_board (tuple[int, int]): The small board to play on.
+
+    Returns:
+        int: The 64 bit Zobrist key.
+    """
+    return board.zobrist_key ^ NEXT_KEYS[next_board]
+
+class PredictionCache:
+    """
+    A bounded LRU cache of Q-value vectors by position key, counting its hits and misses.
+    """
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Initializes the PredictionCache.
+
+        Args:
+            max_size (int, optional): The most positions kept. Defaults to DEFAULT_CACHE_SIZE.
+        """
+        self.max_size: int = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._entries: OrderedDict[int, NDArray[np.float32]] = OrderedDict()
+        self._mtime: float | None = None
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of the lookups which were hits."""
+        lookups: int = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        """The number of cached positions."""
+        return len(self._entries)
+
+    def __str__(self) -> str:
+        """Describes the cache's statistics."""
+        return f"{len(self)}/{self.max_size} positions, {self.hits} hits, " + \
+            f"{self.misses} misses ({self.hit_rate:.1%} hit rate)"
+
+    def validate(self, mtime: float) -> None:
+        """
+        Clears the cache if the model's file has changed since the Q-values were cached.
+
+        Args:
+            mtime (float): The current modification time of the model's file.
+        """
+        if mtime != self._mtime:
+            self._entries.clear()
+            self._mtime = mtime
+
+    def get(self, key: int) -> NDArray[np.float32] | None:
+        """
+        Gets the cached Q-values of a position.
+
+        Args:
+            key (int): The position key.
+
+        Returns:
+            NDArray[np.float32] | None: The read-only Q-values, None if they aren't cached.
+        """
+        q_values: NDArray[np.float32] | None = self._entries.get(key)
+
+        if q_values is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+
+        return q_values
+
+    def put(self, key: int, q_values: NDArray[np.float32]) -> None:
+        """
+        Caches the Q-values of a position, evicting the least recently used position if full.
+
+        Args:
+            key (int): The position key.
+            q_values (NDArray[np.float32]): The Q-values, copied into the cache.
+        """
+        if self.max_size <= 0:
+            return
+
+        cached: NDArray[np.float32] = np.array(q_values, dtype=np.float32)
+        cached.flags.writeable = False
+
+        self._entries[key] = cached
+        self._entries.move_to_end(key)
+
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Removes all positions and resets the statistics."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+_CACHES: dict[tuple[str, int], PredictionCache] = {}
+
+def get_prediction_cache(path: str, max_size: int = DEFAULT_CACHE_SIZE) -> PredictionCache:
+    """
+    Gets the cache shared by the AIPlayers of a model file with the same cache size,
+    creating it on first use.
+
+    Args:
+        path (str): The path of the model's file.
+        max_size (int, optional): The most positions kept by the cache.
+            Defaults to DEFAULT_CACHE_SIZE.
+
+    Returns:
+        PredictionCache: The cache.
+    """
+    key: tuple[str, int] = os.path.normpath(path), max_size
+
+    if key not in _CACHES:
+        _CACHES[key] = PredictionCache(max_size)
+
+    return _CACHES[key]
+
+def cache_lookups() -> tuple[int, int]:
+    """
+    Counts the lookups of all the prediction caches of the process.
+
+    Returns:
+        tuple[int, int]: The hits and misses.
+    """
+    return sum(cache.hits for cache in _CACHES.values()), \
+        sum(cache.misses for cache in _CACHES.values())
+
+def describe_lookups(hits: int, misses: int) -> str:
+    """
+    Describes prediction cache lookups for the tournament and league reports.
+
+    Args:
+        hits (int): The hits.
+        misses (int): The misses.
+
+    Returns:
+        str: The description.
+    """
+    lookups: int = hits + misses
+    rate: float = hits / lookups if lookups else 0.0
+
+    return f"Prediction cache: {hits} hits, {misses} misses ({rate:.1%} hit rate)"
@@ -4,101 +4,190 @@ a custom OpenAI Gym environment for the Mega Tic Tac Toe game,
 used for training agents.
 """
 
-import random
-from typing import NewType
+import time
+from dataclasses import astuple, dataclass
 import numpy as np
+from numpy.typing import NDArray
 import gymnasium as gym
 from gymnasium import spaces
+from src.agent.observation import action_coordinates, observation_space, write_observation
+from src.players.ai_player import AIPlayer
 from src.players.bot_player import BotPlayer
 from src.players.random_player import RandomPlayer
 from src.tictactoe.game import Game
 
-Observation = NewType("Observation", dict[str, np.ndarray | tuple[int, int]])
-
-def action_coordinates(action: int) -> tuple[int, int, int, int]:
+@dataclass
+class EnvTimers:
+    """
+    Cumulative counters and timers of an environment, used to measure training throughput.
+
+    Attributes:
+        steps (int): The number of agent moves.
+        step_time (float): The seconds spent in step, opponent turns included.
+        opponent_time (float): The seconds spent choosing the opponents' turns.
+        episodes (int): The number of finished episodes.
+        episode_steps (int): The number of agent moves in the finished episodes.
+        illegal_moves (int): The number of illegal agent moves.
     """
-    Converts a flat coordinate (0 - 80) to board coordinates (big x, big y, small x, small y).
+    steps: int = 0
+    step_time: float = 0.0
+    opponent_time: float = 0.0
+    episodes: int = 0
+    episode_steps: int = 0
+    illegal_moves: int = 0
 
-    Args:
-        action (int): The flat action coordinate.
+    def __add__(self, other: "EnvTimers") -> "EnvTimers":
+        """Adds up the counters of two environments."""
+        return EnvTimers(*(mine + theirs for mine, theirs in zip(astuple(self), astuple(other))))
 
-    Returns:
-        tuple[int, int, int, int]: The board coordinates.
-    """
-    return (action % 9) // 3, (action // 9) // 3, action % 3, (action // 9) % 3
+    def __sub__(self, other: "EnvTimers") -> "EnvTimers":
+        """Finds the change of the counters since an earlier copy."""
+        return EnvTimers(*(mine - theirs for mine, theirs in zip(astuple(self), astuple(other))))
 
 class TicTacToeEnv(gym.Env):
     """
     Custom OpenAI Gym environment for the Mega Tic Tac Toe game.
+    Observations are flat int8 arrays (see observation.py) written alternately into two buffers,
+    so an observation returned by reset or step stays valid through the next step (or reset)
+    and is overwritten by the one after it. Copy observations to keep them longer.
     """
-    def __init__(self, opponents: list[BotPlayer] | None = None, train_x: bool = False):
+    def __init__(self,
+                 opponents: list[BotPlayer] | None = None,
+                 train_x: bool = False,
+                 mask_observation: bool = False):
         """
         Initializes the TicTacToeEnv.
 
         Args:
             opponents (list[BotPlayer]): List of opponent bot players to train with.
             train_x (bool): Whether to train as the X player.
+            mask_observation (bool, optional): Whether the observation includes the legal action
+                mask, which is always in the info. Defaults to False.
         """
         super().__init__()
 
         self.action_space: gym.Space = spaces.Discrete(81)
 
-        self.observation_space: gym.Space = spaces.Dict({
-            "board": spaces.Box(low=-1, high=1, shape=(3,3,3,3), dtype=np.int8),
-            "big_board": spaces.Box(low=-1, high=2, shape=(3,3), dtype=np.int8),
-            "next": spaces.Box(low=-1, high=2, shape=(2,), dtype=np.int8)
-        })
+        self.observation_space: spaces.Box = observation_space(mask_observation)
 
         self.opponents: list[BotPlayer] = opponents if opponents is not None else [RandomPlayer()]
         self.train_x: bool = train_x
+        self.mask_observation: bool = mask_observation
+        self.timers: EnvTimers = EnvTimers()
+        self._episode_steps: int = 0
+
+        # Observations alternate between two buffers, so the previous observation is still
+        # valid next to the current one, including the terminal observation after a reset
+        self._buffers: NDArray[np.int8] = \
+            np.zeros((2, *self.observation_space.shape), dtype=np.int8)
+        self._buffer_index: int = 0
+        self._observation: NDArray[np.int8] = self._buffers[0]
 
         self.reset()
 
-    def _get_obs(self) -> Observation:
+    def _get_obs(self) -> NDArray[np.int8]:
+        """
+        Writes the current observation of the game into the other buffer:
+        the big board, the board, the small board coordinates of the next turn
+        and, if enabled, the legal action mask.
+
+        Returns:
+            NDArray[np.int8]: The buffer with the current observation.
+        """
+        self._buffer_index ^= 1
+        self._observation = self._buffers[self._buffer_index]
+
+        write_observation(self._observation, self.game.board, self.game.next)
+        return self._observation
+
+    def _get_info(self) -> dict[str, np.ndarray]:
         """
-        Gets the current observation of the game. 
-        An observartion is a dictionary pf the current 3x3x3x3 board, 
-        the 3x3 big board and the small board coordinates of the next turn.
+        Gets the info of the current state: the mask of the legal actions.
 
         Returns:
-            dict: The current observation.
+            dict[str, np.ndarray]: The info with the "action_mask" array of 81 booleans.
         """
-        return Observation({
-            "board": self.game.board.board.copy(),
-            "big_board": self.game.board.big_board.copy(),
-            "next": self.game.next
-        })
+        return { "action_mask": self.game.board.legal_action_mask(self.game.next) }
 
     def reset(self,
               seed: int | None = None,
-              options: dict | None = None) -> tuple[Observation, dict]:
+              options: dict | None = None) -> tuple[NDArray[np.int8], dict]:
         """
         Resets the environment to the initial state.
 
         Args:
             seed (int, optional): 
-                The seed for random number generation. Comes from the base Env class.
+                The seed of the env's own random generator, which chooses the opponents
+                and the random players' moves. Comes from the base Env class.
             options (dict, optional): 
                 Additional options for resetting. Comes from the base Env class.
 
         Returns:
-            tuple: The initial observation and an empty dictionary as info.
+            tuple: The initial observation and the info.
         """
+        super().reset(seed=seed)
+
         self.game: Game = Game(2, auto_save=False)
-        self.opponent: BotPlayer = random.choice(self.opponents)
+        self.opponent: BotPlayer = self.opponents[self.np_random.integers(len(self.opponents))]
         self.win_reward: int = 100
+        self._episode_steps = 0
 
         if self.train_x:
-            big_x, big_y, small_x, small_y = self.opponent.get_turn(self.game.next, self.game.board)
-            self.game.take_turn(big_x, big_y, small_x, small_y)
+            self._opponent_turn()
+
+        return self._get_obs(), self._get_info()
 
-        return self._get_obs(), {}
+    def _opponent_turn(self) -> tuple[int, int, int, int]:
+        """
+        Plays the opponent's turn. Random players choose with the env's own generator,
+        so envs in one process don't share a random stream.
+
+        Returns:
+            tuple[int, int, int, int]: The coordinates of the opponent's move.
+        """
+        start: float = time.perf_counter()
+
+        if isinstance(self.opponent, RandomPlayer):
+            moves: tuple[tuple[int, int, int, int], ...] = \
+                self.game.board.legal_moves(self.game.next)
+            big_x, big_y, small_x, small_y = moves[self.np_random.integers(len(moves))]
+        else:
+            big_x, big_y, small_x, small_y = \
+                self.opponent.get_turn(self.game.next, self.game.board)
+
+        self.timers.opponent_time += time.perf_counter() - start
+
+        self.game.take_turn(big_x, big_y, small_x, small_y)
+        return big_x, big_y, small_x, small_y
 
-    def step(self, action: int) -> tuple[Observation, int, bool, bool, dict]:
+    def step(self, action: int) -> tuple[NDArray[np.int8], int, bool, bool, dict]:
         """
         Takes a step in the environment with the given action and 
         plays the opponent's turn, producing a reward.
 
+        Args:
+            action (int): The action to take.
+
+        Returns:
+            tuple: The new observation, reward, done flag, truncated flag, and additional info.
+        """
+        start: float = time.perf_counter()
+        result: tuple[NDArray[np.int8], int, bool, bool, dict] = self._play(action)
+
+        self.timers.step_time += time.perf_counter() - start
+        self.timers.steps += 1
+        self._episode_steps += 1
+
+        if result[2]:
+            self.timers.episodes += 1
+            self.timers.episode_steps += self._episode_steps
+
+        return result
+
+    def _play(self, action: int) -> tuple[NDArray[np.int8], int, bool, bool, dict]:
+        """
+        Plays the agent's action and the opponent's turn.
+
         Args:
             action (int): The action to take.
 
@@ -112,10 +201,11 @@ class TicTacToeEnv(gym.Env):
         try:
             self.game.take_turn(big_x, big_y, small_x, small_y)
         except RuntimeError:
-            return self._get_obs(), -100, True, False, {}
+            self.timers.illegal_moves += 1
+            return self._get_obs(), -100, True, False, self._get_info()
 
         if self.game.winner is not None:
-            return self._get_obs(), self.win_reward, True, False, {}
+            return self._get_obs(), self.win_reward, True, False, self._get_info()
 
         reward: int = 1
 
@@ -123,21 +213,19 @@ class TicTacToeEnv(gym.Env):
             reward += 5
 
         if self.game.board.is_full():
-            return self._get_obs(), reward, True, False, {}
+            return self._get_obs(), reward, True, False, self._get_info()
 
         if self.game.next == (-1, -1):
             reward -= 7
 
         current_player = self.game.current_player
-
-        big_x, big_y, small_x, small_y = self.opponent.get_turn(self.game.next, self.game.board)
-        self.game.take_turn(big_x, big_y, small_x, small_y)
+        big_x, big_y, small_x, small_y = self._opponent_turn()
 
         if self.game.winner is not None:
-            return self._get_obs(), -60, True, False, {}
+            return self._get_obs(), -60, True, False, self._get_info()
 
         if self.game.board.is_full():
-            return self._get_obs(), 0, True, False, {}
+            return self._get_obs(), 0, True, False, self._get_info()
 
         if self.game.board.check_small_win(current_player, big_x, big_y):
             reward -= 5
@@ -146,8 +234,35 @@ class TicTacToeEnv(gym.Env):
             reward += 7
 
         self.win_reward -= 1
-        return self._get_obs(), reward, False, False, {}
+        return self._get_obs(), reward, False, False, self._get_info()
 
     def render(self):
         """Renders the current state of the environment."""
         self.game.render()
+
+def make_env(opponent_models: list[str],
+             train_x: bool,
+             seed: int | None = None,
+             mask_observation: bool = False) -> gym.Env:
+    """
+    Builds a TicTacToeEnv for a training worker process. The opponents are created
+    here, inside the worker, so only the model names have to be sent to it.
+
+    Args:
+        opponent_models (list[str]): The names of the trained models to play against,
+            besides a random player.
+        train_x (bool): Whether to train as the X player.
+        seed (int | None, optional): The seed of the worker's random choices. Defaults to None.
+        mask_observation (bool, optional): Whether the observation includes the legal action
+            mask. Defaults to False.
+
+    Returns:
+        gym.Env: The environment.
+    """
+    opponents: list[BotPlayer] = [RandomPlayer()]
+    opponents.extend(AIPlayer(model) for model in opponent_models)
+
+    env: gym.Env = TicTacToeEnv(opponents, train_x, mask_observation)
+    env.reset(seed=seed)
+
+    return env
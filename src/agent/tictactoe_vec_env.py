@@ -0,0 +1,295 @@
+"""
+This module defines the TicTacToeVecEnv class, a Stable Baselines 3 vectorized environment
+which plays many Mega Tic Tac Toe games at once with a BatchBoard, used for fast training.
+"""
+
+import time
+from typing import Any
+import numpy as np
+from numpy.typing import NDArray
+import gymnasium as gym
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import VecEnv
+from stable_baselines3.common.vec_env.base_vec_env import VecEnvIndices, VecEnvStepReturn
+from src.agent.observation import coordinates_action, observation_space, \
+    write_batch_observations
+from src.agent.tictactoe_env import EnvTimers
+from src.players.ai_player import AIPlayer
+from src.players.bot_player import BotPlayer
+from src.players.random_player import RandomPlayer
+from src.tictactoe.batch_board import BatchBoard
+from src.tictactoe.board import Board
+
+class TicTacToeVecEnv(VecEnv):
+    """
+    Vectorized environment of N Mega Tic Tac Toe games against built-in opponents, with the same
+    rewards as TicTacToeEnv. Observations are the TicTacToeEnv observations and finished games
+    are reset automatically. The infos have the legal action masks.
+
+    Steps alternate between two observation buffers, so the returned observations stay valid
+    until the step after next - long enough for SB3 to store a transition without copies.
+    """
+    def __init__(self,
+                 num_envs: int,
+                 opponents: list[BotPlayer] | None = None,
+                 train_x: bool = False,
+                 seed: int | None = None,
+                 mask_observation: bool = False):
+        """
+        Initializes the TicTacToeVecEnv.
+
+        Args:
+            num_envs (int): The number of simultaneous games.
+            opponents (list[BotPlayer] | None, optional): List of opponent bot players to train
+                with, one is chosen randomly for every game. Defaults to a random player.
+            train_x (bool, optional): Whether to train as the X player. Defaults to False.
+            seed (int | None, optional): The seed for the opponents' choices. Defaults to None.
+            mask_observation (bool, optional): Whether the observations end with the legal
+                action masks. Defaults to False.
+        """
+        self.render_mode: str | None = None
+        space: spaces.Box = observation_space(mask_observation)
+        super().__init__(num_envs, space, spaces.Discrete(81))
+
+        self.opponents: list[BotPlayer] = opponents if opponents is not None else [RandomPlayer()]
+        self.train_x: bool = train_x
+        self.agent_player: int = 2 if train_x else 1
+
+        self.batch: BatchBoard = BatchBoard(num_envs)
+        self.opponent_indexes: NDArray[np.intp] = np.zeros(num_envs, dtype=np.intp)
+        self.win_rewards: NDArray[np.float32] = np.full(num_envs, 100, dtype=np.float32)
+
+        self._rng: np.random.Generator = np.random.default_rng(seed)
+        self._actions: NDArray[np.intp] = np.zeros(num_envs, dtype=np.intp)
+        self._buffers: NDArray[np.int8] = \
+            np.zeros((2, num_envs, *space.shape), dtype=np.int8)
+        self._buffer_index: int = 0
+
+        # The observations of every game in each AI opponent's observation space
+        self._opponent_observations: dict[int, NDArray[np.int8]] = {
+            index: np.zeros((num_envs, *opponent.observation_shape), dtype=np.int8)
+            for index, opponent in enumerate(self.opponents) if isinstance(opponent, AIPlayer)
+        }
+        self._masks: NDArray[np.bool_] = np.zeros((num_envs, 81), dtype=np.bool_)
+
+        self.timers: EnvTimers = EnvTimers()
+        self._episode_steps: NDArray[np.int64] = np.zeros(num_envs, dtype=np.int64)
+
+    def _get_obs(self) -> NDArray[np.int8]:
+        """
+        Writes the current observations of all games into the buffer of this step
+        and updates their legal action masks.
+
+        Returns:
+            NDArray[np.int8]: The buffer with the observations, shape (N, observation size).
+        """
+        observations: NDArray[np.int8] = self._buffers[self._buffer_index]
+
+        self._masks = self.batch.legal_action_masks()
+        write_batch_observations(observations, self.batch, self._masks)
+
+        return observations
+
+    def _reset_games(self, games: NDArray[np.bool_]) -> None:
+        """
+        Resets games, chooses their opponents and plays the opponents' first turn when training X.
+
+        Args:
+            games (NDArray[np.bool_]): A mask of the games to reset.
+        """
+        self.batch.reset(games)
+        self.win_rewards[games] = 100
+        self._episode_steps[games] = 0
+        self.opponent_indexes[games] = \
+            self._rng.integers(len(self.opponents), size=int(games.sum()))
+
+        if self.train_x:
+            self.batch.play(self._opponent_actions(games), games)
+
+    def _opponent_actions(self, games: NDArray[np.bool_]) -> NDArray[np.intp]:
+        """
+        Chooses the opponents' actions. Random players are vectorized, AI players evaluate
+        all their games in one batch and other bot players are asked for their turn game by game.
+
+        Args:
+            games (NDArray[np.bool_]): A mask of the games where the opponent is to move.
+
+        Returns:
+            NDArray[np.intp]: The opponent action of every game, shape (N,).
+        """
+        start: float = time.perf_counter()
+        masks: NDArray[np.bool_] = self.batch.legal_action_masks()
+        actions: NDArray[np.intp] = np.argmax(self._rng.random(masks.shape) * masks, axis=1)
+
+        for index, opponent in enumerate(self.opponents):
+            if isinstance(opponent, RandomPlayer):
+                continue
+
+            opponent_games: NDArray[np.intp] = \
+                np.flatnonzero(games & (self.opponent_indexes == index))
+
+            if opponent_games.size == 0:
+                continue
+
+            if isinstance(opponent, AIPlayer):
+                observations: NDArray[np.int8] = self._opponent_observations[index]
+                write_batch_observations(observations, self.batch, masks)
+
+                actions[opponent_games] = \
+                    opponent.get_actions(observations[opponent_games], masks[opponent_games])
+                continue
+
+            for game in opponent_games:
+                board: Board = Board()
+                board.board = self.batch.boards[game]
+                board.big_board = self.batch.big_boards[game]
+                next_board: tuple[int, int] = \
+                    int(self.batch.next_boards[game, 0]), int(self.batch.next_boards[game, 1])
+
+                actions[game] = coordinates_action(*opponent.get_turn(next_board, board))
+
+        self.timers.opponent_time += time.perf_counter() - start
+        return actions
+
+    def reset(self) -> NDArray[np.int8]:
+        """
+        Resets all games.
+
+        Returns:
+            NDArray[np.int8]: The initial observations.
+        """
+        if self._seeds[0] is not None:
+            self._rng = np.random.default_rng(self._seeds[0])
+
+        self._reset_seeds()
+        self._reset_games(np.ones(self.num_envs, dtype=np.bool_))
+        self._buffer_index ^= 1
+
+        observations: NDArray[np.int8] = self._get_obs()
+        self.reset_infos = [{ "action_mask": mask } for mask in self._masks]
+
+        return observations
+
+    def step_async(self, actions: NDArray) -> None:
+        """
+        Stores the actions for the next step_wait.
+
+        Args:
+            actions (NDArray): The action of every game.
+        """
+        self._actions = np.asarray(actions, dtype=np.intp).reshape(self.num_envs)
+
+    def step_wait(self) -> VecEnvStepReturn:
+        """
+        Plays the stored actions and the opponents' replies, producing the rewards.
+
+        Returns:
+            VecEnvStepReturn: The new observations, rewards, done flags and infos.
+        """
+        start: float = time.perf_counter()
+        batch: BatchBoard = self.batch
+        legal, small_wins = batch.play(self._actions)
+
+        rewards: NDArray[np.float32] = np.where(small_wins, 6, 1).astype(np.float32)
+        rewards[~legal] = -100
+
+        won: NDArray[np.bool_] = legal & (batch.winners == self.agent_player)
+        rewards[won] = self.win_rewards[won]
+
+        playing: NDArray[np.bool_] = legal & ~batch.done
+        rewards[playing & (batch.next_boards[:, 0] < 0)] -= 7
+
+        opponent_legal, opponent_small_wins = batch.play(self._opponent_actions(playing), playing)
+
+        finished: NDArray[np.bool_] = opponent_legal & batch.done
+        rewards[finished] = np.where(batch.winners[finished] == 3 - self.agent_player, -60, 0)
+
+        playing &= ~batch.done
+        rewards[playing & opponent_small_wins] -= 5
+        rewards[playing & (batch.next_boards[:, 0] < 0)] += 7
+        self.win_rewards[playing] -= 1
+
+        dones: NDArray[np.bool_] = ~playing
+        self._episode_steps += 1
+        self.timers.steps += self.num_envs
+        self.timers.illegal_moves += int(np.count_nonzero(~legal))
+        self.timers.episodes += int(np.count_nonzero(dones))
+        self.timers.episode_steps += int(self._episode_steps[dones].sum())
+
+        self._buffer_index ^= 1
+        observations: NDArray[np.int8] = self._get_obs()
+        infos: list[dict[str, Any]] = [{} for _ in range(self.num_envs)]
+
+        if dones.any():
+            # The buffer is rewritten after the reset, so the terminal observations are copied
+            for game, terminal_observation in zip(np.flatnonzero(dones), observations[dones]):
+                infos[game]["terminal_observation"] = terminal_observation
+
+            self._reset_games(dones)
+            observations = self._get_obs()
+
+        for info, mask in zip(infos, self._masks):
+            info["action_mask"] = mask
+
+        self.timers.step_time += time.perf_counter() - start
+        return observations, rewards, dones, infos
+
+    def close(self) -> None:
+        """Closes the environment. There are no resources to clean up."""
+
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> list[Any]:
+        """
+        Gets an attribute of the environment for every index.
+
+        Args:
+            attr_name (str): The name of the attribute.
+            indices (VecEnvIndices, optional): The indexes of the games. Defaults to all.
+
+        Returns:
+            list[Any]: The attribute value for every index.
+        """
+        return [getattr(self, attr_name)] * len(list(self._get_indices(indices)))
+
+    def set_attr(self, attr_name: str, value: Any, indices: VecEnvIndices = None) -> None:
+        """
+        Sets an attribute of the environment, shared by all games.
+
+        Args:
+            attr_name (str): The name of the attribute.
+            value (Any): The new value.
+            indices (VecEnvIndices, optional): Ignored, the attribute is shared.
+        """
+        setattr(self, attr_name, value)
+
+    def env_method(self,
+                   method_name: str,
+                   *method_args,
+                   indices: VecEnvIndices = None,
+                   **method_kwargs) -> list[Any]:
+        """
+        Calls a method of the environment once for every index.
+
+        Args:
+            method_name (str): The name of the method.
+            indices (VecEnvIndices, optional): The indexes of the games. Defaults to all.
+
+        Returns:
+            list[Any]: The results of the calls.
+        """
+        return [getattr(self, method_name)(*method_args, **method_kwargs)
+                for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self,
+                       wrapper_class: type[gym.Wrapper],
+                       indices: VecEnvIndices = None) -> list[bool]:
+        """
+        Checks if the games are wrapped with a gym wrapper, which they never are.
+
+        Args:
+            wrapper_class (type[gym.Wrapper]): The wrapper class.
+            indices (VecEnvIndices, optional): The indexes of the games. Defaults to all.
+
+        Returns:
+            list[bool]: False for every index.
+        """
+        return [False] * len(list(self._get_indices(indices)))
@@ -2,53 +2,302 @@
 This module contains functions for training AI models for Mega Tic Tac Toe.
 """
 
-import os.path
-from stable_baselines3 import DQN
+import os
+import re
+from functools import partial
+import numpy as np
+from stable_baselines3.common.callbacks import CallbackList, CheckpointCallback
+from stable_baselines3.common.off_policy_algorithm import OffPolicyAlgorithm
+from stable_baselines3.common.save_util import load_from_zip_file
+from stable_baselines3.common.vec_env import SubprocVecEnv, VecEnv, VecMonitor
 import gymnasium as gym
-from gymnasium.wrappers import FlattenObservation
+from src.agent.masked_dqn import MaskedDQN, MaskedDQNPolicy
+from src.agent.metrics import ThroughputCallback
 from src.agent.models_path import MODELS_PATH
-from src.agent.tictactoe_env import TicTacToeEnv
+from src.agent.numpy_q_network import export_q_network, export_path
+from src.agent.packed_replay_buffer import PackedReplayBuffer
+from src.agent.tictactoe_env import make_env
+from src.agent.tictactoe_vec_env import TicTacToeVecEnv
 from src.players.random_player import RandomPlayer
 from src.players.bot_player import BotPlayer
 from src.players.ai_player import AIPlayer
 
-def train_model(name: str, steps: int, is_o: bool):
+def get_trainers(is_o: bool) -> list[str]:
+    """
+    Gets the names of the existing trainer models to play against.
+
+    Args:
+        is_o (bool): Whether the model is trained as player O.
+
+    Returns:
+        list[str]: The names of the trainer models.
+    """
+    trainer_prefix: str = "x_trainer" if is_o else "o_trainer"
+
+    return [f"{trainer_prefix}{i}" for i in (1, 2)
+            if os.path.exists(os.path.join(MODELS_PATH, f"{trainer_prefix}{i}.zip"))]
+
+def get_checkpoint_path(model_name: str) -> str:
+    """
+    Gets the directory of a model's training checkpoints.
+
+    Args:
+        model_name (str): The full name of the model, with the "o_" or "x_" prefix.
+
+    Returns:
+        str: The path of the directory.
+    """
+    return os.path.join(MODELS_PATH, "checkpoints", model_name)
+
+def latest_checkpoint(checkpoint_path: str) -> tuple[str, str | None] | None:
+    """
+    Finds the checkpoint with the most timesteps.
+
+    Args:
+        checkpoint_path (str): The directory of the checkpoints.
+
+    Returns:
+        tuple[str, str | None] | None: The paths of the model and of its replay buffer
+            (None if it was not saved), or None if there are no checkpoints.
+    """
+    if not os.path.isdir(checkpoint_path):
+        return None
+
+    steps: list[int] = [int(match.group(1)) for file in os.listdir(checkpoint_path)
+                        if (match := re.fullmatch(r"model_(\d+)_steps\.zip", file))]
+
+    if not steps:
+        return None
+
+    buffer_path: str = os.path.join(checkpoint_path, f"model_replay_buffer_{max(steps)}_steps.pkl")
+
+    return os.path.join(checkpoint_path, f"model_{max(steps)}_steps.zip"), \
+        buffer_path if os.path.exists(buffer_path) else None
+
+def clear_checkpoints(checkpoint_path: str) -> None:
+    """
+    Removes the checkpoints and replay buffers of earlier runs, so a fresh run is never
+    resumed from them.
+
+    Args:
+        checkpoint_path (str): The directory of the checkpoints.
+    """
+    if not os.path.isdir(checkpoint_path):
+        return
+
+    for file in os.listdir(checkpoint_path):
+        if re.fullmatch(r"model_(replay_buffer_)?\d+_steps\.(zip|pkl)", file):
+            os.remove(os.path.join(checkpoint_path, file))
+
+class TrainingCheckpointCallback(CheckpointCallback):
+    """
+    Saves the model, with its optimizer state, and the replay buffer every save_freq calls
+    and when training ends, so a resumed run continues from the last step.
+    Only the newest replay buffer is kept, as they can take gigabytes.
+    """
+    def _on_step(self) -> bool:
+        """
+        Saves a checkpoint if it is due and removes the older replay buffers.
+
+        Returns:
+            bool: True, training always continues.
+        """
+        super()._on_step()
+
+        if self.n_calls % self.save_freq == 0:
+            self._remove_old_replay_buffers()
+
+        return True
+
+    def _on_training_end(self) -> None:
+        """Saves the final checkpoint, unless the last step has saved it."""
+        model_path: str = self._checkpoint_path(extension="zip")
+
+        if os.path.exists(model_path):
+            return
+
+        self.model.save(model_path)
+
+        if self.save_replay_buffer and isinstance(self.model, OffPolicyAlgorithm) \
+                and self.model.replay_buffer is not None:
+            self.model.save_replay_buffer(self._checkpoint_path("replay_buffer_", extension="pkl"))
+            self._remove_old_replay_buffers()
+
+    def _remove_old_replay_buffers(self) -> None:
+        """Removes the replay buffers but the newest one."""
+        newest: str = os.path.basename(self._checkpoint_path("replay_buffer_", extension="pkl"))
+
+        for file in os.listdir(self.save_path):
+            if file.startswith(f"{self.name_prefix}_replay_buffer_") and file != newest:
+                os.remove(os.path.join(self.save_path, file))
+
+def make_training_env(is_o: bool,
+                      n_envs: int = 1,
+                      n_workers: int = 1,
+                      seed: int | None = None,
+                      mask_observation: bool = False) -> gym.Env | VecEnv:
+    """
+    Creates the environment to train a model in.
+
+    Args:
+        is_o (bool): Whether the model is trained as player O.
+        n_envs (int, optional): The number of games played at once in a TicTacToeVecEnv.
+            Defaults to 1.
+        n_workers (int, optional): The number of worker processes, each playing its own game.
+            Defaults to 1, playing in this process.
+        seed (int | None, optional): The seed of the opponents' choices. Defaults to None.
+        mask_observation (bool, optional): Whether the observations include the legal action
+            masks. Defaults to False.
+
+    Returns:
+        gym.Env | VecEnv: The environment.
+    """
+    if n_envs > 1 and n_workers > 1:
+        raise ValueError("Use either several environments or several workers, not both!")
+
+    trainers: list[str] = get_trainers(is_o)
+
+    if n_workers > 1:
+        seeds: list[int] = [int(worker_seed) for worker_seed in
+                            np.random.SeedSequence(seed).generate_state(n_workers)]
+
+        return VecMonitor(SubprocVecEnv([partial(make_env, trainers, not is_o, worker_seed,
+                                                 mask_observation)
+                                         for worker_seed in seeds]))
+
+    if n_envs > 1:
+        opponents: list[BotPlayer] = [RandomPlayer()]
+        opponents.extend(AIPlayer(trainer) for trainer in trainers)
+
+        return VecMonitor(TicTacToeVecEnv(n_envs, opponents, not is_o, seed, mask_observation))
+
+    return make_env(trainers, not is_o, seed, mask_observation)
+
+def load_base_model(base_model_path: str,
+                    env: gym.Env | VecEnv,
+                    buffer_size: int) -> MaskedDQN | None:
+    """
+    Loads the base model to continue training from, if its observations match the environment's.
+    The shipped base models were trained without the action masks in their observations,
+    so they can't be trained with mask_observation.
+
+    Args:
+        base_model_path (str): The path of the base model, without the ".zip" extension.
+        env (gym.Env | VecEnv): The training environment.
+        buffer_size (int): The number of transitions kept in the packed replay buffer.
+
+    Returns:
+        MaskedDQN | None: The base model, None if it doesn't exist or doesn't fit the environment.
+    """
+    if not os.path.exists(f"{base_model_path}.zip"):
+        return None
+
+    data: dict | None = load_from_zip_file(base_model_path, custom_objects={
+        "lr_schedule": None,
+        "exploration_schedule": None
+    })[0]
+
+    if data is None or data["observation_space"] != env.observation_space:
+        return None
+
+    return MaskedDQN.load(base_model_path, env=env, custom_objects={
+        "policy_class": MaskedDQNPolicy,
+        "replay_buffer_class": PackedReplayBuffer,
+        "replay_buffer_kwargs": {},
+        "buffer_size": buffer_size
+    })
+
+def train_model(name: str,
+                steps: int,
+                is_o: bool,
+                n_envs: int = 1,
+                n_workers: int = 1,
+                seed: int | None = None,
+                mask_observation: bool = False,
+                buffer_size: int = 100000,
+                resume: bool = False,
+                checkpoint_interval: int = 100000,
+                metrics_interval: int = 10000):
     """
     Trains an AI model to play Mega Tic Tac Toe using a Deep Q-Network.
+    The model is saved with its Q-Network exported for NumPy inference.
 
     Args:
         name (str): The name of the model.
         steps (int): The number of training games.
         is_o (bool): Whether the model is trained as player O.
+        n_envs (int, optional): The number of games played at once in a TicTacToeVecEnv.
+            Defaults to 1, training on a single TicTacToeEnv.
+        n_workers (int, optional): The number of environment worker processes.
+            Defaults to 1, training in this process.
+        seed (int | None, optional): The seed of the opponents' choices. Defaults to None.
+        mask_observation (bool, optional): Whether the observations include the legal action
+            masks. Defaults to False.
+        buffer_size (int, optional): The number of transitions kept in the packed replay buffer,
+            about 50 bytes each. Defaults to 100000.
+        resume (bool, optional): Whether to continue from the latest checkpoint of the model,
+            with its replay buffer, timestep count and exploration schedule. Otherwise the
+            checkpoints of earlier runs of the model are removed. Defaults to False.
+        checkpoint_interval (int, optional): The number of timesteps between checkpoints.
+            Defaults to 100000.
+        metrics_interval (int, optional): The number of timesteps between the throughput
+            metrics rows written to metrics.csv in the checkpoint directory. Defaults to 10000.
     """
+    model_name: str = ("o_" if is_o else "x_") + name
+    checkpoint_path: str = get_checkpoint_path(model_name)
+    checkpoint: tuple[str, str | None] | None = \
+        latest_checkpoint(checkpoint_path) if resume else None
 
-    trainer_prefix: str = "x_trainer" if is_o else "o_trainer"
-    opponents: list[BotPlayer] = [RandomPlayer()]
+    if not resume:
+        clear_checkpoints(checkpoint_path)
 
-    if os.path.exists(os.path.join(MODELS_PATH, f"{trainer_prefix}1")):
-        opponents.append(AIPlayer(f"{trainer_prefix}1"))
+    env: gym.Env | VecEnv = make_training_env(is_o, n_envs, n_workers, seed, mask_observation)
 
-    if os.path.exists(os.path.join(MODELS_PATH, f"{trainer_prefix}2")):
-        opponents.append(AIPlayer(f"{trainer_prefix}2"))
+    # Train the model (3M+ timesteps recommended)
+    base_model_path = os.path.join(MODELS_PATH, f"{'o' if is_o else 'x'}_base")
+    model: MaskedDQN | None = None
 
-    # DQN doesn't support environments with a dictionary observations
-    env: gym.Env = FlattenObservation(TicTacToeEnv(opponents, train_x=not is_o))
+    if checkpoint is not None:
+        model = MaskedDQN.load(checkpoint[0], env=env)
 
-    # Train the model (3M+ timesteps recommended)
-    base_model_path = os.path.join(MODELS_PATH, f"{"o" if is_o else "x"}_base")
+        if checkpoint[1] is not None:
+            model.load_replay_buffer(checkpoint[1])
 
-    model = DQN.load(base_model_path) \
-        if os.path.exists(base_model_path) \
-        else DQN(
+            # The checkpoint may have been trained with another number of envs or workers
+            if isinstance(model.replay_buffer, PackedReplayBuffer):
+                model.replay_buffer.resize_envs(model.n_envs)
+    else:
+        model = load_base_model(base_model_path, env, buffer_size)
+
+    if model is None:
+        model = MaskedDQN(
             "MlpPolicy", env, verbose=1,
             learning_rate=3e-4,
             exploration_fraction=0.1,
             exploration_final_eps=0.01,
-            buffer_size=100000,
+            buffer_size=buffer_size,
+            replay_buffer_class=PackedReplayBuffer,
             batch_size=64,
             train_freq=4,
             target_update_interval=1000
         )
 
-    model.learn(total_timesteps=steps)
-    model.save(os.path.join(MODELS_PATH, ("o_" if is_o else "x_") + name))
+    callback: CallbackList = CallbackList([
+        TrainingCheckpointCallback(
+            max(checkpoint_interval // model.n_envs, 1),
+            checkpoint_path,
+            name_prefix="model",
+            save_replay_buffer=True
+        ),
+        ThroughputCallback(os.path.join(checkpoint_path, "metrics.csv"), metrics_interval)
+    ])
+
+    try:
+        # A resumed model continues its timestep count, so only the remaining steps are played
+        model.learn(total_timesteps=max(steps - model.num_timesteps, 0) if checkpoint else steps,
+                    callback=callback,
+                    reset_num_timesteps=checkpoint is None)
+        model.save(os.path.join(MODELS_PATH, model_name))
+        export_q_network(model, export_path(os.path.join(MODELS_PATH, model_name)))
+    finally:
+        env.close()
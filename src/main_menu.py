@@ -4,10 +4,10 @@ This module contains the main menu for the Mega Tic Tac Toe game.
 
 from typing import Any
 import argparse
+import os
 from src.tictactoe.game import Game
 from src.tictactoe.console_game import ConsoleGame
 from src.saving.save_manager import load_json
-from src.agent.training import train_model
 from src.utils import cond_input_or_quit
 
 async def main_menu(args: argparse.Namespace):
@@ -74,5 +74,15 @@ def train_menu() -> None:
     is_o: bool = cond_input_or_quit(lambda x: x.lower() in { "1", "2", "x", "o" },
                                     "Train as O (1st) or X (2nd)? ") in "1o"
 
-    train_model(name, steps, is_o)
+    cpus: int = os.cpu_count() or 1
+    workers: int = int(cond_input_or_quit(lambda x: x.isdigit() and 1 <= int(x) <= cpus,
+                                          f"Enter the number of worker processes (1 - {cpus}): "))
+
+    resume: bool = cond_input_or_quit(lambda x: x.lower() in { "y", "n" },
+                                      "Resume from the latest checkpoint? (y/n) ").lower() == "y"
+
+    # Training imports the ML stack, so it is only imported when a model is trained
+    from src.agent.training import train_model  # pylint: disable=import-outside-toplevel
+
+    train_model(name, steps, is_o, n_workers=workers, resume=resume)
     print("Training completed!")
@@ -3,27 +3,93 @@ This module contains the AIPlayer class, which represents a player controlled by
 """
 
 import os
-import random
+from typing import TYPE_CHECKING
 import numpy as np
 from numpy.typing import NDArray
-from stable_baselines3 import DQN
 from src.players.bot_player import BotPlayer
 from src.tictactoe.board import Board
+from src.agent.model_registry import MODEL_REGISTRY
 from src.agent.models_path import MODELS_PATH
-from src.agent.tictactoe_env import action_coordinates
+from src.agent.numpy_q_network import NumpyQNetwork, export_path, is_exported
+from src.agent.observation import action_coordinates, write_observation
+from src.agent.prediction_cache import DEFAULT_CACHE_SIZE, PredictionCache, \
+    get_prediction_cache, position_key
+
+if TYPE_CHECKING:
+    from stable_baselines3 import DQN
+    from src.agent.inference_server import InferenceServer
+
+BACKENDS: tuple[str, ...] = ("auto", "numpy", "torch")
+"""The inference backends of AIPlayer."""
 
 class AIPlayer(BotPlayer):
     """
     A player controlled by a trained AI model using a DQN to predict the next move.
+    Only legal moves are considered, the illegal ones' Q-values are set to -inf.
+    The models are loaded through MODEL_REGISTRY, so AIPlayers of the same model share it.
+
+    The Q-values are evaluated either by the DQN with torch or, if the model's Q-Network
+    was exported (see numpy_q_network.py), by a NumpyQNetwork - much faster for single moves.
+    With an InferenceServer, the moves of concurrent games are evaluated in batches.
+    The Q-values of the positions played are cached, shared by the model's AIPlayers.
     """
-    def __init__(self, model_name: str):
+    def __init__(self,
+                 model_name: str,
+                 backend: str = "auto",
+                 server: "InferenceServer | None" = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
         """
-        Initializes the AIPlayer with a trained model.
+        Initializes the AIPlayer with a trained model, loaded unless the registry already has it.
 
         Args:
             model_name (str): The name of the trained model to load.
+            backend (str, optional): The inference backend: "numpy", "torch" or "auto",
+                using NumPy if the model has an up-to-date export. Defaults to "auto".
+            server (InferenceServer | None, optional): The server batching the moves
+                awaited with get_turn_async. Defaults to None, evaluating every move alone.
+            cache_size (int, optional): The most positions in the model's prediction cache,
+                if this player creates it. 0 disables caching. Defaults to DEFAULT_CACHE_SIZE.
+
+        Raises:
+            ValueError: If the backend is unknown.
         """
-        self.model: DQN = DQN.load(os.path.join(MODELS_PATH, model_name))
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}!")
+
+        self.model_path: str = os.path.join(MODELS_PATH, model_name)
+        self.backend: str = backend if backend != "auto" \
+            else "numpy" if is_exported(self.model_path) else "torch"
+
+        # Models trained with mask_observation have room for the action mask
+        self._observation: NDArray[np.int8] = np.zeros(self.observation_shape, dtype=np.int8)
+        self.server: InferenceServer | None = server
+        self.cache: PredictionCache = get_prediction_cache(self.model_file, cache_size)
+
+    @property
+    def model(self) -> "DQN":
+        """The DQN model, reloaded by the registry if its file has changed."""
+        return MODEL_REGISTRY.get_dqn(self.model_path)
+
+    @property
+    def network(self) -> NumpyQNetwork:
+        """The exported Q-Network, reloaded by the registry if its file has changed."""
+        return MODEL_REGISTRY.get_network(export_path(self.model_path))
+
+    @property
+    def model_file(self) -> str:
+        """The path of the file the backend evaluates, the exported Q-Network or the DQN."""
+        return export_path(self.model_path) if self.backend == "numpy" else f"{self.model_path}.zip"
+
+    @property
+    def observation_shape(self) -> tuple[int, ...]:
+        """The shape of the model's observations."""
+        if self.backend == "numpy":
+            return self.network.observation_shape
+
+        shape: tuple[int, ...] | None = self.model.observation_space.shape
+        assert shape is not None, "The model's observations must be flat"
+
+        return shape
 
     def get_turn(self, next_board: tuple[int, int], board: Board) -> tuple[int, int, int, int]:
         """
@@ -36,20 +102,128 @@ class AIPlayer(BotPlayer):
         Returns:
             tuple[int, int, int, int]: The coordinates of the selected move.
         """
-        obs: NDArray[np.int8] = np.concatenate([
-            board.board.flatten(),
-            board.big_board.flatten(),
-            np.array(next_board)
-        ])
+        legal: NDArray[np.bool_] = board.legal_action_mask(next_board)
+        q_values: NDArray[np.float32] = self.position_q_values(next_board, board)
+
+        return action_coordinates(int(np.argmax(np.where(legal, q_values, -np.inf))))
+
+    def position_q_values(self, next_board: tuple[int, int], board: Board) -> NDArray[np.float32]:
+        """
+        Gets the Q-values of a position from the prediction cache, evaluating and caching
+        them if they aren't cached. The cache is cleared first if the model's file has changed.
+
+        Args:
+            next_board (tuple[int, int]): The coordinates of the big board to play on.
+            board (Board): The current game board.
+
+        Returns:
+            NDArray[np.float32]: The read-only Q-value of every flat action, shape (81,).
+        """
+        key, q_values = self._cached_q_values(next_board, board)
+
+        if q_values is None:
+            write_observation(self._observation, board, next_board)
+            q_values = self.q_values(self._observation[np.newaxis])[0]
+            self.cache.put(key, q_values)
+
+        return q_values
+
+    def _cached_q_values(self,
+                         next_board: tuple[int, int],
+                         board: Board) -> tuple[int, NDArray[np.float32] | None]:
+        """
+        Looks up the Q-values of a position in the prediction cache, cleared first
+        if the model's file has changed.
+
+        Args:
+            next_board (tuple[int, int]): The coordinates of the big board to play on.
+            board (Board): The current game board.
+
+        Returns:
+            tuple[int, NDArray[np.float32] | None]: The position key and the read-only
+                Q-values, None if they aren't cached.
+        """
+        # A model whose file was removed keeps its cache, as the registry keeps the model
+        try:
+            self.cache.validate(os.stat(self.model_file).st_mtime)
+        except FileNotFoundError:
+            pass
+
+        key: int = position_key(board, next_board)
+        return key, self.cache.get(key)
+
+    async def get_turn_async(self,
+                             next_board: tuple[int, int],
+                             board: Board) -> tuple[int, int, int, int]:
+        """
+        Predicts the next move from the AI model through the server, if there is one.
+        Only the positions missing from the prediction cache are sent to the server,
+        and their Q-values are cached.
+
+        Args:
+            next_board (tuple[int, int]): The coordinates of the big board to play on.
+            board (Board): The current game board.
+
+        Returns:
+            tuple[int, int, int, int]: The coordinates of the selected move.
+        """
+        if self.server is None:
+            return self.get_turn(next_board, board)
+
+        key, q_values = self._cached_q_values(next_board, board)
+
+        if q_values is None:
+            # Every request has its own observation, as other games play while it waits
+            observation: NDArray[np.int8] = np.empty_like(self._observation)
+            write_observation(observation, board, next_board)
+
+            q_values = await self.server.get_q_values(self, observation)
+            self.cache.put(key, q_values)
+
+        legal: NDArray[np.bool_] = board.legal_action_mask(next_board)
+        return action_coordinates(int(np.argmax(np.where(legal, q_values, -np.inf))))
+
+    def get_actions(self,
+                    observations: NDArray[np.int8],
+                    masks: NDArray[np.bool_]) -> NDArray[np.intp]:
+        """
+        Chooses the legal actions with the highest Q-values for many positions at once,
+        in a single forward pass.
+
+        Args:
+            observations (NDArray[np.int8]): The flat observations, shape (N, observation size).
+            masks (NDArray[np.bool_]): The legal action masks, shape (N, 81).
+
+        Returns:
+            NDArray[np.intp]: The chosen flat actions, shape (N,).
+        """
+        q_values: NDArray[np.float32] = self.q_values(observations)
+        q_values[~masks] = -np.inf
+
+        return np.argmax(q_values, axis=1)
+
+    def q_values(self, observations: NDArray[np.int8]) -> NDArray[np.float32]:
+        """
+        Evaluates the Q-values of all actions in a batch of observations.
+
+        Args:
+            observations (NDArray[np.int8]): The flat observations, shape (N, observation size).
+
+        Returns:
+            NDArray[np.float32]: The Q-value of every flat action, shape (N, 81).
+        """
+        if self.backend == "numpy":
+            return self.network.q_values(observations)
 
-        action, _ = self.model.predict(obs)
-        big_x, big_y, small_x, small_y = action_coordinates(int(action.item()))
+        # Torch is only needed without an exported Q-Network
+        import torch as th  # pylint: disable=import-outside-toplevel
 
-        valid_moves: list[tuple[int, int, int, int]] = list(board.valid_moves(next_board))
-        if (big_x, big_y, small_x, small_y) not in valid_moves:
-            big_x, big_y, small_x, small_y = random.choice(valid_moves)
+        # On the CPU the tensor shares the observations' memory
+        model: DQN = self.model
+        obs_tensor: th.Tensor = th.as_tensor(observations, device=model.device)
 
-        return big_x, big_y, small_x, small_y
+        with th.no_grad():
+            return model.q_net(obs_tensor).cpu().numpy()
 
     def get_type(self) -> str:
         """Returns the type of the player as a string."""
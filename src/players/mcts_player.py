@@ -0,0 +1,387 @@
+"""
+This module contains the MCTSPlayer class, a bot which chooses its moves by Monte Carlo Tree Search
+with UCT selection and random rollouts.
+
+The search plays on SearchState, a compact copy of the board: the 9 bit patterns of every small
+board, so a move is a few integer operations. A move is the board's cell bit
+27 * big_y + 9 * big_x + 3 * small_y + small_x, that is 9 * small board + cell.
+"""
+
+import math
+import random
+import time
+from src.players.bot_player import BotPlayer
+from src.tictactoe.board import Board, CELL_COORDINATES, PATTERN_CELLS, SMALL_MASK, is_win
+
+WINS: tuple[bool, ...] = tuple(is_win(pattern) for pattern in range(512))
+"""Whether every 9 bit pattern of a player's marks contains a full line."""
+
+DEFAULT_TIME_LIMIT: float = 0.5
+"""The default seconds of search per move."""
+
+DEFAULT_EXPLORATION: float = 0.7
+"""The default exploration constant of UCT, tuned in self-play for wins scored 1 and draws 0.5."""
+
+class SearchState:
+    """
+    A game position for the search: the marks, free cells and won small boards as bit patterns,
+    the small board to play on, the player to move and the winner once the game is over.
+    """
+    __slots__ = ("marks", "free", "won", "open", "next", "player", "winner")
+
+    def __init__(self,
+                 marks: list[int],
+                 free: list[int],
+                 won: list[int],
+                 open_smalls: int,
+                 next_small: int,
+                 player: int,
+                 winner: int | None):
+        """
+        Initializes the SearchState.
+
+        Args:
+            marks (list[int]): The 9 bit patterns of player 1's marks on the small boards 0 - 8,
+                followed by player 2's.
+            free (list[int]): The 9 bit patterns of the free cells of the small boards.
+            won (list[int]): The 9 bit patterns of the small boards won by player 1 and player 2.
+            open_smalls (int): The 9 bit pattern of the small boards which can be played on.
+            next_small (int): The small board to play on, -1 for any open small board.
+            player (int): The player to move.
+            winner (int | None): The winner, 0 for a draw, None while the game goes on.
+        """
+        self.marks: list[int] = marks
+        self.free: list[int] = free
+        self.won: list[int] = won
+        self.open: int = open_smalls
+        self.next: int = next_small
+        self.player: int = player
+        self.winner: int | None = winner
+
+    @classmethod
+    def from_board(cls, board: Board, next_board: tuple[int, int]) -> "SearchState":
+        """
+        Creates the state of a game position. The player to move is O on an even
+        number of marks and X on an odd one, as the board doesn't record it. This only holds
+        under the standard rules: in test mode, where the players don't switch and the small
+        board to play on is free, the search plays the wrong player and rules.
+
+        Args:
+            board (Board): The game board.
+            next_board (tuple[int, int]): The coordinates of the small board to play on.
+
+        Returns:
+            SearchState: The state.
+        """
+        cells: tuple[int, int] = board.cells
+        marks: list[int] = [cells[player] >> 9 * small & SMALL_MASK
+                            for player in range(2) for small in range(9)]
+        free: list[int] = [SMALL_MASK ^ (marks[small] | marks[9 + small]) for small in range(9)]
+        won: list[int] = [sum(WINS[marks[9 * player + small]] << small for small in range(9))
+                          for player in range(2)]
+        open_smalls: int = sum(1 << small for small in range(9)
+                               if free[small] and not (won[0] | won[1]) >> small & 1)
+
+        player: int = 1 + (cells[0] | cells[1]).bit_count() % 2
+        winner: int | None = 1 if WINS[won[0]] else 2 if WINS[won[1]] \
+            else 0 if not open_smalls else None
+        next_small: int = -1 if next_board == (-1, -1) else 3 * next_board[1] + next_board[0]
+
+        return cls(marks, free, won, open_smalls, next_small, player, winner)
+
+    def copy(self) -> "SearchState":
+        """Copies the state."""
+        return SearchState(self.marks[:], self.free[:], self.won[:],
+                           self.open, self.next, self.player, self.winner)
+
+    def moves(self) -> list[int]:
+        """
+        Gets the legal moves.
+
+        Returns:
+            list[int]: The cell bits of the legal moves, none once the game is over.
+        """
+        if self.winner is not None:
+            return []
+
+        smalls: tuple[int, ...] = PATTERN_CELLS[self.open] if self.next < 0 else (self.next,)
+
+        return [9 * small + cell for small in smalls for cell in PATTERN_CELLS[self.free[small]]]
+
+    def play(self, move: int) -> None:
+        """
+        Plays a legal move for the player to move.
+
+        Args:
+            move (int): The cell bit of the move.
+        """
+        small, cell = divmod(move, 9)
+        index: int = 9 * (self.player - 1) + small
+
+        self.marks[index] |= 1 << cell
+        self.free[small] ^= 1 << cell
+
+        if WINS[self.marks[index]]:
+            self.won[self.player - 1] |= 1 << small
+            self.open ^= 1 << small
+
+            if WINS[self.won[self.player - 1]]:
+                self.winner = self.player
+        elif not self.free[small]:
+            self.open ^= 1 << small
+
+        if self.winner is None and not self.open:
+            self.winner = 0
+
+        self.next = cell if self.open >> cell & 1 else -1
+        self.player = 3 - self.player
+
+    def rollout(self) -> int:
+        """
+        Plays uniformly random moves until the game is over.
+
+        Returns:
+            int: The winner, 0 for a draw.
+        """
+        # The loop is inlined, as rollouts take most of the search time
+        marks, free, won = self.marks, self.free, self.won
+        open_smalls, next_small, player = self.open, self.next, self.player
+        winner: int | None = self.winner
+        rand = random.random
+
+        while winner is None:
+            if next_small < 0:
+                cells: list[int] = [9 * small + cell for small in PATTERN_CELLS[open_smalls]
+                                    for cell in PATTERN_CELLS[free[small]]]
+                small, cell = divmod(cells[int(rand() * len(cells))], 9)
+            else:
+                small = next_small
+                free_cells: tuple[int, ...] = PATTERN_CELLS[free[small]]
+                cell = free_cells[int(rand() * len(free_cells))]
+
+            index: int = 9 * (player - 1) + small
+            marks[index] |= 1 << cell
+            free[small] ^= 1 << cell
+
+            if WINS[marks[index]]:
+                won[player - 1] |= 1 << small
+                open_smalls ^= 1 << small
+
+                if WINS[won[player - 1]]:
+                    winner = player
+            elif not free[small]:
+                open_smalls ^= 1 << small
+
+            if winner is None and not open_smalls:
+                winner = 0
+
+            next_small = cell if open_smalls >> cell & 1 else -1
+            player = 3 - player
+
+        self.open, self.next, self.player, self.winner = open_smalls, next_small, player, winner
+        return winner
+
+class Node:
+    """
+    A node of the search tree: a position reached by a move, with the results of
+    the rollouts through it from the point of view of the player who made the move.
+    """
+    __slots__ = ("move", "player", "parent", "children", "untried", "visits", "score")
+
+    def __init__(self, move: int, player: int, parent: "Node | None", untried: list[int]):
+        """
+        Initializes the Node.
+
+        Args:
+            move (int): The cell bit of the move reaching the node, -1 for a root.
+            player (int): The player who made the move.
+            parent (Node | None): The parent node, None for a root.
+            untried (list[int]): The legal moves without child nodes yet, in random order.
+        """
+        self.move: int = move
+        self.player: int = player
+        self.parent: Node | None = parent
+        self.children: list[Node] = []
+        self.untried: list[int] = untried
+        self.visits: int = 0
+        self.score: float = 0.0
+
+    def select(self, exploration: float) -> "Node":
+        """
+        Selects the child with the highest upper confidence bound (UCT).
+
+        Args:
+            exploration (float): The exploration constant.
+
+        Returns:
+            Node: The child.
+        """
+        log_visits: float = math.log(self.visits)
+
+        return max(self.children, key=lambda child: child.score / child.visits
+                   + exploration * math.sqrt(log_visits / child.visits))
+
+    def child(self, move: int) -> "Node | None":
+        """
+        Gets the child reached by a move.
+
+        Args:
+            move (int): The cell bit of the move.
+
+        Returns:
+            Node | None: The child, None if it wasn't expanded.
+        """
+        return next((child for child in self.children if child.move == move), None)
+
+class MCTSPlayer(BotPlayer):
+    """
+    A player choosing its moves by Monte Carlo Tree Search. Every iteration descends the tree
+    by UCT, expands one move, plays a random rollout from it and backs the result up.
+    The most visited move is played. The subtree of the position after the opponent's reply
+    is kept, so the next search starts from the iterations already spent on it.
+    The search follows the standard rules, so the player doesn't support test mode
+    (see SearchState.from_board).
+    """
+    def __init__(self,
+                 iterations: int | None = None,
+                 time_limit: float | None = None,
+                 exploration: float = DEFAULT_EXPLORATION):
+        """
+        Initializes the MCTSPlayer. Without a budget, every move is searched
+        for DEFAULT_TIME_LIMIT seconds.
+
+        Args:
+            iterations (int | None, optional): The iterations per move, reproducible unlike
+                a time limit. Defaults to None.
+            time_limit (float | None, optional): The seconds of search per move.
+                Defaults to None.
+            exploration (float, optional): The exploration constant of UCT.
+                Defaults to DEFAULT_EXPLORATION.
+
+        Raises:
+            ValueError: If a budget isn't positive.
+        """
+        if iterations is not None and iterations <= 0 or time_limit is not None and time_limit <= 0:
+            raise ValueError("The search budget must be positive!")
+
+        self.iterations: int | None = iterations
+        self.time_limit: float | None = time_limit if time_limit is not None or iterations \
+            else DEFAULT_TIME_LIMIT
+        self.exploration: float = exploration
+
+        # The root after the last move and the marks of both players in its position
+        self._root: Node | None = None
+        self._root_cells: tuple[int, int] = 0, 0
+
+        # The iterations of the last search, including those reused from the previous move
+        self.last_visits: int = 0
+
+    def get_turn(self, next_board: tuple[int, int], board: Board) -> tuple[int, int, int, int]:
+        """
+        Searches the position and selects the most visited move.
+
+        Args:
+            next_board (tuple[int, int]): The coordinates of the board to play on.
+            board (Board): The current game board.
+
+        Returns:
+            tuple[int, int, int, int]: The coordinates of the selected move.
+        """
+        state: SearchState = SearchState.from_board(board, next_board)
+        root: Node = self._reuse_root(board.cells, state)
+
+        self.search(root, state)
+
+        best: Node = max(root.children, key=lambda child: child.visits)
+        self.last_visits = root.visits
+
+        # The chosen move's subtree is kept for the opponent's reply, the rest is released
+        best.parent = None
+        self._root = best
+        cells_o, cells_x = board.cells
+        self._root_cells = (cells_o | (1 << best.move if state.player == 1 else 0),
+                            cells_x | (1 << best.move if state.player == 2 else 0))
+
+        return CELL_COORDINATES[best.move]
+
+    def _reuse_root(self, cells: tuple[int, int], state: SearchState) -> Node:
+        """
+        Gets the root of the search: the kept node of the opponent's reply if it was expanded
+        and the position follows the last move, otherwise a new node.
+
+        Args:
+            cells (tuple[int, int]): The marks of both players on the board.
+            state (SearchState): The state of the position.
+
+        Returns:
+            Node: The root.
+        """
+        opponent: int = 3 - state.player
+        reply: int = cells[opponent - 1] ^ self._root_cells[opponent - 1]
+        root: Node | None = None
+
+        # The reply is the only new mark since the last move
+        if self._root is not None \
+                and cells[state.player - 1] == self._root_cells[state.player - 1] \
+                and reply.bit_count() == 1 and not reply & self._root_cells[opponent - 1]:
+            root = self._root.child(reply.bit_length() - 1)
+
+        self._root = None
+
+        if root is None:
+            moves: list[int] = state.moves()
+            random.shuffle(moves)
+            return Node(-1, opponent, None, moves)
+
+        root.parent = None
+        return root
+
+    def search(self, root: Node, state: SearchState) -> None:
+        """
+        Runs the search iterations of one move from the root.
+
+        Args:
+            root (Node): The root node.
+            state (SearchState): The state of the root's position, not changed.
+        """
+        deadline: float = math.inf if self.time_limit is None \
+            else time.perf_counter() + self.time_limit
+        iteration: int = 0
+
+        while (self.iterations is None or iteration < self.iterations) \
+                and (iteration == 0 or time.perf_counter() < deadline):
+            iteration += 1
+            node: Node = root
+            current: SearchState = state.copy()
+
+            # Selection, through nodes whose moves were all tried
+            while not node.untried and node.children:
+                node = node.select(self.exploration)
+                current.play(node.move)
+
+            # Expansion, of one untried move
+            if node.untried:
+                move: int = node.untried.pop()
+                mover: int = current.player
+                current.play(move)
+
+                moves: list[int] = current.moves()
+                random.shuffle(moves)
+
+                child: Node = Node(move, mover, node, moves)
+                node.children.append(child)
+                node = child
+
+            winner: int = current.rollout()
+
+            # Backpropagation, scoring 1 for a win and 0.5 for a draw
+            backed: Node | None = node
+
+            while backed is not None:
+                backed.visits += 1
+                backed.score += 1.0 if winner == backed.player else 0.5 if winner == 0 else 0.0
+                backed = backed.parent
+
+    def get_type(self) -> str:
+        """Returns the type of the player as a string."""
+        return "MCTS"
@@ -25,6 +25,23 @@ class Player(ABC):
                                               None if the player quits.
         """
 
+    async def get_turn_async(self,
+                             next_board: tuple[int, int],
+                             board: Board) -> tuple[int, int, int, int] | None:
+        """
+        Gets the next move for the player without blocking other games in the event loop.
+        By default the move is chosen by get_turn.
+
+        Args:
+            next_board (tuple[int, int]): The coordinates of the big board to play on.
+            board (Board): The current game board.
+
+        Returns:
+            tuple[int, int, int, int] | None: The coordinates of the selected move.
+                                              None if the player quits.
+        """
+        return self.get_turn(next_board, board)
+
     @abstractmethod
     def get_type(self) -> str:
         """Returns the type of the player as a string."""
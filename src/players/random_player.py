@@ -22,7 +22,7 @@ class RandomPlayer(BotPlayer):
         Returns:
             tuple[int, int, int, int]: The coordinates of the selected move.
         """
-        return random.choice(list(board.valid_moves(next_board)))
+        return random.choice(board.legal_moves(next_board))
 
     def get_type(self) -> str:
         """Returns the type of the player as a string."""
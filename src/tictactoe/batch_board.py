@@ -0,0 +1,170 @@
+"""
+This module contains the BatchBoard class, which plays many games of Mega Tic Tac Toe at once
+with array operations, following the same rules as Game.take_turn.
+"""
+
+import numpy as np
+from numpy.typing import NDArray
+from src.tictactoe.board import Board, CELL_ACTIONS, CELL_COORDINATES
+from src.tictactoe.small_board_tables import POWERS, WINNERS, FULL
+
+ACTION_CELLS: NDArray[np.intp] = np.argsort(CELL_ACTIONS)
+"""The cell bit (index in the flattened board) of every flat action."""
+
+ACTION_COORDINATES: NDArray[np.intp] = np.array(CELL_COORDINATES)[ACTION_CELLS]
+"""The (big x, big y, small x, small y) of every flat action, shape (81, 4)."""
+
+class BatchBoard:
+    """
+    Represents N simultaneous games. The boards and big boards have the same layout as Board's,
+    with an extra first dimension for the game. Wins and draws are looked up in 
+    small_board_tables by the base-3 codes of the small boards and of the big board's wins.
+    """
+    def __init__(self, count: int):
+        """
+        Initializes the games.
+
+        Args:
+            count (int): The number of games.
+        """
+        self.count: int = count
+
+        self.boards: NDArray[np.int8] = np.zeros((count, 3, 3, 3, 3), dtype=np.int8)
+        self.big_boards: NDArray[np.int8] = np.zeros((count, 3, 3), dtype=np.int8)
+        self.next_boards: NDArray[np.int8] = np.full((count, 2), -1, dtype=np.int8)
+
+        self.current_players: NDArray[np.int8] = np.ones(count, dtype=np.int8)
+        self.winners: NDArray[np.int8] = np.zeros(count, dtype=np.int8)
+        self.done: NDArray[np.bool_] = np.zeros(count, dtype=np.bool_)
+        self.turns: NDArray[np.int16] = np.zeros(count, dtype=np.int16)
+
+        self.codes: NDArray[np.int32] = np.zeros((count, 9), dtype=np.int32)
+        self.big_codes: NDArray[np.int32] = np.zeros(count, dtype=np.int32)
+        self.closed: NDArray[np.int8] = np.zeros(count, dtype=np.int8)
+
+        self._cells: NDArray[np.int8] = self.boards.reshape((count, 81))
+        self._smalls: NDArray[np.int8] = self.boards.reshape((count, 9, 9))
+        self._big_cells: NDArray[np.int8] = self.big_boards.reshape((count, 9))
+
+    def reset(self, games: NDArray[np.bool_] | None = None) -> None:
+        """
+        Resets games to the initial state.
+
+        Args:
+            games (NDArray[np.bool_] | None, optional):
+                A mask of the games to reset. Defaults to None, resetting all games.
+        """
+        if games is None:
+            games = np.ones(self.count, dtype=np.bool_)
+
+        self.boards[games] = Board.EMPTY
+        self.big_boards[games] = Board.EMPTY
+        self.next_boards[games] = -1
+        self.current_players[games] = 1
+        self.winners[games] = 0
+        self.done[games] = False
+        self.turns[games] = 0
+        self.codes[games] = 0
+        self.big_codes[games] = 0
+        self.closed[games] = 0
+
+    def reset_done(self) -> NDArray[np.bool_]:
+        """
+        Resets the finished games.
+
+        Returns:
+            NDArray[np.bool_]: A mask of the games which were reset.
+        """
+        finished: NDArray[np.bool_] = self.done.copy()
+        self.reset(finished)
+
+        return finished
+
+    def legal_action_masks(self) -> NDArray[np.bool_]:
+        """
+        Gets the legal actions of every game, in flat action order. Finished games have none.
+
+        Returns:
+            NDArray[np.bool_]: The legal action masks, shape (N, 81).
+        """
+        next_smalls: NDArray[np.intp] = \
+            3 * self.next_boards[:, 1].astype(np.intp) + self.next_boards[:, 0]
+
+        playable: NDArray[np.bool_] = (self._big_cells == Board.EMPTY) \
+            & ((self.next_boards[:, :1] < 0) | (np.arange(9) == next_smalls[:, np.newaxis])) \
+            & ~self.done[:, np.newaxis]
+
+        legal: NDArray[np.bool_] = \
+            (self._smalls == Board.EMPTY) & playable[:, :, np.newaxis]
+
+        return legal.reshape((self.count, 81))[:, ACTION_CELLS]
+
+    def play(self,
+             actions: NDArray[np.integer],
+             active: NDArray[np.bool_] | None = None) -> \
+        tuple[NDArray[np.bool_], NDArray[np.bool_]]:
+        """
+        Plays a flat action (see action_coordinates) for the current player of every game.
+        Illegal actions and finished games are left unchanged.
+
+        Args:
+            actions (NDArray[np.integer]): The action of every game, shape (N,).
+            active (NDArray[np.bool_] | None, optional):
+                A mask of the games to play in. Defaults to None, playing in all games.
+
+        Returns:
+            tuple[NDArray[np.bool_], NDArray[np.bool_]]:
+                A mask of the games where the action was legal and was played,
+                and a mask of the games where it won a small board.
+        """
+        actions = np.asarray(actions, dtype=np.intp)
+        big_x, big_y, small_x, small_y = ACTION_COORDINATES[actions].T
+
+        small: NDArray[np.intp] = 3 * big_y + big_x
+        cell: NDArray[np.intp] = ACTION_CELLS[actions]
+        games: NDArray[np.intp] = np.arange(self.count)
+
+        legal: NDArray[np.bool_] = ~self.done \
+            & (self._cells[games, cell] == Board.EMPTY) \
+            & (self._big_cells[games, small] == Board.EMPTY) \
+            & ((self.next_boards[:, 0] < 0)
+               | ((self.next_boards[:, 0] == big_x) & (self.next_boards[:, 1] == big_y)))
+
+        if active is not None:
+            legal &= active
+
+        small_wins: NDArray[np.bool_] = np.zeros(self.count, dtype=np.bool_)
+
+        played: NDArray[np.intp] = games[legal]
+        small, cell = small[legal], cell[legal]
+        players: NDArray[np.int8] = self.current_players[played]
+
+        self._cells[played, cell] = players
+
+        codes: NDArray[np.int32] = self.codes[played, small] + players * POWERS[cell % 9]
+        self.codes[played, small] = codes
+
+        won: NDArray[np.bool_] = WINNERS[codes] == players
+        full: NDArray[np.bool_] = ~won & FULL[codes]
+
+        self._big_cells[played[won], small[won]] = players[won]
+        self._big_cells[played[full], small[full]] = Board.FULL
+        small_wins[played] = won
+
+        self.big_codes[played[won]] += players[won] * POWERS[small[won]]
+        self.closed[played] += won | full
+
+        big_won: NDArray[np.bool_] = won & (WINNERS[self.big_codes[played]] == players)
+
+        self.winners[played[big_won]] = players[big_won]
+        self.done[played] = big_won | (self.closed[played] == 9)
+
+        target: NDArray[np.intp] = 3 * small_y[legal] + small_x[legal]
+        target_open: NDArray[np.bool_] = self._big_cells[played, target] == Board.EMPTY
+        self.next_boards[played, 0] = np.where(target_open, small_x[legal], -1)
+        self.next_boards[played, 1] = np.where(target_open, small_y[legal], -1)
+
+        self.current_players[played] = 3 - players
+        self.turns[played] += 1
+
+        return legal, small_wins
@@ -1,5 +1,9 @@
 """
 This module contains the Board class, which represents the 3x3x3x3 board for Mega Tic Tac Toe.
+
+Internally the board is stored as integer bitmasks. Bit ``27 * big_y + 9 * big_x + 3 * small_y +
+small_x`` stands for the cell ``board[big_y, big_x, small_y, small_x]``, so every small board
+occupies 9 consecutive bits and big board cell ``3 * big_y + big_x`` is bit ``3 * big_y + big_x``.
 """
 
 from typing import Generator
@@ -7,6 +11,91 @@ from collections import defaultdict
 import numpy as np
 from numpy.typing import NDArray
 from colorama import Fore, Style
+from src.tictactoe.zobrist import CELL_KEYS, hash_cells
+from src.tictactoe.encoding import BOARD_BYTES, pack_boards, unpack_boards
+from src.tictactoe.small_board_tables import POWERS, TERNARY_CODES, WINNERS
+
+SMALL_MASK: int = 0x1FF
+"""The mask of a single 3x3 board."""
+
+WIN_LINES: tuple[int, ...] = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100
+)
+"""The masks of the rows, columns and diagonals of a 3x3 board."""
+
+CELL_LINES: tuple[tuple[int, ...], ...] = \
+    tuple(tuple(index for index, line in enumerate(WIN_LINES) if line >> cell & 1)
+          for cell in range(9))
+"""The indexes in WIN_LINES of the lines passing through each cell of a 3x3 board."""
+
+BIG: int = 9
+"""The index used for the big board in the per-board line counters and fill counts."""
+
+PATTERN_CELLS: tuple[tuple[int, ...], ...] = \
+    tuple(tuple(cell for cell in range(9) if pattern >> cell & 1) for pattern in range(512))
+"""The indexes of the set bits of every 9 bit pattern, in ascending order."""
+
+CELL_COORDINATES: tuple[tuple[int, int, int, int], ...] = \
+    tuple((bit // 9 % 3, bit // 27, bit % 3, bit // 3 % 3) for bit in range(81))
+"""The (big x, big y, small x, small y) coordinates of every cell bit."""
+
+CELL_ACTIONS: tuple[int, ...] = \
+    tuple(9 * (3 * big_y + small_y) + 3 * big_x + small_x
+          for big_x, big_y, small_x, small_y in CELL_COORDINATES)
+"""The flat action (row by row over the whole 9x9 grid) of every cell bit."""
+
+SMALL_MOVES: tuple[tuple[tuple[tuple[int, int, int, int], ...], ...], ...] = \
+    tuple(tuple(tuple(CELL_COORDINATES[9 * small + cell] for cell in PATTERN_CELLS[pattern])
+                for pattern in range(512))
+          for small in range(9))
+"""The moves of every free cell pattern of every small board, indexed by [small][pattern]."""
+
+SMALL_ACTION_BITS: tuple[tuple[int, ...], ...] = \
+    tuple(tuple(sum(1 << CELL_ACTIONS[9 * small + cell] for cell in PATTERN_CELLS[pattern])
+                for pattern in range(512))
+          for small in range(9))
+"""The action bitmask of every free cell pattern of every small board."""
+
+def is_win(pattern: int) -> bool:
+    """
+    Checks if a 3x3 bit pattern contains a full line.
+
+    Args:
+        pattern (int): The 9 bit pattern of a player's marks.
+
+    Returns:
+        bool: True if the pattern contains a row, column or diagonal, False otherwise.
+    """
+    return any(pattern & line == line for line in WIN_LINES)
+
+def mask_to_array(mask: int, length: int) -> NDArray[np.uint8]:
+    """
+    Unpacks the lowest bits of an integer bitmask into an array of zeroes and ones.
+
+    Args:
+        mask (int): The bitmask.
+        length (int): The number of bits to unpack.
+
+    Returns:
+        NDArray[np.uint8]: The unpacked bits, least significant first.
+    """
+    packed: NDArray[np.uint8] = np.frombuffer(mask.to_bytes((length + 7) // 8, "little"), np.uint8)
+    return np.unpackbits(packed, count=length, bitorder="little")
+
+def array_to_mask(bits: NDArray) -> int:
+    """
+    Packs a flat boolean array into an integer bitmask.
+
+    Args:
+        bits (NDArray): The bits, least significant first.
+
+    Returns:
+        int: The bitmask.
+    """
+    return int.from_bytes(np.packbits(np.asarray(bits, dtype=bool), bitorder="little").tobytes(),
+                          "little")
 
 class Board:
     """
@@ -25,8 +114,37 @@ class Board:
             player1 (str, optional): The symbol for player 1. Defaults to "O".
             player2 (str, optional): The symbol for player 2. Defaults to "X".
         """
-        self.board: NDArray[np.int8] = np.full((3, 3, 3, 3), self.EMPTY)
-        self.big_board: NDArray[np.int8] = np.full((3, 3), self.EMPTY)
+        # Index 0 holds the union of both players
+        self._cells: list[int] = [0, 0, 0]
+        self._won: list[int] = [0, 0, 0]
+
+        # Per player marks on each of the 8 lines of the small boards 0 - 8 and the big board 9,
+        # and the number of filled cells of each small board and of closed small boards
+        self._lines: tuple[list[int], ...] = ([], [0] * 80, [0] * 80)
+        self._filled: list[int] = [0] * 10
+        self._big_won: list[bool] = [False, False, False]
+
+        # Legal move index: the free cells of every small board, the open small boards
+        # and the legal moves cached per next board until the next move
+        self._free: list[int] = [SMALL_MASK] * 9
+        self._open: int = SMALL_MASK
+        self._legal_moves: dict[tuple[int, int], tuple[tuple[int, int, int, int], ...]] = {}
+
+        # The (player, small board, cell) of every played move, used for undoing
+        self._history: list[tuple[int, int, int]] = []
+        self._zobrist_key: int = 0
+
+        # The cells and big board cells as bytes (FULL stored as 255) updated with every move,
+        # shared with the int8 array views
+        self._board_bytes: bytearray = bytearray(81)
+        self._big_board_bytes: bytearray = bytearray(9)
+
+        self._board_view: NDArray[np.int8] = \
+            np.frombuffer(self._board_bytes, dtype=np.int8).reshape(3, 3, 3, 3)
+        self._big_board_view: NDArray[np.int8] = \
+            np.frombuffer(self._big_board_bytes, dtype=np.int8).reshape(3, 3)
+        self._board_view.flags.writeable = False
+        self._big_board_view.flags.writeable = False
 
         self.player_symbols: defaultdict[int, str] = defaultdict(str, {
             self.EMPTY: ".",
@@ -34,6 +152,108 @@ class Board:
             2: player2
         })
 
+    @property
+    def board(self) -> NDArray[np.int8]:
+        """
+        A read-only 3x3x3x3 array view of the board, indexed by [big y, big x, small y, small x].
+        The view is live - it changes with every move, so copy it to keep a snapshot.
+        """
+        return self._board_view
+
+    @board.setter
+    def board(self, board: NDArray) -> None:
+        """
+        Replaces the whole board and recalculates the big board from it.
+
+        Args:
+            board (NDArray): A 3x3x3x3 array of the cells.
+        """
+        flat: NDArray = np.asarray(board).reshape(81)
+        self._cells[1] = array_to_mask(flat == 1)
+        self._cells[2] = array_to_mask(flat == 2)
+        self._cells[0] = self._cells[1] | self._cells[2]
+
+        self._won = [0, 0, 0]
+
+        for small in range(9):
+            shift: int = 9 * small
+
+            for player in (1, 2):
+                if is_win(self._cells[player] >> shift & SMALL_MASK):
+                    self._won[player] |= 1 << small
+                    break
+
+            if self._cells[0] >> shift & SMALL_MASK == SMALL_MASK:
+                self._won[0] |= 1 << small
+
+        self._won[0] |= self._won[1] | self._won[2]
+        self._rebuild_counters()
+
+    @property
+    def big_board(self) -> NDArray[np.int8]:
+        """
+        A read-only 3x3 array view of the big board, indexed by [big y, big x].
+        The view is live - it changes with every move, so copy it to keep a snapshot.
+        """
+        return self._big_board_view
+
+    @big_board.setter
+    def big_board(self, big_board: NDArray) -> None:
+        """
+        Replaces the state of the big board.
+
+        Args:
+            big_board (NDArray): A 3x3 array of the big board cells.
+        """
+        flat: NDArray = np.asarray(big_board).reshape(9)
+        self._won[1] = array_to_mask(flat == 1)
+        self._won[2] = array_to_mask(flat == 2)
+        self._won[0] = array_to_mask(flat != self.EMPTY)
+        self._rebuild_counters()
+
+    def _rebuild_counters(self) -> None:
+        """
+        Recalculates the line counters, fill counts, legal move index and arrays from the bitboards.
+        """
+        for player in (1, 2):
+            lines: list[int] = self._lines[player]
+
+            for small in range(BIG + 1):
+                pattern: int = self._won[player] if small == BIG \
+                    else self._cells[player] >> (9 * small) & SMALL_MASK
+
+                for index, line in enumerate(WIN_LINES):
+                    lines[8 * small + index] = (pattern & line).bit_count()
+
+            self._big_won[player] = 3 in lines[8 * BIG:]
+
+        self._filled = [(self._cells[0] >> (9 * small) & SMALL_MASK).bit_count()
+                        for small in range(9)]
+        self._filled.append(self._won[0].bit_count())
+
+        self._free = [~self._cells[0] >> (9 * small) & SMALL_MASK for small in range(9)]
+        self._open = ~self._won[0] & SMALL_MASK
+        self._legal_moves.clear()
+        self._history.clear()
+        self._zobrist_key = hash_cells(self._cells)
+
+        drawn: int = self._won[0] & ~(self._won[1] | self._won[2])
+        self._board_bytes[:] = \
+            (mask_to_array(self._cells[1], 81) + 2 * mask_to_array(self._cells[2], 81)).tobytes()
+        self._big_board_bytes[:] = (mask_to_array(self._won[1], 9)
+                                    + 2 * mask_to_array(self._won[2], 9)
+                                    + 255 * mask_to_array(drawn, 9)).tobytes()
+
+    @property
+    def cells(self) -> tuple[int, int]:
+        """The 81 bit cell masks of player 1 and player 2."""
+        return self._cells[1], self._cells[2]
+
+    @property
+    def zobrist_key(self) -> int:
+        """The 64 bit Zobrist hash of the marks on the board, updated with every move."""
+        return self._zobrist_key
+
     def play_turn(self, player: int, big_x: int, big_y: int, small_x: int, small_y: int) -> bool:
         """
         Plays a turn for the specified player.
@@ -48,22 +268,99 @@ class Board:
         Returns:
             bool: True if the turn was successful, False otherwise.
         """
-        if not { big_x, big_y, small_x, small_y } <= { 0, 1, 2 }:
+        if not (0 <= big_x <= 2 and 0 <= big_y <= 2 and 0 <= small_x <= 2 and 0 <= small_y <= 2):
+            return False
+
+        # The masks are Python ints, so NumPy coordinates (e.g. from an agent) are converted
+        big_x, big_y, small_x, small_y = int(big_x), int(big_y), int(small_x), int(small_y)
+
+        small: int = 3 * big_y + big_x
+        shift: int = 9 * small
+        cell: int = 3 * small_y + small_x
+        bit: int = 1 << (shift + cell)
+
+        if not self._open >> small & 1 or self._cells[0] & bit:
             return False
 
-        current_board: NDArray[np.int8] = self.board[big_y, big_x]
+        self._cells[0] |= bit
+        self._cells[player] |= bit
+        self._free[small] ^= 1 << cell
+        self._zobrist_key ^= CELL_KEYS[player][shift + cell]
+        self._board_bytes[shift + cell] = player
+
+        lines: list[int] = self._lines[player]
+        base: int = 8 * small
+        won: bool = False
+
+        for index in CELL_LINES[cell]:
+            lines[base + index] += 1
+            won |= lines[base + index] == 3
+
+        self._filled[small] += 1
+
+        if won:
+            self._won[player] |= 1 << small
+            self._won[0] |= 1 << small
+            self._open ^= 1 << small
+            self._filled[BIG] += 1
+            self._big_board_bytes[small] = player
+
+            for index in CELL_LINES[small]:
+                lines[8 * BIG + index] += 1
+                self._big_won[player] |= lines[8 * BIG + index] == 3
+        elif self._filled[small] == 9:
+            self._won[0] |= 1 << small
+            self._open ^= 1 << small
+            self._filled[BIG] += 1
+            self._big_board_bytes[small] = self.FULL & 255
+
+        self._history.append((player, small, cell))
+        self._legal_moves.clear()
+        return True
+
+    def undo(self) -> bool:
+        """
+        Takes back the last played turn. The small board was open before the turn, 
+        so if it is closed now the turn has closed it and it is reopened.
 
-        if self.big_board[big_y, big_x] != self.EMPTY \
-            or current_board[small_y, small_x] != self.EMPTY:
+        Returns:
+            bool: True if a turn was taken back, False if there are no played turns.
+        """
+        if not self._history:
             return False
 
-        current_board[small_y, small_x] = player
+        player, small, cell = self._history.pop()
+        lines: list[int] = self._lines[player]
+
+        if not self._open >> small & 1:
+            self._open |= 1 << small
+            self._won[0] ^= 1 << small
+            self._filled[BIG] -= 1
+            self._big_board_bytes[small] = self.EMPTY
+
+            if self._won[player] >> small & 1:
+                self._won[player] ^= 1 << small
+
+                for index in CELL_LINES[small]:
+                    lines[8 * BIG + index] -= 1
+
+                self._big_won[player] = 3 in lines[8 * BIG:]
+
+        base: int = 8 * small
 
-        if Board.check_board_win(current_board, player):
-            self.big_board[big_y, big_x] = player
-        elif (current_board != self.EMPTY).all():
-            self.big_board[big_y, big_x] = self.FULL
+        for index in CELL_LINES[cell]:
+            lines[base + index] -= 1
 
+        self._filled[small] -= 1
+
+        bit: int = 1 << (9 * small + cell)
+        self._cells[0] ^= bit
+        self._cells[player] ^= bit
+        self._free[small] |= 1 << cell
+        self._zobrist_key ^= CELL_KEYS[player][9 * small + cell]
+        self._board_bytes[9 * small + cell] = self.EMPTY
+
+        self._legal_moves.clear()
         return True
 
     def check_small_board_valid(self, big_x: int, big_y: int) -> bool:
@@ -78,7 +375,22 @@ class Board:
         Returns:
             bool: True if the small board is valid, False otherwise.
         """
-        return self.big_board[big_y, big_x] == self.EMPTY
+        return bool(self._open >> (3 * big_y + big_x) & 1)
+
+    def small_code(self, big_x: int, big_y: int) -> int:
+        """
+        Gets the base-3 code of a small board, used to index the tables in small_board_tables.
+
+        Args:
+            big_x (int): The big board x-coordinate of the small board.
+            big_y (int): The big board y-coordinate of the small board.
+
+        Returns:
+            int: The code of the small board.
+        """
+        shift: int = 9 * (3 * big_y + big_x)
+        return int(TERNARY_CODES[self._cells[1] >> shift & SMALL_MASK]
+                   + 2 * TERNARY_CODES[self._cells[2] >> shift & SMALL_MASK])
 
     def check_small_win(self, player: int, big_x: int, big_y: int) -> bool:
         """
@@ -92,7 +404,7 @@ class Board:
         Returns:
             bool: True if the player has won the small board, False otherwise.
         """
-        return self.big_board[big_y, big_x] == player
+        return bool(self._won[player] >> (3 * big_y + big_x) & 1)
 
     def check_big_win(self, player: int) -> bool:
         """
@@ -104,7 +416,7 @@ class Board:
         Returns:
             bool: True if the player has won the big board, False otherwise.
         """
-        return Board.check_board_win(self.big_board, player)
+        return self._big_won[player]
 
     def is_full(self) -> bool:
         """
@@ -113,8 +425,7 @@ class Board:
         Returns:
             bool: True if the board is full, False otherwise.
         """
-        return all(not self.check_small_board_valid(big_x, big_y)
-                   for big_x in range(3) for big_y in range(3))
+        return self._filled[BIG] == 9
 
     def valid_moves(self, next_board: tuple[int, int]) -> \
         Generator[tuple[int, int, int, int], None, None] :
@@ -128,10 +439,90 @@ class Board:
         Returns:
             Generator[tuple[int, int, int, int], None, None]: A generator of valid moves.
         """
-        return ((int(big_x), int(big_y), int(small_x), int(small_y))
-                for big_y, big_x, small_y, small_x in np.argwhere(self.board == Board.EMPTY)
-                if next_board in { (-1, -1), (big_x, big_y) }
-                    and self.big_board[big_y, big_x] == self.EMPTY)
+        return (move for move in self.legal_moves(next_board))
+
+    def legal_moves(self, next_board: tuple[int, int]) -> tuple[tuple[int, int, int, int], ...]:
+        """
+        Gets the legal moves for the specified small board, ordered by 
+        [big y, big x, small y, small x]. If next is (-1, -1) then for all open small boards.
+        The result is cached until the next move.
+
+        Args:
+            next_board (tuple[int, int]): The next board to play on.
+
+        Returns:
+            tuple[tuple[int, int, int, int], ...]: The legal moves.
+        """
+        moves: tuple[tuple[int, int, int, int], ...] | None = self._legal_moves.get(next_board)
+
+        if moves is None:
+            moves = ()
+
+            for small in self._next_smalls(next_board):
+                moves += SMALL_MOVES[small][self._free[small]]
+
+            self._legal_moves[next_board] = moves
+
+        return moves
+
+    def count_legal_moves(self, next_board: tuple[int, int]) -> int:
+        """
+        Counts the legal moves for the specified small board.
+        If next is (-1, -1) then for all open small boards.
+
+        Args:
+            next_board (tuple[int, int]): The next board to play on.
+
+        Returns:
+            int: The number of legal moves.
+        """
+        return sum(self._free[small].bit_count() for small in self._next_smalls(next_board))
+
+    def legal_action_bits(self, next_board: tuple[int, int]) -> int:
+        """
+        Gets the legal moves as a bitmask of flat actions, where action 
+        9 * (3 * big y + small y) + 3 * big x + small x is bit number action.
+
+        Args:
+            next_board (tuple[int, int]): The next board to play on.
+
+        Returns:
+            int: The 81 bit legal action mask.
+        """
+        bits: int = 0
+
+        for small in self._next_smalls(next_board):
+            bits |= SMALL_ACTION_BITS[small][self._free[small]]
+
+        return bits
+
+    def legal_action_mask(self, next_board: tuple[int, int]) -> NDArray[np.bool_]:
+        """
+        Gets the legal moves as a boolean array, indexed by flat action.
+
+        Args:
+            next_board (tuple[int, int]): The next board to play on.
+
+        Returns:
+            NDArray[np.bool_]: An array of 81 booleans, True for the legal actions.
+        """
+        return mask_to_array(self.legal_action_bits(next_board), 81).view(np.bool_)
+
+    def _next_smalls(self, next_board: tuple[int, int]) -> tuple[int, ...]:
+        """
+        Gets the indexes of the open small boards which can be played on.
+
+        Args:
+            next_board (tuple[int, int]): The next board to play on.
+
+        Returns:
+            tuple[int, ...]: The indexes (3 * big y + big x) of the small boards.
+        """
+        if next_board == (-1, -1):
+            return PATTERN_CELLS[self._open]
+
+        small: int = 3 * next_board[1] + next_board[0]
+        return (small,) if self._open >> small & 1 else ()
 
     def to_string(self,
                   *,
@@ -205,6 +596,37 @@ class Board:
 
         return result
 
+    def to_bytes(self) -> bytes:
+        """
+        Packs the board and the big board into BOARD_BYTES bytes (see encoding.py).
+
+        Returns:
+            bytes: The packed board.
+        """
+        return pack_boards(self.board[np.newaxis], self.big_board[np.newaxis])[0].tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, player1: str = "O", player2: str = "X") -> "Board":
+        """
+        Unpacks a board packed by to_bytes.
+
+        Args:
+            data (bytes): The packed board.
+            player1 (str, optional): The symbol for player 1. Defaults to "O".
+            player2 (str, optional): The symbol for player 2. Defaults to "X".
+
+        Returns:
+            Board: The unpacked board.
+        """
+        boards, big_boards = \
+            unpack_boards(np.frombuffer(data, dtype=np.uint8, count=BOARD_BYTES)[np.newaxis])
+
+        board: Board = cls(player1, player2)
+        board.board = boards[0]
+        board.big_board = big_boards[0]
+
+        return board
+
     def __str__(self) -> str:
         """
         Converts the board to a string representation.
@@ -226,12 +648,4 @@ class Board:
         Returns:
             bool: True if the player has won the board, False otherwise.
         """
-        for i in range(3):
-            if (board[i] == player).all() \
-                or (board[:, i] == player).all() \
-                or (np.diag(board) == player).all() \
-                or (np.diag(np.fliplr(board)) == player).all():
-
-                return True
-
-        return False
+        return bool(WINNERS[((np.asarray(board).reshape(9) == player) * POWERS).sum()] == 1)
@@ -8,7 +8,6 @@ from src.tictactoe.game import Game
 from src.players.player import Player
 from src.players.console_player import ConsolePlayer
 from src.players.random_player import RandomPlayer
-from src.players.ai_player import AIPlayer
 from src.agent.choose_agent import choose_agent
 from src.utils import cond_input_or_quit
 
@@ -28,7 +27,8 @@ class ConsoleGame(Game):
         Initializes the console game.
 
         Args:
-            mode (int): Represents the opponent choice (1 - another human, 2 - random bot, 3 - AI).
+            mode (int): Represents the opponent choice (1 - another human, 2 - random bot, 3 - AI,
+                4 - Monte Carlo Tree Search bot).
             test_mode (bool, optional): Whether the game is in test mode. Defaults to False.
             is_o (bool, optional): Whether the player is O. Defaults to True.
             auto_save (bool, optional): Whether to auto-save the game. Defaults to True.
@@ -38,10 +38,18 @@ class ConsoleGame(Game):
 
         opponents: dict[int, Player] = {
             1: ConsolePlayer(),
-            2: RandomPlayer(),
-            3: AIPlayer(agent_name) if agent_name != "" else RandomPlayer()
+            2: RandomPlayer()
         }
 
+        if mode == 3:
+            # The ML stack is only imported for games against a trained AI
+            from src.players.ai_player import AIPlayer  # pylint: disable=import-outside-toplevel
+            opponents[3] = AIPlayer(agent_name) if agent_name != "" else RandomPlayer()
+        elif mode == 4:
+            # The search bot is only built for games against it
+            from src.players import mcts_player  # pylint: disable=import-outside-toplevel
+            opponents[4] = mcts_player.MCTSPlayer()
+
         self.players: dict[int, Player] = {
             self.player1: ConsolePlayer() if is_o else opponents[mode],
             self.player2: opponents[mode] if is_o else ConsolePlayer()
@@ -132,10 +140,11 @@ class ConsoleGame(Game):
             print("1. Play hot-seat multiplayer")
             print("2. Play against radomized actions bot")
             print("3. Play against trained AI")
+            print("4. Play against Monte Carlo Tree Search bot")
 
-            mode: int = int(cond_input_or_quit(lambda x: x.isdigit() and 1 <= int(x) <= 3,
+            mode: int = int(cond_input_or_quit(lambda x: x.isdigit() and 1 <= int(x) <= 4,
                                                "",
-                                               "Invalid input. Please try again (1 - 3): "))
+                                               "Invalid input. Please try again (1 - 4): "))
 
             is_o: bool = cond_input_or_quit(lambda x: x.lower() in { "o", "x", "1", "2" },
                                             "Play as O (1st) or X (2nd)? ",
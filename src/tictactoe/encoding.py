@@ -0,0 +1,122 @@
+"""
+This module contains the packed binary encoding of Mega Tic Tac Toe positions.
+
+A position takes POSITION_BYTES bytes:
+    - bytes 0 - 16: the 81 cells in [big y, big x, small y, small x] order,
+      5 base-3 digits (0 - 242) per byte, the first cell being the least significant digit
+    - bytes 17 - 19: the 9 big board cells in [big y, big x] order, 2 bits per cell
+      (0 - empty, 1 and 2 - won by a player, 3 - full), the first cell in the lowest bits
+    - byte 20: the small board to play on in the low 4 bits (0 - any, 1 + 3 * y + x otherwise)
+      and the player to move minus one in bit 4
+
+A board alone (without the next board and the player to move) takes the first BOARD_BYTES bytes.
+All functions work on arrays of many positions at once.
+"""
+
+import numpy as np
+from numpy.typing import NDArray
+
+BOARD_BYTES: int = 20
+"""The number of bytes of an encoded board."""
+
+POSITION_BYTES: int = 21
+"""The number of bytes of an encoded position."""
+
+_CELL_DIGITS: NDArray[np.uint8] = (3 ** np.arange(5)).astype(np.uint8)
+_BIG_SHIFTS: NDArray[np.uint8] = np.arange(0, 8, 2, dtype=np.uint8)
+
+def pack_boards(boards: NDArray, big_boards: NDArray) -> NDArray[np.uint8]:
+    """
+    Packs boards and big boards.
+
+    Args:
+        boards (NDArray): The boards, shape (N, 3, 3, 3, 3).
+        big_boards (NDArray): The big boards, shape (N, 3, 3).
+
+    Returns:
+        NDArray[np.uint8]: The packed boards, shape (N, BOARD_BYTES).
+    """
+    count: int = boards.shape[0]
+    packed: NDArray[np.uint8] = np.empty((count, BOARD_BYTES), dtype=np.uint8)
+
+    cells: NDArray[np.uint8] = np.zeros((count, 85), dtype=np.uint8)
+    cells[:, :81] = boards.reshape((count, 81))
+    packed[:, :17] = (cells.reshape((count, 17, 5)) * _CELL_DIGITS).sum(axis=2, dtype=np.uint8)
+
+    big: NDArray[np.uint8] = np.zeros((count, 12), dtype=np.uint8)
+    big[:, :9] = big_boards.reshape((count, 9)).astype(np.int8).view(np.uint8) & 3
+    packed[:, 17:] = (big.reshape((count, 3, 4)) << _BIG_SHIFTS).sum(axis=2, dtype=np.uint8)
+
+    return packed
+
+def unpack_boards(packed: NDArray[np.uint8]) -> tuple[NDArray[np.int8], NDArray[np.int8]]:
+    """
+    Unpacks boards and big boards.
+
+    Args:
+        packed (NDArray[np.uint8]): The packed boards or positions, shape (N, BOARD_BYTES or more).
+
+    Returns:
+        tuple[NDArray[np.int8], NDArray[np.int8]]:
+            The boards, shape (N, 3, 3, 3, 3), and the big boards, shape (N, 3, 3).
+    """
+    count: int = packed.shape[0]
+
+    cells: NDArray[np.uint8] = packed[:, :17, np.newaxis] // _CELL_DIGITS % 3
+    boards: NDArray[np.int8] = \
+        cells.reshape((count, 85))[:, :81].astype(np.int8).reshape((count, 3, 3, 3, 3))
+
+    big: NDArray[np.uint8] = packed[:, 17:BOARD_BYTES, np.newaxis] >> _BIG_SHIFTS & np.uint8(3)
+    big_boards: NDArray[np.int8] = big.reshape((count, 12))[:, :9].astype(np.int8)
+    big_boards[big_boards == 3] = -1
+
+    return boards, big_boards.reshape((count, 3, 3))
+
+def pack_positions(boards: NDArray,
+                   big_boards: NDArray,
+                   next_boards: NDArray,
+                   players: NDArray) -> NDArray[np.uint8]:
+    """
+    Packs whole positions.
+
+    Args:
+        boards (NDArray): The boards, shape (N, 3, 3, 3, 3).
+        big_boards (NDArray): The big boards, shape (N, 3, 3).
+        next_boards (NDArray): The (x, y) of the small boards to play on, shape (N, 2).
+        players (NDArray): The players to move (1 or 2), shape (N,).
+
+    Returns:
+        NDArray[np.uint8]: The packed positions, shape (N, POSITION_BYTES).
+    """
+    next_boards = np.asarray(next_boards, dtype=np.int16)
+    next_index: NDArray[np.int16] = \
+        np.where(next_boards[:, 0] < 0, 0, 1 + 3 * next_boards[:, 1] + next_boards[:, 0])
+
+    packed: NDArray[np.uint8] = np.empty((boards.shape[0], POSITION_BYTES), dtype=np.uint8)
+    packed[:, :BOARD_BYTES] = pack_boards(boards, big_boards)
+    packed[:, BOARD_BYTES] = next_index | (np.asarray(players, dtype=np.int16) - 1) << 4
+
+    return packed
+
+def unpack_positions(packed: NDArray[np.uint8]) -> \
+    tuple[NDArray[np.int8], NDArray[np.int8], NDArray[np.int8], NDArray[np.int8]]:
+    """
+    Unpacks whole positions.
+
+    Args:
+        packed (NDArray[np.uint8]): The packed positions, shape (N, POSITION_BYTES).
+
+    Returns:
+        tuple[NDArray[np.int8], NDArray[np.int8], NDArray[np.int8], NDArray[np.int8]]:
+            The boards, big boards, (x, y) of the small boards to play on
+            ((-1, -1) for any) and players to move.
+    """
+    boards, big_boards = unpack_boards(packed)
+
+    next_index: NDArray[np.int8] = (packed[:, BOARD_BYTES] & 15).astype(np.int8) - 1
+    next_boards: NDArray[np.int8] = np.stack([next_index % 3, next_index // 3], axis=1)
+    next_boards[next_index < 0] = -1
+
+    players: NDArray[np.int8] = (packed[:, BOARD_BYTES] >> 4).astype(np.int8) + 1
+
+    return boards, big_boards, next_boards, players
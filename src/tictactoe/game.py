@@ -7,6 +7,8 @@ from typing import Any
 import asyncio
 import numpy as np
 from src.tictactoe.board import Board
+from src.tictactoe.zobrist import PLAYER_KEYS, NEXT_KEYS
+from src.tictactoe.encoding import POSITION_BYTES, pack_positions, unpack_positions
 from src.players.player import Player
 from src.saving.save_manager import save_json
 
@@ -48,6 +50,17 @@ class Game:
         self.turns: int = 0
         self.tasks: set[asyncio.Task] = set()
 
+        # The next board, current player, winner and turns before every taken turn
+        self.history: list[tuple[tuple[int, int], int, int | None, int]] = []
+
+    @property
+    def position_key(self) -> int:
+        """
+        The 64 bit Zobrist hash of the position: the marks on the board, 
+        the player to move and the small board to play on.
+        """
+        return self.board.zobrist_key ^ PLAYER_KEYS[self.current_player] ^ NEXT_KEYS[self.next]
+
     def switch_player(self) -> None:
         """Switches the current player."""
         self.current_player = self.player1 + self.player2 - self.current_player
@@ -69,6 +82,8 @@ class Game:
             or not self.board.play_turn(self.current_player, big_x, big_y, small_x, small_y):
             raise RuntimeError("An unknown error occurred!")
 
+        self.history.append((self.next, self.current_player, self.winner, self.turns))
+
         if self.board.check_small_win(self.current_player, big_x, big_y):
             if self.board.check_big_win(self.current_player):
                 self.winner = self.current_player
@@ -82,6 +97,18 @@ class Game:
         if not self.test_mode:
             self.switch_player()
 
+    def undo_turn(self) -> None:
+        """
+        Takes back the last turn, restoring the board and the state before it.
+
+        Raises:
+            RuntimeError: If no turns were taken.
+        """
+        if not self.history or not self.board.undo():
+            raise RuntimeError("There is no turn to undo!")
+
+        self.next, self.current_player, self.winner, self.turns = self.history.pop()
+
     async def play_turn(self) -> tuple[int, int, int, int]:
         """
         Plays a turn for the current player adn autosaves if needed.
@@ -91,7 +118,7 @@ class Game:
         """
         #Turn is guaranteed to be valid by Player
         turn: tuple[int, int, int, int] | None = \
-            self.players[self.current_player].get_turn(self.next, self.board)
+            await self.players[self.current_player].get_turn_async(self.next, self.board)
 
         if turn is None:
             await self.save()
@@ -122,6 +149,19 @@ class Game:
             "agent_name": self.agent_name
         }
 
+    def to_bytes(self) -> bytes:
+        """
+        Packs the position - the board, the small board to play on and the player to move -
+        into POSITION_BYTES bytes (see encoding.py).
+
+        Returns:
+            bytes: The packed position.
+        """
+        return pack_positions(self.board.board[np.newaxis],
+                              self.board.big_board[np.newaxis],
+                              np.array([self.next]),
+                              np.array([self.current_player]))[0].tobytes()
+
     async def save(self, file_name: str | None = None) -> None:
         """
         Saves the game state to a file. 
@@ -179,3 +219,27 @@ class Game:
         game.next = (data["next"][0], data["next"][1])
 
         return game
+
+    @classmethod
+    def from_bytes(cls, data: bytes, mode: int, *, agent_name: str = ""):
+        """
+        Loads a position packed by to_bytes.
+
+        Args:
+            data (bytes): The packed position.
+            mode (int): The game mode, representing the opponent.
+            agent_name (str, optional): The name of the AI agent. Defaults to "".
+
+        Returns:
+            Game: The loaded game.
+        """
+        boards, big_boards, next_boards, players = \
+            unpack_positions(np.frombuffer(data, dtype=np.uint8, count=POSITION_BYTES)[np.newaxis])
+
+        game = cls(mode, agent_name=agent_name)
+        game.board.board = boards[0]
+        game.board.big_board = big_boards[0]
+        game.current_player = int(players[0])
+        game.next = (int(next_boards[0, 0]), int(next_boards[0, 1]))
+
+        return game
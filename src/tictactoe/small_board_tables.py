@@ -0,0 +1,131 @@
+"""
+This module contains lookup tables for all 3^9 states of a 3x3 board, built at import.
+
+A state is indexed by its base-3 code: the sum of value * 3 ** (3 * y + x) over its cells,
+where the value of a cell is 0 (empty), 1 (player 1) or 2 (player 2). Per player tables
+have a last dimension of 2, indexed by player - 1.
+
+Attributes:
+    STATES (int): The number of states.
+    POWERS (NDArray[np.int32]): The code weight of every cell.
+    TERNARY_CODES (NDArray[np.int32]): The code of every 9 bit pattern of player 1's marks,
+        so the code of a board is TERNARY_CODES[player 1 bits] + 2 * TERNARY_CODES[player 2 bits].
+    CELLS (NDArray[np.int8]): The cells of every state, shape (STATES, 9).
+    WINNERS (NDArray[np.int8]): The player with a full line (player 1 first), 0 if none.
+    FULL (NDArray[np.bool_]): Whether all cells are taken.
+    WINNING_CELLS (NDArray[np.uint16]): The 9 bit mask of the empty cells where each player
+        would complete a line, shape (STATES, 2).
+    OPEN_LINES (NDArray[np.int8]): The number of lines without any marks of the opponent
+        for each player, shape (STATES, 2).
+    VALUES (NDArray[np.int8]): The result of perfect play as a standalone game with each player
+        to move: 1 if player 1 wins, -1 if player 2 wins, 0 for a draw, shape (STATES, 2).
+"""
+
+import numpy as np
+from numpy.typing import NDArray
+
+_LINES: NDArray[np.intp] = np.array([
+    [0, 1, 2], [3, 4, 5], [6, 7, 8],
+    [0, 3, 6], [1, 4, 7], [2, 5, 8],
+    [0, 4, 8], [2, 4, 6]
+])
+
+STATES: int = 3 ** 9
+
+POWERS: NDArray[np.int32] = 3 ** np.arange(9, dtype=np.int32)
+
+TERNARY_CODES: NDArray[np.int32] = \
+    ((np.arange(512)[:, np.newaxis] >> np.arange(9) & 1) * POWERS).sum(axis=1, dtype=np.int32)
+
+CELLS: NDArray[np.int8] = (np.arange(STATES)[:, np.newaxis] // POWERS % 3).astype(np.int8)
+
+def _line_marks(player: int) -> NDArray[np.int8]:
+    """
+    Counts the marks of a player on every line of every state.
+
+    Args:
+        player (int): The player number.
+
+    Returns:
+        NDArray[np.int8]: The counts, shape (STATES, 8).
+    """
+    return (CELLS[:, _LINES] == player).sum(axis=2, dtype=np.int8)
+
+def _winning_cells(own: NDArray[np.int8], other: NDArray[np.int8]) -> NDArray[np.uint16]:
+    """
+    Finds the empty cells which complete a line for a player.
+
+    Args:
+        own (NDArray[np.int8]): The player's marks on every line.
+        other (NDArray[np.int8]): The opponent's marks on every line.
+
+    Returns:
+        NDArray[np.uint16]: The 9 bit masks of the winning cells.
+    """
+    threats: NDArray[np.bool_] = (own == 2) & (other == 0)
+    empty_bits: NDArray[np.uint16] = \
+        np.where(CELLS[:, _LINES] == 0, 1 << _LINES, 0).astype(np.uint16)
+
+    return np.bitwise_or.reduce(np.where(threats[:, :, np.newaxis], empty_bits, 0),
+                                axis=(1, 2)).astype(np.uint16)
+
+def _values(winners: NDArray[np.int8], full: NDArray[np.bool_]) -> NDArray[np.int8]:
+    """
+    Solves every state by minimax, from the fullest states to the empty one.
+
+    Args:
+        winners (NDArray[np.int8]): The winner of every state.
+        full (NDArray[np.bool_]): Whether every state is full.
+
+    Returns:
+        NDArray[np.int8]: The value of every state with each player to move.
+    """
+    values: NDArray[np.int8] = np.zeros((STATES, 2), dtype=np.int8)
+    filled: NDArray[np.int8] = (CELLS != 0).sum(axis=1, dtype=np.int8)
+    terminal: NDArray[np.bool_] = (winners != 0) | full
+    outcome: NDArray[np.int8] = np.select([winners == 1, winners == 2], [1, -1], 0).astype(np.int8)
+
+    for count in range(9, -1, -1):
+        states: NDArray[np.intp] = np.flatnonzero(filled == count)
+        empty: NDArray[np.bool_] = CELLS[states] == 0
+
+        for player in (1, 2):
+            children: NDArray[np.intp] = states[:, np.newaxis] + player * POWERS
+            child_values: NDArray[np.int8] = values[np.where(empty, children, 0), 2 - player]
+
+            best: NDArray[np.int8] = \
+                np.where(empty, child_values, -2).max(axis=1) if player == 1 \
+                else np.where(empty, child_values, 2).min(axis=1)
+
+            values[states, player - 1] = np.where(terminal[states], outcome[states], best)
+
+    return values
+
+_MARKS: tuple[NDArray[np.int8], NDArray[np.int8]] = _line_marks(1), _line_marks(2)
+
+WINNERS: NDArray[np.int8] = \
+    np.select([(_MARKS[0] == 3).any(axis=1), (_MARKS[1] == 3).any(axis=1)], [1, 2], 0) \
+        .astype(np.int8)
+
+FULL: NDArray[np.bool_] = (CELLS != 0).all(axis=1)
+
+WINNING_CELLS: NDArray[np.uint16] = np.stack([_winning_cells(_MARKS[0], _MARKS[1]),
+                                              _winning_cells(_MARKS[1], _MARKS[0])], axis=1)
+
+OPEN_LINES: NDArray[np.int8] = np.stack([(_MARKS[1] == 0).sum(axis=1, dtype=np.int8),
+                                         (_MARKS[0] == 0).sum(axis=1, dtype=np.int8)], axis=1)
+
+VALUES: NDArray[np.int8] = _values(WINNERS, FULL)
+
+def board_code(board: NDArray) -> int:
+    """
+    Calculates the code of a 3x3 board array. Cells other than 1 and 2 count as empty.
+
+    Args:
+        board (NDArray): The 3x3 board, indexed by [y, x].
+
+    Returns:
+        int: The base-3 code of the board.
+    """
+    cells: NDArray = np.asarray(board).reshape(9)
+    return int(((cells == 1) * POWERS).sum() + 2 * ((cells == 2) * POWERS).sum())
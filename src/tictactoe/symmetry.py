@@ -0,0 +1,188 @@
+"""
+This module contains the 8 symmetries of the Mega Tic Tac Toe board - the rotations and
+reflections of the square, applied to the big grid and to every small grid at once.
+The permutations are precomputed both in cell bit order (see board.py) and in flat action order.
+"""
+
+from typing import NamedTuple
+import numpy as np
+from numpy.typing import NDArray
+from src.tictactoe.board import Board, CELL_ACTIONS, CELL_COORDINATES, PATTERN_CELLS, SMALL_MASK
+from src.tictactoe.zobrist import NEXT_KEYS, hash_cells
+
+_POINT_TRANSFORMS = (
+    lambda x, y: (x, y),            # identity
+    lambda x, y: (2 - y, x),        # rotation by 90 degrees
+    lambda x, y: (2 - x, 2 - y),    # rotation by 180 degrees
+    lambda x, y: (y, 2 - x),        # rotation by 270 degrees
+    lambda x, y: (2 - x, y),        # reflection in the vertical axis
+    lambda x, y: (x, 2 - y),        # reflection in the horizontal axis
+    lambda x, y: (y, x),            # reflection in the main diagonal
+    lambda x, y: (2 - y, 2 - x)     # reflection in the anti-diagonal
+)
+
+TRANSFORMS: int = len(_POINT_TRANSFORMS)
+"""The number of symmetries, transform 0 being the identity."""
+
+POINT_PERMUTATIONS: tuple[tuple[int, ...], ...] = \
+    tuple(tuple(3 * new_y + new_x
+                for y in range(3) for x in range(3)
+                for new_x, new_y in (transform(x, y),))
+          for transform in _POINT_TRANSFORMS)
+"""The image of every 3x3 index (3 * y + x) under every transform."""
+
+INVERSE_TRANSFORMS: tuple[int, ...] = \
+    tuple(next(inverse for inverse in range(TRANSFORMS)
+               if all(POINT_PERMUTATIONS[inverse][POINT_PERMUTATIONS[transform][point]] == point
+                      for point in range(9)))
+          for transform in range(TRANSFORMS))
+"""The transform which undoes every transform."""
+
+PATTERN_PERMUTATIONS: tuple[tuple[int, ...], ...] = \
+    tuple(tuple(sum(1 << points[cell] for cell in PATTERN_CELLS[pattern])
+                for pattern in range(512))
+          for points in POINT_PERMUTATIONS)
+"""The image of every 9 bit pattern of a 3x3 board under every transform."""
+
+CELL_PERMUTATIONS: NDArray[np.intp] = np.array([
+    [27 * (points[3 * big_y + big_x] // 3) + 9 * (points[3 * big_y + big_x] % 3)
+     + 3 * (points[3 * small_y + small_x] // 3) + points[3 * small_y + small_x] % 3
+     for big_x, big_y, small_x, small_y in CELL_COORDINATES]
+    for points in POINT_PERMUTATIONS
+], dtype=np.intp)
+"""The image of every cell bit under every transform, shape (8, 81)."""
+
+ACTION_PERMUTATIONS: NDArray[np.intp] = np.empty((TRANSFORMS, 81), dtype=np.intp)
+"""The image of every flat action under every transform, shape (8, 81)."""
+
+for _transform in range(TRANSFORMS):
+    ACTION_PERMUTATIONS[_transform, list(CELL_ACTIONS)] = \
+        [CELL_ACTIONS[bit] for bit in CELL_PERMUTATIONS[_transform]]
+
+class CanonicalPosition(NamedTuple):
+    """
+    The canonical form of a position among its symmetries.
+
+    Attributes:
+        cells (tuple[int, int]): The cell bitmasks of player 1 and player 2.
+        next_board (tuple[int, int]): The transformed small board to play on.
+        key (int): The Zobrist hash of the canonical cells and next board,
+            as Board.zobrist_key ^ NEXT_KEYS[next_board] of the canonical position.
+        transform (int): The transform which maps the position to its canonical form.
+    """
+    cells: tuple[int, int]
+    next_board: tuple[int, int]
+    key: int
+    transform: int
+
+def transform_cells(mask: int, transform: int) -> int:
+    """
+    Applies a transform to a cell bitmask.
+
+    Args:
+        mask (int): The 81 bit cell mask.
+        transform (int): The index of the transform.
+
+    Returns:
+        int: The transformed mask.
+    """
+    patterns: tuple[int, ...] = PATTERN_PERMUTATIONS[transform]
+    points: tuple[int, ...] = POINT_PERMUTATIONS[transform]
+    result: int = 0
+
+    for small in range(9):
+        result |= patterns[mask >> (9 * small) & SMALL_MASK] << (9 * points[small])
+
+    return result
+
+def transform_next(next_board: tuple[int, int], transform: int) -> tuple[int, int]:
+    """
+    Applies a transform to the coordinates of the small board to play on.
+
+    Args:
+        next_board (tuple[int, int]): The small board coordinates, (-1, -1) for any board.
+        transform (int): The index of the transform.
+
+    Returns:
+        tuple[int, int]: The transformed coordinates.
+    """
+    if next_board == (-1, -1):
+        return next_board
+
+    point: int = POINT_PERMUTATIONS[transform][3 * next_board[1] + next_board[0]]
+    return point % 3, point // 3
+
+def transform_action(action: int, transform: int) -> int:
+    """
+    Maps a flat action of a position to the same move in the transformed position.
+
+    Args:
+        action (int): The flat action (0 - 80).
+        transform (int): The index of the transform.
+
+    Returns:
+        int: The transformed action.
+    """
+    return int(ACTION_PERMUTATIONS[transform, action])
+
+def restore_action(action: int, transform: int) -> int:
+    """
+    Maps a flat action of a transformed position back to the original position.
+
+    Args:
+        action (int): The flat action (0 - 80) in the transformed position.
+        transform (int): The index of the transform which was applied.
+
+    Returns:
+        int: The action in the original position.
+    """
+    return int(ACTION_PERMUTATIONS[INVERSE_TRANSFORMS[transform], action])
+
+def transform_board_array(board: NDArray, transform: int) -> NDArray:
+    """
+    Applies a transform to board arrays, e.g. to augment or deduplicate training data.
+
+    Args:
+        board (NDArray): An array of shape (..., 3, 3, 3, 3), indexed by
+            [big y, big x, small y, small x].
+        transform (int): The index of the transform.
+
+    Returns:
+        NDArray: The transformed arrays.
+    """
+    flat: NDArray = board.reshape(*board.shape[:-4], 81)
+    return flat[..., CELL_PERMUTATIONS[INVERSE_TRANSFORMS[transform]]].reshape(board.shape)
+
+def canonicalize(board: Board, next_board: tuple[int, int]) -> CanonicalPosition:
+    """
+    Finds the canonical form of a position - the symmetric position with the smallest
+    (player 1 cells, player 2 cells, next board) - so all 8 symmetric positions share it.
+
+    Args:
+        board (Board): The game board.
+        next_board (tuple[int, int]): The small board to play on.
+
+    Returns:
+        CanonicalPosition: The canonical cells, next board, their hash and the transform used.
+    """
+    player1, player2 = board.cells
+    best: tuple[int, int, tuple[int, int]] = player1, player2, next_board
+    best_transform: int = 0
+
+    for transform in range(1, TRANSFORMS):
+        image: int = transform_cells(player1, transform)
+
+        if image > best[0]:
+            continue
+
+        candidate: tuple[int, int, tuple[int, int]] = (
+            image,
+            transform_cells(player2, transform),
+            transform_next(next_board, transform)
+        )
+
+        if candidate < best:
+            best, best_transform = candidate, transform
+
+    key: int = hash_cells((0, best[0], best[1])) ^ NEXT_KEYS[best[2]]
+    return CanonicalPosition((best[0], best[1]), best[2], key, best_transform)
@@ -0,0 +1,66 @@
+"""
+This module contains the random 64 bit keys for Zobrist hashing of Mega Tic Tac Toe positions.
+The keys are generated from a fixed seed, so hashes are the same in every process and run.
+"""
+
+import random
+from typing import Sequence
+
+_rng: random.Random = random.Random(0x7A0B)
+
+CELL_KEYS: tuple[tuple[int, ...], ...] = (
+    (0,) * 81,
+    tuple(_rng.getrandbits(64) for _ in range(81)),
+    tuple(_rng.getrandbits(64) for _ in range(81))
+)
+"""The key of every player's mark on every cell bit, indexed by [player][bit]."""
+
+PLAYER_KEYS: tuple[int, ...] = (0, _rng.getrandbits(64), _rng.getrandbits(64))
+"""The key of the player to move, indexed by player."""
+
+NEXT_KEYS: dict[tuple[int, int], int] = {
+    next_board: _rng.getrandbits(64)
+    for next_board in [(-1, -1)] + [(big_x, big_y) for big_y in range(3) for big_x in range(3)]
+}
+"""The key of the small board to play on, (-1, -1) meaning any board."""
+
+def _small_keys(player: int, small: int) -> tuple[int, ...]:
+    """
+    Builds the combined keys of every 9 bit pattern of marks on a small board.
+
+    Args:
+        player (int): The player number.
+        small (int): The index (3 * big y + big x) of the small board.
+
+    Returns:
+        tuple[int, ...]: The XOR of the keys of the marks of every pattern.
+    """
+    keys: list[int] = [0] * 512
+
+    for pattern in range(1, 512):
+        low: int = pattern & -pattern
+        keys[pattern] = keys[pattern ^ low] ^ CELL_KEYS[player][9 * small + low.bit_length() - 1]
+
+    return tuple(keys)
+
+SMALL_KEYS: tuple[tuple[tuple[int, ...], ...], ...] = \
+    ((),) + tuple(tuple(_small_keys(player, small) for small in range(9)) for player in (1, 2))
+"""The combined key of every pattern of marks on every small board, [player][small][pattern]."""
+
+def hash_cells(cells: Sequence[int]) -> int:
+    """
+    Calculates the Zobrist hash of the marks on a board from scratch.
+
+    Args:
+        cells (Sequence[int]): The cell bitmasks, indexed by player (1 or 2).
+
+    Returns:
+        int: The XOR of the keys of all marks.
+    """
+    key: int = 0
+
+    for player in (1, 2):
+        for small in range(9):
+            key ^= SMALL_KEYS[player][small][cells[player] >> (9 * small) & 0x1FF]
+
+    return key
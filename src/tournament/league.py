@@ -0,0 +1,312 @@
+"""
+This module contains the league, a round-robin between every trained model and RandomPlayer.
+Every O player (the "o_" models and RandomPlayer) plays every X player (the "x_" models and
+RandomPlayer) and the players are rated with a Bradley-Terry model on the Elo scale,
+RandomPlayer being anchored at 1000.
+
+The results and ratings are kept in a ratings file. The results of a pairing are reused
+until one of its models changes, so adding a model only plays its own pairings.
+
+The players keep their colours, so every game opens with a few seeded random moves
+for the AIPlayers not to play the same game every time.
+"""
+
+import json
+import math
+import os
+import random
+import zlib
+from dataclasses import dataclass
+from typing import Any
+import numpy as np
+from numpy.typing import NDArray
+from src.agent.choose_agent import get_agents
+from src.agent.models_path import MODELS_PATH
+from src.agent.prediction_cache import describe_lookups
+from src.tournament.tournament import DEFAULT_OPENING_MOVES, play_chunks, split_games
+
+RANDOM: str = "random"
+"""The name of RandomPlayer in the league."""
+
+RANDOM_RATING: float = 1000
+"""The rating RandomPlayer is anchored at."""
+
+def get_ratings_path() -> str:
+    """
+    Gets the path of the league's ratings file.
+
+    Returns:
+        str: The path of the file.
+    """
+    return os.path.join(MODELS_PATH, "league.json")
+
+def league_players() -> tuple[list[str], list[str]]:
+    """
+    Gets the players of the league.
+
+    Returns:
+        tuple[list[str], list[str]]: The O players and the X players.
+    """
+    return [RANDOM] + sorted(get_agents("o_")), [RANDOM] + sorted(get_agents("x_"))
+
+def _version(player: str) -> float:
+    """
+    Gets the version of a player, the modification time of its model.
+
+    Args:
+        player (str): The name of the player.
+
+    Returns:
+        float: The version, 0 for RandomPlayer.
+    """
+    return 0 if player == RANDOM else os.path.getmtime(os.path.join(MODELS_PATH, f"{player}.zip"))
+
+def _spec(player: str) -> str:
+    """
+    Gets the bot spec of a player (see tournament.py).
+
+    Args:
+        player (str): The name of the player.
+
+    Returns:
+        str: The spec.
+    """
+    return RANDOM if player == RANDOM else f"ai:{player}"
+
+@dataclass
+class Pairing:
+    """
+    The results of the games between an O player and an X player.
+
+    Attributes:
+        player_o (str): The O player.
+        player_x (str): The X player.
+        versions (tuple[float, float]): The versions of the players when the games were played.
+        wins (int): The O player's wins.
+        draws (int): The draws.
+        losses (int): The O player's losses.
+        opening_moves (int): The number of random moves opening the games.
+    """
+    player_o: str
+    player_x: str
+    versions: tuple[float, float]
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    opening_moves: int = 0
+
+    @property
+    def games(self) -> int:
+        """The number of played games."""
+        return self.wins + self.draws + self.losses
+
+    @property
+    def key(self) -> str:
+        """The key of the pairing in the ratings file."""
+        return f"{self.player_o} vs {self.player_x}"
+
+def load_pairings(path: str) -> dict[str, Pairing]:
+    """
+    Loads the pairings of a ratings file.
+
+    Args:
+        path (str): The path of the ratings file.
+
+    Returns:
+        dict[str, Pairing]: The pairings by their keys, none if the file doesn't exist.
+    """
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, encoding="utf-8") as file:
+        data: dict[str, Any] = json.load(file)
+
+    pairings: list[Pairing] = [Pairing(**{ **pairing, "versions": tuple(pairing["versions"]) })
+                               for pairing in data.get("pairings", [])]
+
+    return { pairing.key: pairing for pairing in pairings }
+
+def save_league(path: str, pairings: list[Pairing], ratings: dict[str, float]) -> None:
+    """
+    Saves the pairings and ratings to a ratings file.
+
+    Args:
+        path (str): The path of the ratings file.
+        pairings (list[Pairing]): The pairings.
+        ratings (dict[str, float]): The ratings of the players.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({
+            "ratings": dict(sorted(ratings.items(), key=lambda item: -item[1])),
+            "pairings": [pairing.__dict__ for pairing in pairings]
+        }, file, indent=4)
+
+def bradley_terry(pairings: list[Pairing], iterations: int = 1000) -> dict[str, float]:
+    """
+    Fits Bradley-Terry strengths to the results of the pairings, counting draws as half a win.
+    Every player gets a virtual draw against RandomPlayer, so unbeaten players have a finite
+    rating.
+
+    Args:
+        pairings (list[Pairing]): The pairings.
+        iterations (int, optional): The maximum number of iterations. Defaults to 1000.
+
+    Returns:
+        dict[str, float]: The Elo scale rating of every player.
+    """
+    players: list[str] = sorted({ RANDOM } | { pairing.player_o for pairing in pairings }
+                                | { pairing.player_x for pairing in pairings })
+    indexes: dict[str, int] = { player: index for index, player in enumerate(players) }
+    random_index: int = indexes[RANDOM]
+
+    # scores[i, j] is the score of player i against player j
+    scores: NDArray[np.float64] = np.zeros((len(players), len(players)))
+
+    for pairing in pairings:
+        o_index, x_index = indexes[pairing.player_o], indexes[pairing.player_x]
+        scores[o_index, x_index] += pairing.wins + pairing.draws / 2
+        scores[x_index, o_index] += pairing.losses + pairing.draws / 2
+
+    scores[:, random_index] += 0.5
+    scores[random_index, :] += 0.5
+    np.fill_diagonal(scores, 0)
+
+    games: NDArray[np.float64] = scores + scores.T
+    strengths: NDArray[np.float64] = np.ones(len(players))
+
+    # The minorization-maximization updates of Hunter (2004)
+    for _ in range(iterations):
+        updated: NDArray[np.float64] = scores.sum(axis=1) / \
+            (games / (strengths[:, np.newaxis] + strengths[np.newaxis, :])).sum(axis=1)
+        updated /= updated[random_index]
+
+        if np.allclose(updated, strengths, rtol=1e-9, atol=0):
+            strengths = updated
+            break
+
+        strengths = updated
+
+    return { player: RANDOM_RATING + 400 * math.log10(strength)
+             for player, strength in zip(players, strengths) }
+
+@dataclass
+class LeagueResult:
+    """
+    The results of a league.
+
+    Attributes:
+        ratings (dict[str, float]): The ratings of the players.
+        pairings (list[Pairing]): The pairings.
+        played (int): The number of pairings played now, the others were cached.
+        cache_hits (int): The AIPlayers' prediction cache hits in the games played now.
+        cache_misses (int): The AIPlayers' prediction cache misses in the games played now.
+    """
+    ratings: dict[str, float]
+    pairings: list[Pairing]
+    played: int
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    def top_models(self, prefix: str, count: int = 2) -> list[str]:
+        """
+        Finds the best rated models of a colour, such as the trainer opponents of train_model.
+
+        Args:
+            prefix (str): The prefix of the models, "o_" or "x_".
+            count (int, optional): The number of models. Defaults to 2.
+
+        Returns:
+            list[str]: The names of the models, the best first.
+        """
+        return sorted((player for player in self.ratings if player.startswith(prefix)),
+                      key=lambda player: -self.ratings[player])[:count]
+
+    def report(self) -> str:
+        """
+        Describes the ratings, the best first.
+
+        Returns:
+            str: The report.
+        """
+        lines: list[str] = [f"{len(self.pairings)} pairings, {self.played} played now"]
+        lines.extend(f"{i + 1:>3}. {player:<24} {rating:7.1f}" for i, (player, rating) in
+                     enumerate(sorted(self.ratings.items(), key=lambda item: -item[1])))
+
+        if self.cache_hits or self.cache_misses:
+            lines.append(describe_lookups(self.cache_hits, self.cache_misses))
+
+        return "\n".join(lines)
+
+def run_league(games: int = 100,
+               workers: int = 1,
+               seed: int | None = None,
+               path: str | None = None,
+               opening_moves: int = DEFAULT_OPENING_MOVES) -> LeagueResult:
+    """
+    Plays the pairings of the league which aren't cached, rates the players
+    and saves the ratings file.
+
+    Args:
+        games (int, optional): The number of games of every pairing. Defaults to 100.
+        workers (int, optional): The number of worker processes. Defaults to 1,
+            playing in this process.
+        seed (int | None, optional): The seed of the random choices. Defaults to None.
+        path (str | None, optional): The path of the ratings file.
+            Defaults to league.json in the models directory.
+        opening_moves (int, optional): The number of seeded random moves opening every game.
+            Defaults to DEFAULT_OPENING_MOVES.
+
+    Returns:
+        LeagueResult: The ratings and pairings.
+    """
+    path = path if path is not None else get_ratings_path()
+    cached: dict[str, Pairing] = load_pairings(path)
+    players_o, players_x = league_players()
+
+    pairings: list[Pairing] = []
+    pending: list[Pairing] = []
+
+    for player_o in players_o:
+        for player_x in players_x:
+            if player_o == RANDOM and player_x == RANDOM:
+                continue
+
+            pairing: Pairing = Pairing(player_o, player_x, (_version(player_o), _version(player_x)),
+                                       opening_moves=opening_moves)
+            old: Pairing | None = cached.get(pairing.key)
+
+            if old is not None and old.versions == pairing.versions and old.games >= games \
+                    and old.opening_moves == pairing.opening_moves:
+                pairing = old
+            else:
+                pending.append(pairing)
+
+            pairings.append(pairing)
+
+    league_seed: int = seed if seed is not None else random.randrange(2**63)
+    chunks: list[tuple[str, str, int, int, int, bool, int]] = []
+    owners: list[Pairing] = []
+
+    for pairing in pending:
+        # Every pairing gets its own games, whichever pairings are pending
+        pairing_seed: int = league_seed ^ zlib.crc32(pairing.key.encode())
+
+        for first, count in split_games(games, workers):
+            chunks.append((_spec(pairing.player_o), _spec(pairing.player_x),
+                           first, count, pairing_seed, False, opening_moves))
+            owners.append(pairing)
+
+    hits: int = 0
+    misses: int = 0
+
+    for pairing, results in zip(owners, play_chunks(chunks, workers)):
+        pairing.wins += results[0]
+        pairing.draws += results[1]
+        pairing.losses += results[2]
+        hits += results[6]
+        misses += results[7]
+
+    ratings: dict[str, float] = bradley_terry(pairings)
+    save_league(path, pairings, ratings)
+
+    return LeagueResult(ratings, pairings, len(pending), hits, misses)
@@ -0,0 +1,334 @@
+"""
+This module contains a headless tournament runner, which plays many games between two
+bot players across a process pool and reports their results with confidence intervals.
+
+Bots are given as specs:
+    - "random": a RandomPlayer
+    - "ai:<name>": an AIPlayer of the model "<o_|x_><name>" for the colour it plays,
+      or of the model "<name>" itself if it is a full model name
+    - "mcts", "mcts:<iterations>" or "mcts:<seconds>s": an MCTSPlayer searching for
+      DEFAULT_TIME_LIMIT seconds, the given iterations or the given seconds per move
+
+Every game opens with a few seeded random moves, as AIPlayers always play their best move
+and the games between them would otherwise all be the same.
+"""
+
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import cache
+from src.agent.models_path import MODELS_PATH
+from src.agent.prediction_cache import cache_lookups, describe_lookups
+from src.players.bot_player import BotPlayer
+from src.players.mcts_player import MCTSPlayer
+from src.players.random_player import RandomPlayer
+from src.tictactoe.game import Game
+
+DEFAULT_OPENING_MOVES: int = 2
+"""The default number of random moves opening every game, one for each player."""
+
+def create_bot(spec: str, is_o: bool) -> BotPlayer:
+    """
+    Creates a bot player from its spec.
+
+    Args:
+        spec (str): The spec of the bot, see the module docstring.
+        is_o (bool): Whether the bot plays as O.
+
+    Raises:
+        ValueError: If the spec is unknown or there is no model for the colour.
+
+    Returns:
+        BotPlayer: The bot player.
+    """
+    kind, _, argument = spec.partition(":")
+
+    match kind:
+        case "random" if not argument:
+            return RandomPlayer()
+        case "ai" if argument:
+            # AIPlayer is imported here, so games without AI players don't load torch
+            from src.players.ai_player import AIPlayer  # pylint: disable=import-outside-toplevel
+
+            for model_name in (("o_" if is_o else "x_") + argument, argument):
+                if os.path.exists(os.path.join(MODELS_PATH, f"{model_name}.zip")):
+                    return AIPlayer(model_name)
+
+            raise ValueError(f"There is no model {argument!r} to play as {'O' if is_o else 'X'}!")
+        case "mcts" if not argument:
+            return MCTSPlayer()
+        case "mcts" if argument.isdigit() and int(argument) > 0:
+            return MCTSPlayer(iterations=int(argument))
+        case "mcts" if argument.endswith("s"):
+            try:
+                return MCTSPlayer(time_limit=float(argument.removesuffix("s")))
+            except ValueError:
+                raise ValueError(f"Invalid MCTS time limit {argument!r}!") from None
+        case _:
+            raise ValueError(f"Unknown bot spec {spec!r}!")
+
+@cache
+def _cached_bot(spec: str, is_o: bool) -> BotPlayer:
+    """
+    Creates a bot player once per process, so models are loaded only once.
+
+    Args:
+        spec (str): The spec of the bot.
+        is_o (bool): Whether the bot plays as O.
+
+    Returns:
+        BotPlayer: The bot player.
+    """
+    return create_bot(spec, is_o)
+
+def play_game(player_o: BotPlayer, player_x: BotPlayer, opening_moves: int = 0) -> int:
+    """
+    Plays a game between two bot players.
+
+    Args:
+        player_o (BotPlayer): The player moving first.
+        player_x (BotPlayer): The player moving second.
+        opening_moves (int, optional): The number of random moves played for the players
+            at the start. Defaults to 0.
+
+    Returns:
+        int: The winner, 1 for O and 2 for X, or 0 for a draw.
+    """
+    game: Game = Game(2, auto_save=False)
+    players: dict[int, BotPlayer] = { game.player1: player_o, game.player2: player_x }
+
+    while game.winner is None and not game.board.is_full():
+        turn: tuple[int, int, int, int] = \
+            random.choice(game.board.legal_moves(game.next)) if game.turns < opening_moves \
+            else players[game.current_player].get_turn(game.next, game.board)
+
+        game.take_turn(*turn)
+
+    return game.winner or 0
+
+def play_games(spec_a: str,
+               spec_b: str,
+               first: int,
+               count: int,
+               seed: int,
+               alternate: bool = True,
+               opening_moves: int = DEFAULT_OPENING_MOVES) -> tuple[int, ...]:
+    """
+    Plays games between two bots, the first bot playing O in the even numbered games.
+
+    Args:
+        spec_a (str): The spec of the first bot.
+        spec_b (str): The spec of the second bot.
+        first (int): The number of the first game, deciding the colours.
+        count (int): The number of games.
+        seed (int): The seed of the tournament, every game is seeded with it and its number
+            so the results don't depend on the chunks.
+        alternate (bool, optional): Whether the colours alternate, otherwise the first bot
+            always plays O. Defaults to True.
+        opening_moves (int, optional): The number of seeded random moves opening every game.
+            Defaults to DEFAULT_OPENING_MOVES.
+
+    Returns:
+        tuple[int, ...]: The first bot's wins, draws and losses as O,
+            followed by its wins, draws and losses as X
+            and by the AIPlayers' prediction cache hits and misses.
+    """
+    results: list[int] = [0] * 8
+    hits, misses = cache_lookups()
+
+    for game in range(first, first + count):
+        a_is_o: bool = game % 2 == 0 or not alternate
+        bot_a: BotPlayer = _cached_bot(spec_a, a_is_o)
+        bot_b: BotPlayer = _cached_bot(spec_b, not a_is_o)
+        random.seed(f"{seed}:{game}")
+
+        winner: int = play_game(bot_a, bot_b, opening_moves) if a_is_o \
+            else play_game(bot_b, bot_a, opening_moves)
+        a_player: int = 1 if a_is_o else 2
+        outcome: int = 1 if winner == 0 else 0 if winner == a_player else 2
+
+        results[(0 if a_is_o else 3) + outcome] += 1
+
+    # The caches of this process may have been used by earlier chunks
+    total_hits, total_misses = cache_lookups()
+    results[6], results[7] = total_hits - hits, total_misses - misses
+
+    return tuple(results)
+
+def split_games(games: int, workers: int) -> list[tuple[int, int]]:
+    """
+    Splits games into chunks, several per worker to balance the load.
+
+    Args:
+        games (int): The number of games.
+        workers (int): The number of worker processes.
+
+    Returns:
+        list[tuple[int, int]]: The number of the first game and the game count of every chunk.
+    """
+    chunk: int = max(math.ceil(games / (4 * workers)), 1)
+    return [(first, min(chunk, games - first)) for first in range(0, games, chunk)]
+
+def play_chunks(chunks: list[tuple[str, str, int, int, int, bool, int]],
+                workers: int = 1) -> list[tuple[int, ...]]:
+    """
+    Plays chunks of games, spread across worker processes.
+
+    Args:
+        chunks (list[tuple[str, str, int, int, int, bool, int]]): The arguments of play_games
+            for every chunk.
+        workers (int, optional): The number of worker processes. Defaults to 1,
+            playing in this process.
+
+    Returns:
+        list[tuple[int, ...]]: The results of play_games for every chunk.
+    """
+    if workers > 1 and chunks:
+        with ProcessPoolExecutor(workers) as executor:
+            return list(executor.map(play_games, *zip(*chunks)))
+
+    return [play_games(*chunk) for chunk in chunks]
+
+def wilson_interval(successes: int, trials: int, z: float = 1.96) -> tuple[float, float]:
+    """
+    Finds the Wilson score interval of a rate.
+
+    Args:
+        successes (int): The number of successes.
+        trials (int): The number of trials.
+        z (float, optional): The normal quantile of the confidence level.
+            Defaults to 1.96, 95% confidence.
+
+    Returns:
+        tuple[float, float]: The lower and upper bounds of the rate, (0, 1) without trials.
+    """
+    if trials == 0:
+        return 0.0, 1.0
+
+    rate: float = successes / trials
+    denominator: float = 1 + z * z / trials
+    center: float = (rate + z * z / (2 * trials)) / denominator
+    margin: float = z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) \
+        / denominator
+
+    return max(center - margin, 0.0), min(center + margin, 1.0)
+
+@dataclass
+class TournamentResult:
+    """
+    The results of a tournament, from the first bot's point of view.
+
+    Attributes:
+        spec_a (str): The spec of the first bot.
+        spec_b (str): The spec of the second bot.
+        wins (int): The first bot's wins.
+        draws (int): The draws.
+        losses (int): The first bot's losses.
+        seconds (float): The duration of the tournament.
+        as_o (tuple[int, int, int]): The first bot's wins, draws and losses as O.
+        cache_hits (int): The AIPlayers' prediction cache hits.
+        cache_misses (int): The AIPlayers' prediction cache misses.
+        opening_moves (int): The number of random moves opening every game.
+    """
+    spec_a: str
+    spec_b: str
+    wins: int
+    draws: int
+    losses: int
+    seconds: float
+    as_o: tuple[int, int, int] = (0, 0, 0)
+    cache_hits: int = 0
+    cache_misses: int = 0
+    opening_moves: int = 0
+
+    @property
+    def games(self) -> int:
+        """The number of played games."""
+        return self.wins + self.draws + self.losses
+
+    @property
+    def games_per_second(self) -> float:
+        """The number of games played per second."""
+        return self.games / self.seconds if self.seconds > 0 else math.inf
+
+    def report(self) -> str:
+        """
+        Describes the results with the 95% confidence interval of every rate.
+
+        Returns:
+            str: The report.
+        """
+        lines: list[str] = [f"{self.spec_a} vs {self.spec_b}: {self.games} games " +
+                            f"in {self.seconds:.2f}s ({self.games_per_second:.1f} games/s)"]
+
+        for label, count in (("Wins", self.wins), ("Draws", self.draws), ("Losses", self.losses)):
+            low, high = wilson_interval(count, self.games)
+            rate: float = count / self.games if self.games else 0.0
+
+            lines.append(f"{label}: {count} ({rate:.1%}, 95% CI {low:.1%} - {high:.1%})")
+
+        wins_o, draws_o, losses_o = self.as_o
+        lines.append(f"As O: {wins_o} W / {draws_o} D / {losses_o} L, as X: " +
+                     f"{self.wins - wins_o} W / {self.draws - draws_o} D / " +
+                     f"{self.losses - losses_o} L")
+
+        # Deterministic bots repeat the same games, which the intervals count as independent
+        lines.append(f"Openings: {self.opening_moves} random moves" if self.opening_moves
+                     else "Openings: none, games between deterministic bots are repeats")
+
+        if self.cache_hits or self.cache_misses:
+            lines.append(describe_lookups(self.cache_hits, self.cache_misses))
+
+        return "\n".join(lines)
+
+def run_tournament(spec_a: str,
+                   spec_b: str,
+                   games: int,
+                   workers: int = 1,
+                   seed: int | None = None,
+                   opening_moves: int = DEFAULT_OPENING_MOVES) -> TournamentResult:
+    """
+    Plays games between two bots, alternating their colours, spread across worker processes.
+
+    Args:
+        spec_a (str): The spec of the first bot.
+        spec_b (str): The spec of the second bot.
+        games (int): The number of games.
+        workers (int, optional): The number of worker processes. Defaults to 1,
+            playing in this process.
+        seed (int | None, optional): The seed of the random choices. Defaults to None.
+        opening_moves (int, optional): The number of seeded random moves opening every game.
+            Defaults to DEFAULT_OPENING_MOVES.
+
+    Raises:
+        ValueError: If a bot spec is unknown or a model can't play both colours.
+
+    Returns:
+        TournamentResult: The results.
+    """
+    # Unknown specs and missing models are reported before any worker is started
+    for spec in (spec_a, spec_b):
+        for is_o in (True, False):
+            _cached_bot(spec, is_o)
+
+    tournament_seed: int = seed if seed is not None else random.randrange(2**63)
+
+    start: float = time.perf_counter()
+    results: list[tuple[int, ...]] = play_chunks(
+        [(spec_a, spec_b, first, count, tournament_seed, True, opening_moves)
+         for first, count in split_games(games, workers)], workers)
+
+    totals: list[int] = [sum(column) for column in zip(*results)] or [0] * 8
+
+    return TournamentResult(spec_a, spec_b,
+                            wins=totals[0] + totals[3],
+                            draws=totals[1] + totals[4],
+                            losses=totals[2] + totals[5],
+                            seconds=time.perf_counter() - start,
+                            as_o=(totals[0], totals[1], totals[2]),
+                            cache_hits=totals[6],
+                            cache_misses=totals[7],
+                            opening_moves=opening_moves)
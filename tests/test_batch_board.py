@@ -0,0 +1,92 @@
+"""
+Unit tests for the BatchBoard class.
+"""
+
+import unittest
+import numpy as np
+import numpy.testing as npt
+from src.tictactoe.batch_board import BatchBoard
+from src.tictactoe.board import Board
+from src.tictactoe.game import Game
+from src.agent.observation import action_coordinates
+
+def action(big_x: int, big_y: int, small_x: int, small_y: int) -> int:
+    """Helper function to get the flat action of board coordinates."""
+    return 9 * (3 * big_y + small_y) + 3 * big_x + small_x
+
+class TestBatchBoard(unittest.TestCase):
+    """
+    Test cases for the BatchBoard class.
+    """
+
+    def setUp(self):
+        """Set up a new BatchBoard of 2 games for each test."""
+        self.batch = BatchBoard(2)
+
+    def test_initial_all_actions_legal(self):
+        """Test that all actions are legal in new games."""
+        self.assertTrue(self.batch.legal_action_masks().all())
+
+    def test_play_places_moves_and_sets_next(self):
+        """Test that a move is placed for the current player and sets the next board."""
+        legal, _ = self.batch.play(np.array([action(0, 0, 2, 1), action(1, 1, 0, 0)]))
+
+        npt.assert_array_equal(legal, [True, True])
+        self.assertEqual(self.batch.boards[0, 0, 0, 1, 2], 1)
+        npt.assert_array_equal(self.batch.next_boards, [[2, 1], [0, 0]])
+        npt.assert_array_equal(self.batch.current_players, [2, 2])
+
+    def test_illegal_action_leaves_game_unchanged(self):
+        """Test that an action outside of the next board isn't played."""
+        self.batch.play(np.array([action(0, 0, 2, 1), action(0, 0, 2, 1)]))
+        legal, _ = self.batch.play(np.array([action(2, 1, 0, 0), action(0, 0, 0, 0)]))
+
+        npt.assert_array_equal(legal, [True, False])
+        self.assertEqual(self.batch.boards[1, 0, 0, 0, 0], Board.EMPTY)
+        self.assertEqual(self.batch.current_players[1], 2)
+
+    def test_matches_game_rules(self):
+        """Test that random games follow exactly the same rules as Game."""
+        rng = np.random.default_rng(0)
+        batch: BatchBoard = BatchBoard(16)
+        games: list[Game] = [Game(mode=2, auto_save=False) for _ in range(16)]
+
+        while not batch.done.all():
+            masks = batch.legal_action_masks()
+            actions = np.argmax(rng.random(masks.shape) * masks, axis=1)
+            batch.play(actions)
+
+            for i, game in enumerate(games):
+                if masks[i].any():
+                    game.take_turn(*action_coordinates(int(actions[i])))
+
+                npt.assert_array_equal(batch.boards[i], game.board.board)
+                npt.assert_array_equal(batch.big_boards[i], game.board.big_board)
+                self.assertEqual(tuple(batch.next_boards[i]), game.next)
+                self.assertEqual(batch.winners[i], game.winner or 0)
+                self.assertEqual(batch.done[i], game.winner is not None or game.board.is_full())
+
+    def test_next_closed_board_can_play_anywhere(self):
+        """Test that the next board is any board when the target small board is closed."""
+        for small_y in range(3):
+            self.batch.play(np.array([action(1, 1, 1, small_y), action(0, 0, 0, 0)]))
+            self.batch.next_boards[0] = -1
+            self.batch.current_players[0] = 1
+
+        self.assertEqual(self.batch.big_boards[0, 1, 1], 1)
+
+        self.batch.play(np.array([action(0, 0, 1, 1), action(0, 0, 0, 0)]))
+        npt.assert_array_equal(self.batch.next_boards[0], [-1, -1])
+
+    def test_reset_done_resets_finished_games(self):
+        """Test that only the finished games are reset."""
+        self.batch.play(np.array([action(0, 0, 0, 0), action(0, 0, 0, 0)]))
+        self.batch.done[0] = True
+
+        npt.assert_array_equal(self.batch.reset_done(), [True, False])
+        self.assertEqual(self.batch.turns[0], 0)
+        self.assertEqual(self.batch.turns[1], 1)
+        self.assertEqual(self.batch.boards[0, 0, 0, 0, 0], Board.EMPTY)
+
+if __name__ == '__main__':
+    unittest.main()
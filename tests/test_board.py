@@ -4,6 +4,7 @@ Unit tests for the Board class.
 
 import unittest
 import itertools as it
+import numpy as np
 import numpy.testing as npt
 from src.tictactoe.board import Board
 
@@ -90,6 +91,26 @@ class TestBoard(unittest.TestCase):
         self.assertTrue(self.board.check_big_win(1))
         self.assertFalse(self.board.check_big_win(2))
 
+    def test_check_big_win_diagonal(self):
+        """Test checking for a win on the big board's anti-diagonal."""
+        for i in range(3):
+            self.win_small_board(2, 2 - i, i)
+
+        self.assertTrue(self.board.check_big_win(2))
+        self.assertFalse(self.board.check_big_win(1))
+
+    def test_check_big_win_after_loading(self):
+        """Test that the win counters are restored when the arrays are assigned."""
+        for i in range(3):
+            self.win_small_board(1, i, 1)
+
+        loaded: Board = Board()
+        loaded.board = self.board.board
+        loaded.big_board = self.board.big_board
+
+        self.assertTrue(loaded.check_big_win(1))
+        self.assertFalse(loaded.check_big_win(2))
+
     def test_check_big_win_empty_returns_false(self):
         """Test that an empty big board does not have a win."""
         self.assertFalse(self.board.check_big_win(1))
@@ -130,11 +151,92 @@ class TestBoard(unittest.TestCase):
         self.assertCountEqual(valid_moves, all_moves)
         self.assertSetEqual(valid_moves, all_moves)
 
+    def test_legal_moves_follow_moves(self):
+        """Test that the legal move index is updated after moves and closed boards."""
+        self.board.play_turn(1, 1, 1, 0, 0)
+        self.assertNotIn((1, 1, 0, 0), self.board.legal_moves((1, 1)))
+        self.assertEqual(self.board.count_legal_moves((1, 1)), 8)
+
+        self.win_small_board(2, 1, 0)
+        self.assertEqual(self.board.legal_moves((1, 0)), ())
+        self.assertEqual(self.board.count_legal_moves((-1, -1)), 8 * 9 - 1)
+        self.assertEqual(len(self.board.legal_moves((-1, -1))), 8 * 9 - 1)
+
+    def test_legal_action_mask_matches_legal_moves(self):
+        """Test that the legal action mask is in flat action order."""
+        self.board.play_turn(1, 2, 0, 1, 2)
+        mask = self.board.legal_action_mask((2, 0))
+
+        self.assertEqual(mask.shape, (81,))
+        self.assertEqual(int(mask.sum()), 8)
+        self.assertFalse(mask[9 * 2 + 3 * 2 + 1])
+        self.assertTrue(mask[9 * 0 + 3 * 2 + 0])
+        self.assertFalse(mask[0])
+
+    def test_play_turn_with_numpy_coordinates(self):
+        """Test that coordinates given as NumPy integers are played like ints."""
+        self.assertTrue(self.board.play_turn(1, *np.array([1, 0, 2, 1])))
+        self.assertEqual(self.board.board[0, 1, 1, 2], 1)
+
+    def test_undo_restores_won_board(self):
+        """Test that undoing the winning move of a small board reopens it."""
+        self.win_small_board(1, 1, 1)
+        self.assertTrue(self.board.undo())
+
+        self.assertTrue(self.board.check_small_board_valid(1, 1))
+        self.assertFalse(self.board.check_small_win(1, 1, 1))
+        self.assertEqual(self.board.board[1, 1, 2, 2], Board.EMPTY)
+        self.assertEqual(self.board.count_legal_moves((1, 1)), 7)
+
+    def test_undo_restores_big_win(self):
+        """Test that undoing the winning move of the game takes back the win."""
+        for i in range(3):
+            self.win_small_board(2, i, i)
+
+        self.board.undo()
+
+        self.assertFalse(self.board.check_big_win(2))
+        self.assertTrue(self.board.play_turn(2, 2, 2, 2, 2))
+        self.assertTrue(self.board.check_big_win(2))
+
+    def test_undo_without_moves_returns_false(self):
+        """Test that there is nothing to undo on an empty board."""
+        self.assertFalse(self.board.undo())
+
     def test_to_string_works(self):
         """Test converting the board to a string."""
         board_str_len: int = len(self.board.to_string())
         self.assertGreater(board_str_len, 81)
 
+    def test_board_views_are_read_only(self):
+        """Test that the array views of the board can't be modified directly."""
+        with self.assertRaises(ValueError):
+            self.board.board[0, 0, 0, 0] = 1
+
+        with self.assertRaises(ValueError):
+            self.board.big_board[0, 0] = 1
+
+    def test_board_views_follow_moves(self):
+        """Test that the array views are rebuilt after a move."""
+        npt.assert_array_equal(self.board.board, Board.EMPTY)
+        self.win_small_board(2, 2, 1)
+
+        self.assertEqual(self.board.board[1, 2, 1, 1], 2)
+        self.assertEqual(self.board.big_board[1, 2], 2)
+
+    def test_board_setter_rebuilds_state(self):
+        """Test that assigning an array board restores the bitboards and the big board."""
+        self.win_small_board(1, 0, 0)
+        self.board.play_turn(2, 1, 1, 0, 0)
+
+        loaded: Board = Board()
+        loaded.board = self.board.board.tolist()
+
+        npt.assert_array_equal(loaded.board, self.board.board)
+        npt.assert_array_equal(loaded.big_board, self.board.big_board)
+        self.assertFalse(loaded.play_turn(2, 1, 1, 0, 0))
+        self.assertEqual(set(loaded.valid_moves((-1, -1))), set(self.board.valid_moves((-1, -1))))
+
     def win_small_board(self, player: int, x: int, y: int):
         """Helper method to win a small board for a player."""
         self.board.play_turn(player, x, y, 0, 0)
@@ -0,0 +1,73 @@
+"""
+Unit tests for the packed position encoding.
+"""
+
+import unittest
+import numpy as np
+import numpy.testing as npt
+from src.tictactoe.board import Board
+from src.tictactoe.game import Game
+from src.tictactoe.encoding import BOARD_BYTES, POSITION_BYTES, pack_positions, unpack_positions
+
+class TestEncoding(unittest.TestCase):
+    """
+    Test cases for packing and unpacking positions.
+    """
+
+    def setUp(self):
+        """Set up a game with won, full and partially filled small boards for each test."""
+        self.game = Game(mode=1, auto_save=False)
+        self.game.test_mode = True
+
+        for small_x in range(3):
+            self.game.take_turn(0, 0, small_x, 0)
+
+        for big_x, big_y, small_x, small_y in \
+            [(1, 0, 1, 0), (1, 0, 2, 0), (1, 0, 0, 1), (1, 0, 1, 1), (1, 0, 2, 2)]:
+            self.game.board.play_turn(2, big_x, big_y, small_x, small_y)
+
+        for big_x, big_y, small_x, small_y in \
+            [(1, 0, 0, 0), (1, 0, 2, 1), (1, 0, 0, 2), (1, 0, 1, 2)]:
+            self.game.board.play_turn(1, big_x, big_y, small_x, small_y)
+
+        self.game.board.play_turn(2, 2, 2, 1, 1)
+        self.game.test_mode = False
+        self.game.current_player = 2
+        self.game.next = (1, 2)
+
+    def test_board_round_trip(self):
+        """Test packing and unpacking a board."""
+        data: bytes = self.game.board.to_bytes()
+        board: Board = Board.from_bytes(data)
+
+        self.assertEqual(len(data), BOARD_BYTES)
+        npt.assert_array_equal(board.board, self.game.board.board)
+        npt.assert_array_equal(board.big_board, self.game.board.big_board)
+        self.assertEqual(board.big_board[0, 1], Board.FULL)
+
+    def test_game_round_trip(self):
+        """Test packing and unpacking a whole position."""
+        data: bytes = self.game.to_bytes()
+        game: Game = Game.from_bytes(data, 1)
+
+        self.assertEqual(len(data), POSITION_BYTES)
+        self.assertEqual(game.position_key, self.game.position_key)
+        self.assertEqual(game.next, (1, 2))
+        self.assertEqual(game.current_player, 2)
+
+    def test_vectorized_round_trip(self):
+        """Test packing and unpacking many positions at once."""
+        boards = np.stack([Board().board, self.game.board.board])
+        big_boards = np.stack([Board().big_board, self.game.board.big_board])
+        next_boards = np.array([[-1, -1], [1, 2]])
+        players = np.array([1, 2])
+
+        packed = pack_positions(boards, big_boards, next_boards, players)
+        self.assertEqual(packed.shape, (2, POSITION_BYTES))
+
+        for unpacked, original in zip(unpack_positions(packed),
+                                      (boards, big_boards, next_boards, players)):
+            npt.assert_array_equal(unpacked, original)
+
+if __name__ == '__main__':
+    unittest.main()
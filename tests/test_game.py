@@ -92,6 +92,65 @@ class TestGame(unittest.TestCase):
 
         self.assertEqual(self.game.winner, self.game.player1)
 
+    def test_undo_turn_restores_state(self):
+        """Test that undoing a turn restores the board, next board and player."""
+        self.game.take_turn(0, 0, 1, 2)
+        self.game.take_turn(1, 2, 2, 2)
+        self.game.undo_turn()
+
+        self.assertEqual(self.game.board.board[2, 1, 2, 2], Board.EMPTY)
+        self.assertEqual(self.game.next, (1, 2))
+        self.assertEqual(self.game.current_player, self.game.player2)
+        self.assertEqual(self.game.turns, 1)
+
+    def test_undo_turn_restores_winner(self):
+        """Test that undoing the winning turn clears the winner."""
+        self.game.test_mode = True
+
+        for big_y in range(3):
+            for small_y in range(3):
+                self.game.take_turn(0, big_y, 0, small_y)
+
+        self.game.undo_turn()
+        self.assertIsNone(self.game.winner)
+
+    def test_undo_turn_without_turns_raises_error(self):
+        """Test undoing when no turns were taken."""
+        with self.assertRaises(RuntimeError):
+            self.game.undo_turn()
+
+    def test_position_key_transposition(self):
+        """Test that the same position reached in a different order has the same key."""
+        other: Game = Game(mode=1)
+        other.test_mode = self.game.test_mode = True
+
+        self.game.take_turn(0, 0, 0, 0)
+        self.game.take_turn(1, 1, 1, 1)
+        other.take_turn(1, 1, 1, 1)
+        other.take_turn(0, 0, 0, 0)
+
+        self.assertEqual(self.game.position_key, other.position_key)
+
+    def test_position_key_covers_player_and_next(self):
+        """Test that the key depends on the player to move and the next board."""
+        self.game.take_turn(0, 0, 1, 1)
+        key: int = self.game.position_key
+
+        self.game.switch_player()
+        self.assertNotEqual(self.game.position_key, key)
+        self.game.switch_player()
+
+        self.game.next = (-1, -1)
+        self.assertNotEqual(self.game.position_key, key)
+
+    def test_position_key_restored_by_undo(self):
+        """Test that undoing a turn restores the position key."""
+        key: int = self.game.position_key
+        self.game.take_turn(2, 2, 0, 1)
+        self.game.undo_turn()
+
+        self.assertEqual(self.game.position_key, key)
+
     def test_play_turn(self):
         """Test that play_turn places mark."""
         self.game.players[1] = RandomPlayer()
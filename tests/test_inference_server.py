@@ -0,0 +1,83 @@
+"""This module provides unit tests for the batching inference server."""
+
+import asyncio
+import unittest
+from unittest import mock
+from src.agent.inference_server import InferenceServer
+from src.players.ai_player import AIPlayer
+from src.tictactoe.game import Game
+
+async def play(game: Game) -> Game:
+    """Play a game to its end."""
+    while game.winner is None and not game.board.is_full():
+        await game.play_turn()
+
+    return game
+
+def create_games(count: int, server: InferenceServer | None, cache_size: int = 0) -> list[Game]:
+    """Create games between the base models, without prediction caches by default."""
+    games: list[Game] = [Game(3, auto_save=False) for _ in range(count)]
+    player_o, player_x = AIPlayer("o_base", server=server, cache_size=cache_size), \
+        AIPlayer("x_base", server=server, cache_size=cache_size)
+
+    for game in games:
+        game.players = { game.player1: player_o, game.player2: player_x }
+
+    return games
+
+class TestInferenceServer(unittest.TestCase):
+    """Test cases for InferenceServer"""
+
+    def test_concurrent_games_are_batched(self):
+        """Test that concurrent games get the moves they would get alone, in batches."""
+        server = InferenceServer(max_batch_size=8, max_wait=0.01)
+
+        async def play_all() -> list[Game]:
+            return await asyncio.gather(*(play(game) for game in create_games(8, server)))
+
+        batched = asyncio.run(play_all())
+        alone = asyncio.run(play(create_games(1, None)[0]))
+
+        for game in batched:
+            self.assertEqual(game.board.to_bytes(), alone.board.to_bytes())
+
+        self.assertEqual(server.requests, sum(game.turns for game in batched))
+        self.assertEqual(server.mean_batch_size, 8)
+
+    def test_batch_waits_at_most_max_wait(self):
+        """Test that a lone request is evaluated after max_wait."""
+        server = InferenceServer(max_batch_size=64, max_wait=0.001)
+        game = create_games(1, server)[0]
+
+        asyncio.run(game.play_turn())
+
+        self.assertEqual((server.batches, server.requests), (1, 1))
+
+    def test_cached_positions_are_not_sent(self):
+        """Test that only the positions missing from the prediction cache are evaluated."""
+        server = InferenceServer(max_batch_size=8, max_wait=0.001)
+        first = asyncio.run(play(create_games(1, server, cache_size=4321)[0]))
+        requests = server.requests
+
+        again = asyncio.run(play(create_games(1, server, cache_size=4321)[0]))
+
+        self.assertEqual(again.board.to_bytes(), first.board.to_bytes())
+        self.assertEqual(requests, first.turns)
+        self.assertEqual(server.requests, requests)
+
+    def test_errors_reach_every_request(self):
+        """Test that an error of a batch is raised in every game waiting for it."""
+        server = InferenceServer(max_batch_size=2)
+        games = create_games(2, server)
+
+        async def play_all() -> list[object]:
+            return await asyncio.gather(*(game.play_turn() for game in games),
+                                        return_exceptions=True)
+
+        with mock.patch.object(AIPlayer, "q_values", side_effect=RuntimeError("failed")):
+            results = asyncio.run(play_all())
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""This module provides unit tests for the round-robin league."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src.tournament import league
+from src.tournament.league import RANDOM, RANDOM_RATING, Pairing, bradley_terry, load_pairings, \
+    run_league
+
+class TestBradleyTerry(unittest.TestCase):
+    """Test cases for the Bradley-Terry ratings"""
+
+    def test_even_results(self):
+        """Test that players with even results against RandomPlayer are rated like it."""
+        ratings = bradley_terry([Pairing("o_a", RANDOM, (0, 0), wins=5, losses=5),
+                                 Pairing(RANDOM, "x_b", (0, 0), draws=10)])
+
+        for player in ("o_a", "x_b", RANDOM):
+            self.assertAlmostEqual(ratings[player], RANDOM_RATING)
+
+    def test_stronger_player_is_rated_higher(self):
+        """Test that the ratings follow the results, even for unbeaten players."""
+        ratings = bradley_terry([Pairing("o_a", RANDOM, (0, 0), wins=10),
+                                 Pairing("o_a", "x_b", (0, 0), wins=6, losses=4),
+                                 Pairing(RANDOM, "x_b", (0, 0), losses=8, draws=2)])
+
+        self.assertGreater(ratings["o_a"], ratings["x_b"])
+        self.assertGreater(ratings["x_b"], ratings[RANDOM])
+        self.assertLess(ratings["o_a"], RANDOM_RATING + 1000)
+
+class TestLeague(unittest.TestCase):
+    """Test cases for running the league"""
+
+    def setUp(self):
+        """Play the base models in a league with a temporary ratings file."""
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = os.path.join(self.directory.name, "league.json")
+        self.patch = mock.patch("src.tournament.league.league_players",
+                                return_value=([RANDOM, "o_base"], [RANDOM, "x_base"]))
+        self.patch.start()
+
+    def tearDown(self):
+        """Remove the temporary ratings file."""
+        self.patch.stop()
+        self.directory.cleanup()
+
+    def test_every_pairing_is_played(self):
+        """Test that all pairings but RandomPlayer against itself are played and saved."""
+        result = run_league(4, seed=0, path=self.path)
+
+        self.assertEqual(result.played, 3)
+        self.assertEqual({ pairing.games for pairing in result.pairings }, { 4 })
+        self.assertEqual(set(load_pairings(self.path)),
+                         { "o_base vs random", "random vs x_base", "o_base vs x_base" })
+        self.assertEqual(result.top_models("o_"), ["o_base"])
+
+        self.assertGreater(result.cache_hits + result.cache_misses, 0)
+        self.assertIn("Prediction cache:", result.report())
+
+    def test_cached_pairings_are_not_replayed(self):
+        """Test that only the pairings of changed models are played again."""
+        first = run_league(4, seed=0, path=self.path)
+        self.assertEqual(run_league(4, seed=0, path=self.path).played, 0)
+
+        version = league._version  # pylint: disable=protected-access
+        retrained = mock.patch("src.tournament.league._version", side_effect=lambda player:
+                               -1.0 if player == "x_base" else version(player))
+
+        with retrained:
+            result = run_league(4, seed=0, path=self.path)
+
+        self.assertEqual(result.played, 2)
+        self.assertEqual(set(result.ratings), set(first.ratings))
+
+        with retrained:
+            self.assertEqual(run_league(4, seed=0, path=self.path).played, 0)
+
+    def test_other_openings_are_replayed(self):
+        """Test that the pairings are played again with another number of opening moves."""
+        result = run_league(4, seed=0, path=self.path, opening_moves=0)
+        self.assertEqual({ pairing.opening_moves for pairing in result.pairings }, { 0 })
+
+        result = run_league(4, seed=0, path=self.path)
+        self.assertEqual(result.played, 3)
+        self.assertEqual(load_pairings(self.path)["o_base vs x_base"].opening_moves, 2)
+        self.assertEqual(run_league(4, seed=0, path=self.path).played, 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""This module provides unit tests for the legal action masking of MaskedDQN."""
+
+import unittest
+import random
+import numpy as np
+import numpy.testing as npt
+import torch as th
+from src.agent.masked_dqn import MaskedDQN, max_legal_q_values, observation_action_masks
+from src.agent.observation import NEXT
+from src.agent.tictactoe_env import TicTacToeEnv
+from src.agent.tictactoe_vec_env import TicTacToeVecEnv
+
+class TestMaskedDQN(unittest.TestCase):
+    """Test cases for the MaskedDQN class"""
+
+    def test_observation_masks_match_info(self):
+        """Test that the masks found in observations match the environment's masks."""
+        env = TicTacToeEnv()
+        observation, info = env.reset(seed=0)
+
+        for _ in range(200):
+            mask = observation_action_masks(th.as_tensor(observation[np.newaxis]))[0]
+            npt.assert_array_equal(mask.numpy(), info["action_mask"])
+
+            action = random.choice(np.flatnonzero(info["action_mask"]))
+            observation, _, done, _, info = env.step(action)
+
+            if done:
+                observation, info = env.reset()
+
+    def test_masked_observations(self):
+        """Test that observations ending with the masks match the single environment."""
+        env = TicTacToeVecEnv(2, mask_observation=True)
+        observations = env.reset()
+        single_env = TicTacToeEnv(mask_observation=True)
+
+        npt.assert_array_equal(observations[0], single_env.reset()[0])
+        npt.assert_array_equal(observation_action_masks(th.as_tensor(observations)).numpy(),
+                               env.batch.legal_action_masks())
+
+    def test_only_legal_actions_are_chosen(self):
+        """Test that both greedy and exploring actions are legal."""
+        env = TicTacToeVecEnv(64, seed=0)
+        model = MaskedDQN("MlpPolicy", env, exploration_initial_eps=0.5)
+        observations = env.reset()
+
+        for deterministic in (True, False):
+            for _ in range(20):
+                actions, _ = model.predict(observations, deterministic=deterministic)
+                masks = env.batch.legal_action_masks()
+
+                self.assertTrue(masks[np.arange(64), actions].all())
+                observations, rewards, _, _ = env.step(actions)
+                self.assertTrue((rewards > -100).all())
+
+    def test_target_ignores_illegal_actions(self):
+        """Test that the bootstrapped Q-value is the highest one of the legal actions."""
+        env = TicTacToeEnv()
+        env.reset(seed=0)
+        observation, _, _, _, info = env.step(40)
+        empty = np.zeros_like(observation)
+        empty[NEXT] = -1
+        observations = th.as_tensor(np.stack([observation, empty]))
+
+        illegal = np.flatnonzero(~info["action_mask"])[0]
+        legal = np.flatnonzero(info["action_mask"])[0]
+        q_values = th.zeros(2, 81)
+        q_values[:, illegal] = 1000.0
+        q_values[:, legal] = 1.0
+
+        # All the actions of the empty board are legal
+        npt.assert_array_equal(max_legal_q_values(q_values, observations).numpy(), [1.0, 1000.0])
+
+    def test_train(self):
+        """Test that the masked targets train without NaN losses."""
+        model = MaskedDQN("MlpPolicy", TicTacToeVecEnv(8, seed=0), learning_starts=64,
+                          train_freq=4, gradient_steps=1, batch_size=32)
+        model.learn(total_timesteps=512)
+
+        for parameter in model.q_net.parameters():
+            self.assertTrue(th.isfinite(parameter).all())
+
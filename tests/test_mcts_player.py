@@ -0,0 +1,106 @@
+"""This module provides unit tests for the MCTSPlayer class."""
+
+import random
+import unittest
+from unittest import mock
+from src.players.mcts_player import MCTSPlayer, SearchState
+from src.tictactoe.board import CELL_COORDINATES
+from src.tictactoe.console_game import ConsoleGame
+from src.tictactoe.game import Game
+
+class TestMCTSPlayer(unittest.TestCase):
+    """Test cases for the MCTSPlayer class"""
+
+    def setUp(self):
+        """Set up a game and a player for testing."""
+        random.seed(0)
+        self.game = Game(2, auto_save=False)
+        self.player = MCTSPlayer(iterations=200)
+
+    def play(self, *moves):
+        """Take turns in the game."""
+        for move in moves:
+            self.game.take_turn(*move)
+
+    def test_search_state_follows_game(self):
+        """Test that the search state has the game's legal moves and winner."""
+        state = SearchState.from_board(self.game.board, self.game.next)
+
+        while self.game.winner is None and not self.game.board.is_full():
+            self.assertEqual(sorted(CELL_COORDINATES[move] for move in state.moves()),
+                             sorted(self.game.board.legal_moves(self.game.next)))
+
+            move = random.choice(state.moves())
+            state.play(move)
+            self.game.take_turn(*CELL_COORDINATES[move])
+
+        self.assertEqual(state.winner, self.game.winner or 0)
+        self.assertEqual(state.moves(), [])
+
+    def test_legal_move(self):
+        """Test that the selected move is legal."""
+        self.play((1, 1, 0, 2))
+
+        self.assertIn(self.player.get_turn(self.game.next, self.game.board),
+                      self.game.board.legal_moves(self.game.next))
+
+    def test_winning_move(self):
+        """Test that a move winning the game is found."""
+        # O has won the small boards (0, 0) and (1, 1) and has two marks in (2, 2)
+        board = self.game.board.board.copy()
+        board[0, 0, 0, :] = 1
+        board[1, 1, 0, :] = 1
+        board[2, 2, 0, :2] = 1
+        board[0, 1, 0, :] = 2
+        board[1, 0, 0, :2] = 2
+        board[2, 1, 1, :2] = 2
+        board[0, 2, 1, 1] = 2
+        self.game.board.board = board
+
+        self.assertEqual(self.player.get_turn((2, 2), self.game.board), (2, 2, 2, 0))
+
+    def test_subtree_reuse(self):
+        """Test that the search continues from the opponent's reply."""
+        self.play((1, 1, 1, 1))
+        self.play(self.player.get_turn(self.game.next, self.game.board))
+
+        reply = max(self.player._root.children, key=lambda child: child.visits)
+        reused = reply.visits
+        self.play(CELL_COORDINATES[reply.move])
+        self.player.get_turn(self.game.next, self.game.board)
+
+        self.assertGreater(reused, 0)
+        self.assertEqual(self.player.last_visits, reused + 200)
+
+    def test_new_game(self):
+        """Test that a position not following the last move gets a new tree."""
+        self.play((1, 1, 1, 1))
+        self.player.get_turn(self.game.next, self.game.board)
+        self.player.get_turn((-1, -1), Game(2, auto_save=False).board)
+
+        self.assertEqual(self.player.last_visits, 200)
+
+    def test_budget(self):
+        """Test that the search budget is validated and a time limit is kept."""
+        for budget in ({ "iterations": 0 }, { "time_limit": -1.0 }):
+            with self.assertRaises(ValueError):
+                MCTSPlayer(**budget)
+
+        player = MCTSPlayer(time_limit=0.05)
+        player.get_turn(self.game.next, self.game.board)
+
+        self.assertGreater(player.last_visits, 0)
+        self.assertIsNone(player.iterations)
+        self.assertEqual(player.get_type(), "MCTS")
+
+    def test_console_game(self):
+        """Test that the console game builds an MCTSPlayer only for its mode."""
+        with mock.patch("src.players.mcts_player.MCTSPlayer") as player:
+            ConsoleGame(2, auto_save=False)
+            player.assert_not_called()
+
+        game = ConsoleGame(4, is_o=False, auto_save=False)
+        self.assertIsInstance(game.players[game.player1], MCTSPlayer)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""This module provides unit tests for the training throughput metrics."""
+
+import csv
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from stable_baselines3.common.vec_env import DummyVecEnv, VecMonitor
+from src.agent.masked_dqn import MaskedDQN
+from src.agent.metrics import ThroughputCallback, env_timers
+from src.agent.tictactoe_env import TicTacToeEnv
+from src.agent.tictactoe_vec_env import TicTacToeVecEnv
+
+class TestEnvTimers(unittest.TestCase):
+    """Test cases for the environment counters"""
+
+    def test_env_counts_steps_and_illegal_moves(self):
+        """Test that an illegal move ends a counted episode."""
+        env = TicTacToeEnv()
+        env.reset(seed=0)
+        env.step(0)
+        env.step(0)
+
+        self.assertEqual(env.timers.steps, 2)
+        self.assertEqual(env.timers.illegal_moves, 1)
+        self.assertEqual(env.timers.episodes, 1)
+        self.assertEqual(env.timers.episode_steps, 2)
+        self.assertGreater(env.timers.step_time, env.timers.opponent_time)
+
+    def test_vec_env_counts_every_game(self):
+        """Test that a TicTacToeVecEnv counts the moves and episodes of all its games."""
+        env = VecMonitor(TicTacToeVecEnv(4, seed=0))
+        env.reset()
+        env.step(np.zeros(4, dtype=np.intp))
+        env.step(np.zeros(4, dtype=np.intp))
+
+        timers = env_timers(env)
+        self.assertEqual(timers.steps, 8)
+        self.assertEqual(timers.illegal_moves, 4)
+        self.assertEqual(timers.episodes, 4)
+        self.assertEqual(timers.episode_steps, 8)
+
+    def test_timers_are_summed_over_environments(self):
+        """Test that the timers of separate environments are added up."""
+        env = DummyVecEnv([TicTacToeEnv, TicTacToeEnv])
+        env.reset()
+        env.step(np.array([0, 1]))
+
+        self.assertEqual(env_timers(env).steps, 2)
+
+class TestThroughputCallback(unittest.TestCase):
+    """Test cases for ThroughputCallback"""
+
+    def setUp(self):
+        """Create a temporary directory for the metrics."""
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.directory.cleanup()
+
+    def train(self, file_name: str) -> str:
+        """Train a small model, writing its metrics to a file in the temporary directory."""
+        path = os.path.join(self.directory.name, "metrics", file_name)
+        model = MaskedDQN("MlpPolicy", TicTacToeVecEnv(4, seed=0), learning_starts=100)
+        model.learn(total_timesteps=400, callback=ThroughputCallback(path, log_interval=200))
+
+        return path
+
+    def test_csv_rows(self):
+        """Test that a CSV row is written every interval, with plausible values."""
+        with open(self.train("metrics.csv"), newline="", encoding="utf-8") as file:
+            rows = list(csv.DictReader(file))
+
+        self.assertEqual([int(row["timesteps"]) for row in rows], [200, 400])
+
+        for row in rows:
+            self.assertGreater(float(row["steps_per_second"]), 0)
+            self.assertGreater(float(row["episode_length"]), 0)
+            self.assertEqual(float(row["illegal_move_rate"]), 0)
+
+            for share in ("env_step_share", "opponent_share", "train_share"):
+                self.assertTrue(0 <= float(row[share]) <= 1)
+
+        self.assertGreater(float(rows[-1]["train_share"]), 0)
+
+    def test_jsonl_rows(self):
+        """Test that .jsonl files get one JSON object per row."""
+        with open(self.train("metrics.jsonl"), encoding="utf-8") as file:
+            rows = [json.loads(line) for line in file]
+
+        self.assertEqual([row["timesteps"] for row in rows], [200, 400])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""This module provides unit tests for the model registry."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from src.agent.model_registry import MODEL_REGISTRY, ModelRegistry, model_size
+from src.agent.models_path import MODELS_PATH
+from src.players.ai_player import AIPlayer
+
+class TestModelRegistry(unittest.TestCase):
+    """Test cases for ModelRegistry"""
+
+    def setUp(self):
+        """Copy the base models to a temporary directory."""
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+        for name in ("o_base", "x_base"):
+            shutil.copy(os.path.join(MODELS_PATH, f"{name}.zip"), self.directory.name)
+
+        self.o_path = os.path.join(self.directory.name, "o_base")
+        self.x_path = os.path.join(self.directory.name, "x_base.zip")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.directory.cleanup()
+
+    def test_model_is_loaded_once(self):
+        """Test that a model is shared by every use, with or without the extension."""
+        registry = ModelRegistry()
+        model = registry.get(self.o_path)
+
+        self.assertIs(registry.get(f"{self.o_path}.zip"), model)
+        self.assertEqual(registry.loads, 1)
+        self.assertEqual(registry.memory, model_size(model))
+
+    def test_typed_accessors(self):
+        """Test that the typed accessors reject models of the other type."""
+        registry = ModelRegistry()
+        self.assertIs(registry.get_dqn(self.o_path), registry.get(self.o_path))
+
+        with self.assertRaises(TypeError):
+            registry.get_network(self.o_path)
+
+    def test_changed_file_is_reloaded(self):
+        """Test that a model is reloaded when its file's modification time changes."""
+        registry = ModelRegistry()
+        model = registry.get(self.o_path)
+
+        mtime = os.path.getmtime(f"{self.o_path}.zip")
+        os.utime(f"{self.o_path}.zip", (mtime + 10, mtime + 10))
+
+        self.assertIsNot(registry.get(self.o_path), model)
+        self.assertEqual(registry.loads, 2)
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that the least recently used model is evicted above the memory cap."""
+        registry = ModelRegistry()
+        registry.get(self.o_path)
+        registry.get(self.x_path)
+        registry.get(self.o_path)
+
+        registry.set_memory_cap(registry.memory - 1)
+
+        self.assertEqual(len(registry), 1)
+        self.assertIn(self.o_path, registry)
+        self.assertNotIn(self.x_path.removesuffix(".zip"), registry)
+
+        registry.set_memory_cap(0)
+        self.assertEqual(len(registry), 1)
+
+    def test_ai_players_share_models(self):
+        """Test that AIPlayers of the same model share it."""
+        self.assertIs(AIPlayer("o_base").model, AIPlayer("o_base").model)
+        self.assertIn(os.path.join(MODELS_PATH, "o_base"), MODEL_REGISTRY)
+
+if __name__ == "__main__":
+    unittest.main()
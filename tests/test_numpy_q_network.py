@@ -0,0 +1,67 @@
+"""This module provides unit tests for the NumPy Q-Network inference."""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import numpy.testing as npt
+import torch as th
+from src.agent.masked_dqn import MaskedDQN
+from src.agent.numpy_q_network import NumpyQNetwork, export_path, export_q_network
+from src.agent.tictactoe_env import TicTacToeEnv
+from src.players.ai_player import AIPlayer
+
+class TestNumpyQNetwork(unittest.TestCase):
+    """Test cases for NumpyQNetwork and the AIPlayer backends"""
+
+    def setUp(self):
+        """Save an untrained model and export its Q-Network to a temporary directory."""
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = os.path.join(self.directory.name, "model")
+
+        self.model = MaskedDQN("MlpPolicy", TicTacToeEnv(mask_observation=True), seed=0)
+        self.model.save(self.path)
+        export_q_network(self.model, export_path(self.path))
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.directory.cleanup()
+
+    def test_q_values_match_torch(self):
+        """Test that the exported Q-Network gives the Q-values of the model's."""
+        network = NumpyQNetwork.load(export_path(self.path))
+        observations = np.random.default_rng(0).integers(-1, 3, (32, 173), dtype=np.int8)
+
+        with th.no_grad():
+            expected = self.model.q_net(th.as_tensor(observations)).numpy()
+
+        self.assertEqual(network.observation_shape, (173,))
+        npt.assert_allclose(network.q_values(observations), expected, rtol=1e-5, atol=1e-5)
+
+    def test_backends_choose_the_same_moves(self):
+        """Test that AIPlayer uses an up-to-date export and both backends agree."""
+        numpy_player = AIPlayer(self.path)
+        torch_player = AIPlayer(self.path, backend="torch")
+        self.assertEqual(numpy_player.backend, "numpy")
+
+        env = TicTacToeEnv()
+        env.reset(seed=0)
+
+        for _ in range(10):
+            board, next_board = env.game.board, env.game.next
+            self.assertEqual(numpy_player.get_turn(next_board, board),
+                             torch_player.get_turn(next_board, board))
+            env.game.take_turn(*numpy_player.get_turn(next_board, board))
+
+    def test_stale_export_is_not_used(self):
+        """Test that an export older than its model isn't used by default."""
+        mtime = os.path.getmtime(f"{self.path}.zip")
+        os.utime(export_path(self.path), (mtime - 10, mtime - 10))
+
+        self.assertEqual(AIPlayer(self.path).backend, "torch")
+
+        with self.assertRaises(ValueError):
+            AIPlayer(self.path, backend="onnx")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""This module provides unit tests for the flat observation layout."""
+
+import unittest
+import numpy as np
+import numpy.testing as npt
+from src.agent.observation import ACTION_MASK, BIG_BOARD, NEXT, MASKED_OBSERVATION_SIZE, \
+    write_batch_observations, write_observation
+from src.tictactoe.batch_board import ACTION_COORDINATES, BatchBoard
+from src.tictactoe.board import Board
+
+class TestObservation(unittest.TestCase):
+    """Test cases for writing observations"""
+
+    def test_board_and_batch_observations_match(self):
+        """Test that a Board and a BatchBoard in the same position give the same observation."""
+        rng = np.random.default_rng(0)
+        batch = BatchBoard(1)
+        board = Board()
+        next_board = (-1, -1)
+
+        observation = np.zeros(MASKED_OBSERVATION_SIZE, dtype=np.int8)
+        batch_observations = np.zeros((1, MASKED_OBSERVATION_SIZE), dtype=np.int8)
+
+        while not batch.done[0]:
+            action = int(rng.choice(np.flatnonzero(batch.legal_action_masks()[0])))
+            big_x, big_y, small_x, small_y = (int(x) for x in ACTION_COORDINATES[action])
+
+            board.play_turn(int(batch.current_players[0]), big_x, big_y, small_x, small_y)
+            batch.play(np.array([action]))
+            next_board = (small_x, small_y) if board.check_small_board_valid(small_x, small_y) \
+                else (-1, -1)
+
+            write_observation(observation, board, next_board)
+            write_batch_observations(batch_observations, batch)
+            npt.assert_array_equal(observation, batch_observations[0])
+
+    def test_layout(self):
+        """Test the positions of the big board, the next board and the action mask."""
+        board = Board()
+        board.play_turn(1, 1, 1, 0, 0)
+        observation = np.zeros(MASKED_OBSERVATION_SIZE, dtype=np.int8)
+
+        write_observation(observation, board, (0, 0))
+
+        npt.assert_array_equal(observation[BIG_BOARD], 0)
+        npt.assert_array_equal(observation[NEXT], [0, 0])
+        self.assertEqual(observation[ACTION_MASK].sum(), 9)
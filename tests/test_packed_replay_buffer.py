@@ -0,0 +1,89 @@
+"""This module provides unit tests for the PackedReplayBuffer class."""
+
+import unittest
+import numpy as np
+import numpy.testing as npt
+from stable_baselines3.common.buffers import ReplayBuffer
+from src.agent.packed_replay_buffer import PackedReplayBuffer, pack_observations, \
+    unpack_observations
+from src.agent.tictactoe_vec_env import TicTacToeVecEnv
+
+class TestPackedReplayBuffer(unittest.TestCase):
+    """Test cases for the PackedReplayBuffer class"""
+
+    def test_observations_round_trip(self):
+        """Test that packing and unpacking observations gives them back, masks included."""
+        for mask_observation in (False, True):
+            env = TicTacToeVecEnv(32, seed=0, mask_observation=mask_observation)
+            observations = env.reset()
+            rng = np.random.default_rng(0)
+
+            for _ in range(30):
+                masks = env.batch.legal_action_masks()
+                observations, _, _, _ = env.step(np.argmax(rng.random(masks.shape) * masks, 1))
+
+                npt.assert_array_equal(
+                    unpack_observations(pack_observations(observations), observations.shape[1]),
+                    observations)
+
+    def test_samples_match_replay_buffer(self):
+        """Test that the sampled transitions are the ones ReplayBuffer would sample."""
+        env = TicTacToeVecEnv(4, seed=0)
+        buffers = [buffer_class(50, env.observation_space, env.action_space, "cpu", n_envs=4)
+                   for buffer_class in (ReplayBuffer, PackedReplayBuffer)]
+
+        rng = np.random.default_rng(0)
+        observations = env.reset().copy()
+
+        for _ in range(20):
+            masks = env.batch.legal_action_masks()
+            actions = np.argmax(rng.random(masks.shape) * masks, axis=1)
+            next_observations, rewards, dones, infos = env.step(actions)
+
+            for buffer in buffers:
+                buffer.add(observations, next_observations, actions, rewards, dones, infos)
+
+            observations = next_observations.copy()
+
+        samples = []
+
+        for buffer in buffers:
+            np.random.seed(0)
+            samples.append(buffer.sample(32))
+
+        for expected, actual in zip(*samples):
+            npt.assert_array_equal(expected.numpy(), actual.numpy())
+
+    def test_resize_envs(self):
+        """Test that resizing keeps the newest transitions for the new number of environments."""
+        env = TicTacToeVecEnv(4, seed=0)
+        buffer = PackedReplayBuffer(24, env.observation_space, env.action_space, "cpu", n_envs=4)
+        observations = env.reset().copy()
+
+        for step in range(8):
+            masks = env.batch.legal_action_masks()
+            actions = np.argmax(masks, axis=1)
+            next_observations, _, dones, infos = env.step(actions)
+
+            buffer.add(observations, next_observations, actions, np.full(4, step), dones, infos)
+            observations = next_observations.copy()
+
+        # 6 rows of 4 transitions, the oldest 2 rows overwritten
+        buffer.resize_envs(3)
+
+        self.assertEqual((buffer.buffer_size, buffer.n_envs, buffer.pos, buffer.full),
+                         (8, 3, 0, True))
+        npt.assert_array_equal(buffer.rewards.ravel(), np.repeat(np.arange(2, 8), 4))
+
+        # Fewer transitions fit when the environments don't divide the capacity
+        buffer.resize_envs(5)
+
+        self.assertEqual((buffer.buffer_size, buffer.pos, buffer.full), (4, 0, True))
+        npt.assert_array_equal(buffer.rewards.ravel(), np.repeat(np.arange(2, 8), 4)[4:])
+
+    def test_unsupported_observation_space(self):
+        """Test that only flat Mega Tic Tac Toe observations are accepted."""
+        env = TicTacToeVecEnv(1)
+
+        with self.assertRaises(ValueError):
+            PackedReplayBuffer(10, env.action_space, env.action_space)
@@ -0,0 +1,98 @@
+"""This module provides unit tests for the AIPlayer prediction cache."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from src.agent.models_path import MODELS_PATH
+from src.agent.prediction_cache import PredictionCache, position_key
+from src.players.ai_player import AIPlayer
+from src.tictactoe.board import Board
+
+class TestPredictionCache(unittest.TestCase):
+    """Test cases for PredictionCache"""
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that the cache keeps its most recently used positions."""
+        cache = PredictionCache(max_size=2)
+        cache.put(1, np.zeros(81))
+        cache.put(2, np.ones(81))
+        cache.get(1)
+        cache.put(3, np.ones(81))
+
+        self.assertIsNone(cache.get(2))
+        self.assertIsNotNone(cache.get(1))
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertEqual(len(cache), 2)
+
+    def test_validate_clears_on_change(self):
+        """Test that the cache is cleared when the model's file changes."""
+        cache = PredictionCache()
+        cache.validate(1.0)
+        cache.put(1, np.zeros(81))
+        cache.validate(1.0)
+        self.assertEqual(len(cache), 1)
+
+        cache.validate(2.0)
+        self.assertEqual(len(cache), 0)
+
+    def test_position_key(self):
+        """Test that positions differing in the small board to play on have different keys."""
+        board = Board()
+        board.play_turn(1, 1, 1, 0, 0)
+
+        self.assertNotEqual(position_key(board, (0, 0)), position_key(board, (-1, -1)))
+
+class TestAIPlayerCache(unittest.TestCase):
+    """Test cases for the prediction cache of AIPlayer"""
+
+    def setUp(self):
+        """Copy the base model to a temporary directory."""
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        shutil.copy(os.path.join(MODELS_PATH, "o_base.zip"), self.directory.name)
+        self.path = os.path.join(self.directory.name, "o_base")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.directory.cleanup()
+
+    def test_repeated_positions_are_not_evaluated(self):
+        """Test that a repeated position reuses the Q-values, shared between players."""
+        player, other = AIPlayer(self.path), AIPlayer(self.path)
+        board = Board()
+        turn = player.get_turn((-1, -1), board)
+
+        with mock.patch.object(AIPlayer, "q_values") as q_values:
+            self.assertEqual(other.get_turn((-1, -1), board), turn)
+            q_values.assert_not_called()
+
+        self.assertIs(player.cache, other.cache)
+        self.assertEqual((player.cache.hits, player.cache.misses), (1, 1))
+
+    def test_cache_size(self):
+        """Test that players of a model with other cache sizes don't share a cache."""
+        player, uncached = AIPlayer(self.path), AIPlayer(self.path, cache_size=0)
+        board = Board()
+
+        player.get_turn((-1, -1), board)
+        uncached.get_turn((-1, -1), board)
+
+        self.assertIsNot(player.cache, uncached.cache)
+        self.assertEqual(len(uncached.cache), 0)
+        self.assertEqual(uncached.cache.misses, 1)
+
+    def test_changed_model_invalidates(self):
+        """Test that the Q-values are evaluated again when the model's file changes."""
+        player = AIPlayer(self.path)
+        player.get_turn((-1, -1), Board())
+
+        mtime = os.path.getmtime(f"{self.path}.zip")
+        os.utime(f"{self.path}.zip", (mtime + 10, mtime + 10))
+        player.get_turn((-1, -1), Board())
+
+        self.assertEqual(player.cache.misses, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Unit tests for the 3x3 board lookup tables.
+"""
+
+import unittest
+import numpy as np
+from src.tictactoe.board import Board
+from src.tictactoe.small_board_tables import FULL, OPEN_LINES, VALUES, WINNERS, WINNING_CELLS, \
+    board_code
+
+class TestSmallBoardTables(unittest.TestCase):
+    """
+    Test cases for the lookup tables.
+    """
+
+    def test_empty_board(self):
+        """Test the entries of the empty board."""
+        self.assertEqual(WINNERS[0], 0)
+        self.assertFalse(FULL[0])
+        self.assertEqual(WINNING_CELLS[0].tolist(), [0, 0])
+        self.assertEqual(OPEN_LINES[0].tolist(), [8, 8])
+        self.assertEqual(VALUES[0].tolist(), [0, 0])
+
+    def test_threats_and_values(self):
+        """Test a board where player 1 threatens two lines."""
+        # o o .
+        # . x .
+        # o . x
+        code: int = board_code(np.array([[1, 1, 0], [0, 2, 0], [1, 0, 2]]))
+
+        self.assertEqual(WINNERS[code], 0)
+        self.assertEqual(WINNING_CELLS[code, 0], 1 << 2 | 1 << 3)
+        self.assertEqual(WINNING_CELLS[code, 1], 0)
+        self.assertEqual(OPEN_LINES[code].tolist(), [2, 2])
+        self.assertEqual(VALUES[code, 0], 1)
+        self.assertEqual(VALUES[code, 1], 1)
+
+    def test_winner_and_full(self):
+        """Test a full board won by player 2."""
+        # x o o
+        # o x x
+        # o x x
+        code: int = board_code(np.array([[2, 1, 1], [1, 2, 2], [1, 2, 2]]))
+
+        self.assertEqual(WINNERS[code], 2)
+        self.assertTrue(FULL[code])
+        self.assertEqual(VALUES[code].tolist(), [-1, -1])
+
+    def test_board_small_code(self):
+        """Test that the code of a small board of Board matches the array code."""
+        board: Board = Board()
+        board.play_turn(1, 1, 2, 0, 0)
+        board.play_turn(2, 1, 2, 2, 1)
+
+        self.assertEqual(board.small_code(1, 2), board_code(board.board[2, 1]))
+        self.assertEqual(board.small_code(1, 2), 1 + 2 * 3 ** 5)
+
+    def test_check_board_win_ignores_full_cells(self):
+        """Test checking a big board which has full small boards."""
+        big_board = np.array([[2, Board.FULL, 1], [2, 1, Board.FULL], [2, Board.EMPTY, 1]])
+
+        self.assertTrue(Board.check_board_win(big_board, 2))
+        self.assertFalse(Board.check_board_win(big_board, 1))
+
+if __name__ == '__main__':
+    unittest.main()
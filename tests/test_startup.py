@@ -0,0 +1,39 @@
+"""
+This module provides startup tests, guarding that non-AI modes start without ML.
+The launch time depends on the machine, so it is an opt-in benchmark run with BENCHMARK=1.
+"""
+
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ML_MODULES: tuple[str, ...] = ("torch", "stable_baselines3", "gymnasium")
+
+class TestStartup(unittest.TestCase):
+    """Test cases for the startup time of the game"""
+
+    def test_menu_does_not_import_ml(self):
+        """Test that the main menu and console games don't import the ML libraries."""
+        modules = subprocess.run(
+            [sys.executable, "-c",
+             "import sys, main, src.tictactoe.console_game; " +
+             f"print(','.join(m for m in {ML_MODULES!r} if m in sys.modules))"],
+            cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+
+        self.assertEqual(modules, "")
+
+    @unittest.skipUnless(os.environ.get("BENCHMARK"), "set BENCHMARK=1 to run benchmarks")
+    def test_launch_is_fast(self):
+        """Test that launching the game takes well under a second."""
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "main.py", "--help"],
+                       cwd=ROOT, capture_output=True, check=True)
+
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Unit tests for the board symmetries.
+"""
+
+import unittest
+import numpy.testing as npt
+from src.tictactoe.board import Board
+from src.tictactoe.symmetry import TRANSFORMS, ACTION_PERMUTATIONS, canonicalize, \
+    transform_action, restore_action, transform_board_array, transform_next
+
+class TestSymmetry(unittest.TestCase):
+    """
+    Test cases for the symmetry functions.
+    """
+
+    def setUp(self):
+        """Set up a board with a few moves for each test."""
+        self.board = Board()
+        self.board.play_turn(1, 0, 0, 1, 0)
+        self.board.play_turn(2, 1, 0, 2, 2)
+        self.board.play_turn(1, 2, 2, 0, 1)
+        self.next_board: tuple[int, int] = (0, 1)
+
+    def transformed(self, transform: int) -> Board:
+        """Helper method to build the transformed board."""
+        board: Board = Board()
+        board.board = transform_board_array(self.board.board, transform)
+        return board
+
+    def test_symmetric_positions_share_canonical_form(self):
+        """Test that all 8 symmetric positions have the same canonical form and key."""
+        canonical = canonicalize(self.board, self.next_board)
+
+        for transform in range(TRANSFORMS):
+            other = canonicalize(self.transformed(transform),
+                                 transform_next(self.next_board, transform))
+
+            self.assertEqual(other.cells, canonical.cells)
+            self.assertEqual(other.next_board, canonical.next_board)
+            self.assertEqual(other.key, canonical.key)
+
+    def test_canonical_transform_gives_canonical_cells(self):
+        """Test that the returned transform maps the position to the canonical one."""
+        canonical = canonicalize(self.board, self.next_board)
+        board: Board = self.transformed(canonical.transform)
+
+        self.assertEqual(board.cells, canonical.cells)
+        self.assertEqual(transform_next(self.next_board, canonical.transform),
+                         canonical.next_board)
+
+    def test_action_permutations_map_legal_moves(self):
+        """Test that the action permutations map the legal actions of symmetric positions."""
+        mask = self.board.legal_action_mask(self.next_board)
+
+        for transform in range(TRANSFORMS):
+            other = self.transformed(transform) \
+                .legal_action_mask(transform_next(self.next_board, transform))
+
+            npt.assert_array_equal(other[ACTION_PERMUTATIONS[transform]], mask)
+
+    def test_restore_action_inverts_transform_action(self):
+        """Test mapping actions to a transformed position and back."""
+        for transform in range(TRANSFORMS):
+            for action in range(81):
+                self.assertEqual(restore_action(transform_action(action, transform), transform),
+                                 action)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,9 @@
 """This module provides unit tests for the TicTacToeEnv class."""
 
+import random
 import unittest
+import numpy as np
+from src.agent.observation import ACTION_MASK
 from src.agent.tictactoe_env import TicTacToeEnv
 
 class TestTicTacToeEnv(unittest.TestCase):
@@ -23,3 +26,50 @@ class TestTicTacToeEnv(unittest.TestCase):
         _, reward, _, _, _ = self.env.step(0)  # Invalid move, same spot
 
         self.assertLess(reward, 0)
+
+    def test_info_has_legal_action_mask(self):
+        """Test that the info has the mask of the legal actions."""
+        _, info = self.env.reset()
+        self.assertTrue(info["action_mask"].all())
+
+        _, _, _, _, info = self.env.step(0)
+        game = self.env.game
+
+        self.assertFalse(info["action_mask"][0])
+        self.assertTrue((info["action_mask"] == game.board.legal_action_mask(game.next)).all())
+
+    def test_mask_observation(self):
+        """Test that the observation includes the legal action mask when asked to."""
+        env = TicTacToeEnv(mask_observation=True)
+        observation, info = env.reset()
+
+        self.assertTrue((observation[ACTION_MASK] == info["action_mask"]).all())
+
+    def test_seed_is_per_env(self):
+        """Test that seeding an env repeats its games without touching the random module."""
+        state = random.getstate()
+        envs = [TicTacToeEnv(train_x=True), TicTacToeEnv(train_x=True)]
+
+        observations = [env.reset(seed=7)[0].copy() for env in envs]
+        self.assertEqual(random.getstate(), state)
+
+        for _ in range(5):
+            for env, observation in zip(envs, observations):
+                action = int(env.game.board.legal_action_mask(env.game.next).argmax())
+                observation[:] = env.step(action)[0]
+
+            self.assertTrue((observations[0] == observations[1]).all())
+
+    def test_observation_buffers(self):
+        """Test that an observation stays valid through the next step only."""
+        observation, _ = self.env.reset(seed=0)
+        snapshot = observation.copy()
+
+        next_observation = self.env.step(40)[0]
+        self.assertTrue((observation == snapshot).all())
+        self.assertFalse((next_observation == snapshot).all())
+
+        # The step after next reuses the buffer
+        action = int(self.env.game.board.legal_action_mask(self.env.game.next).argmax())
+        self.assertTrue(np.shares_memory(self.env.step(action)[0], observation))
+        self.assertFalse((observation == snapshot).all())
@@ -0,0 +1,114 @@
+"""This module provides unit tests for the TicTacToeVecEnv class."""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import numpy.testing as npt
+from src.agent.tictactoe_env import TicTacToeEnv
+from src.agent.masked_dqn import MaskedDQN
+from src.agent.observation import OBSERVATION_SIZE, action_coordinates, coordinates_action
+from src.agent.tictactoe_vec_env import TicTacToeVecEnv
+from src.players.ai_player import AIPlayer
+from src.players.bot_player import BotPlayer
+from src.tictactoe.board import Board
+
+class LastMovePlayer(BotPlayer):
+    """A deterministic bot which plays the last legal move."""
+    def get_turn(self, next_board: tuple[int, int], board: Board) -> tuple[int, int, int, int]:
+        """Returns the last legal move."""
+        return board.legal_moves(next_board)[-1]
+
+    def get_type(self) -> str:
+        """Returns the type of the player as a string."""
+        return "Last move"
+
+class TestTicTacToeVecEnv(unittest.TestCase):
+    """Test cases for the TicTacToeVecEnv class"""
+
+    def setUp(self):
+        """Set up a new TicTacToeVecEnv of 4 games for each test."""
+        self.env = TicTacToeVecEnv(4, seed=0)
+        self.observations = self.env.reset()
+
+    def test_reset_observations(self):
+        """Test that the initial observations are flat int8 empty boards."""
+        self.assertEqual(self.observations.shape, (4, OBSERVATION_SIZE))
+        self.assertEqual(self.observations.dtype, np.int8)
+        npt.assert_array_equal(self.observations[:, :90], Board.EMPTY)
+        npt.assert_array_equal(self.observations[:, 90:], -1)
+
+    def test_illegal_move_ends_game_and_resets(self):
+        """Test that an illegal move gives a negative reward and the game is reset."""
+        self.env.step(np.zeros(4, dtype=np.intp))
+        observations, rewards, dones, infos = self.env.step(np.array([0, 1, 2, 3]))
+
+        self.assertEqual(rewards[0], -100)
+        self.assertTrue(dones[0])
+        self.assertIn("terminal_observation", infos[0])
+        npt.assert_array_equal(observations[0], self.observations[0])
+
+    def test_coordinates_action_inverts_action_coordinates(self):
+        """Test converting between flat actions and board coordinates."""
+        for action in range(81):
+            self.assertEqual(coordinates_action(*action_coordinates(action)), action)
+
+    def test_matches_single_environment(self):
+        """Test that rewards, done flags and observations match TicTacToeEnv."""
+        rng = np.random.default_rng(0)
+        env: TicTacToeVecEnv = TicTacToeVecEnv(8, [LastMovePlayer()], train_x=True)
+        single_envs: list[TicTacToeEnv] = \
+            [TicTacToeEnv([LastMovePlayer()], train_x=True) for _ in range(8)]
+
+        observations = env.reset()
+
+        for i, single_env in enumerate(single_envs):
+            npt.assert_array_equal(single_env.reset()[0], observations[i])
+
+        for _ in range(60):
+            masks = env.batch.legal_action_masks()
+            actions = np.argmax(rng.random(masks.shape) * masks, axis=1)
+            observations, rewards, dones, _ = env.step(actions)
+
+            for i, single_env in enumerate(single_envs):
+                observation, reward, done, _, _ = single_env.step(int(actions[i]))
+
+                if done:
+                    observation, _ = single_env.reset()
+
+                self.assertEqual(rewards[i], reward)
+                self.assertEqual(dones[i], done)
+                npt.assert_array_equal(observations[i], observation)
+
+class TestAIOpponents(unittest.TestCase):
+    """Test cases for TicTacToeVecEnv games against AI players"""
+
+    def test_batched_moves_match_single_moves(self):
+        """Test that an AI opponent's batched moves are the moves it chooses game by game."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "opponent")
+            MaskedDQN("MlpPolicy", TicTacToeEnv(), seed=0).save(path)
+            opponent = AIPlayer(path)
+
+        env = TicTacToeVecEnv(16, [opponent], seed=0)
+        env.reset()
+        rng = np.random.default_rng(0)
+
+        for _ in range(5):
+            masks = env.batch.legal_action_masks()
+            playing = ~env.batch.done
+            actions = np.argmax(rng.random(masks.shape) * masks, axis=1)
+            env.batch.play(actions)
+
+            batched = env._opponent_actions(playing)  # pylint: disable=protected-access
+
+            for game in np.flatnonzero(playing & ~env.batch.done):
+                board = Board()
+                board.board = env.batch.boards[game]
+                board.big_board = env.batch.big_boards[game]
+                next_board = tuple(int(x) for x in env.batch.next_boards[game])
+
+                self.assertEqual(batched[game],
+                                 coordinates_action(*opponent.get_turn(next_board, board)))
+
+            env.batch.play(batched, playing & ~env.batch.done)
@@ -0,0 +1,97 @@
+"""This module provides unit tests for the headless tournament runner."""
+
+import random
+import unittest
+from src.players.ai_player import AIPlayer
+from src.players.bot_player import BotPlayer
+from src.players.mcts_player import MCTSPlayer
+from src.players.random_player import RandomPlayer
+from src.tictactoe.board import Board
+from src.tournament.tournament import create_bot, play_game, run_tournament, wilson_interval
+
+class FirstMovePlayer(BotPlayer):
+    """A deterministic bot playing the first legal move and recording the positions it saw"""
+
+    def __init__(self):
+        self.positions: list[tuple[int, int]] = []
+
+    def get_turn(self, next_board: tuple[int, int], board: Board) -> tuple[int, int, int, int]:
+        self.positions.append(board.cells)
+        return board.legal_moves(next_board)[0]
+
+    def get_type(self) -> str:
+        return "FirstMove"
+
+class TestTournament(unittest.TestCase):
+    """Test cases for the tournament runner"""
+
+    def test_create_bot(self):
+        """Test that bot specs create the bots of the right colour."""
+        self.assertIsInstance(create_bot("random", True), RandomPlayer)
+        self.assertIsInstance(create_bot("ai:base", False), AIPlayer)
+
+        self.assertEqual(create_bot("mcts:200", True).iterations, 200)
+        self.assertEqual(create_bot("mcts:0.1s", True).time_limit, 0.1)
+
+        for spec in ("human", "ai:", "ai:missing", "mcts:0", "mcts:fast", "mcts:-1s"):
+            with self.assertRaises(ValueError):
+                create_bot(spec, True)
+
+    def test_play_game(self):
+        """Test that a game is played to its end."""
+        self.assertIn(play_game(RandomPlayer(), RandomPlayer()), (0, 1, 2))
+
+    def test_opening_moves(self):
+        """Test that seeded random opening moves make games between deterministic bots differ."""
+        def play(seed: int, opening_moves: int) -> list[tuple[int, int]]:
+            random.seed(seed)
+            player: FirstMovePlayer = FirstMovePlayer()
+            play_game(player, player, opening_moves)
+            return player.positions
+
+        self.assertEqual(len({tuple(play(seed, 0)) for seed in range(5)}), 1)
+        self.assertEqual(len({tuple(play(seed, 2)) for seed in range(5)}), 5)
+        self.assertEqual(play(7, 2), play(7, 2))
+
+        # The bots only move after the openings
+        self.assertEqual(bin(play(0, 2)[0][0] | play(0, 2)[0][1]).count("1"), 2)
+
+    def test_results_add_up(self):
+        """Test that every game is counted once and the colours alternate."""
+        result = run_tournament("random", "random", 21, seed=0)
+
+        self.assertEqual(result.games, 21)
+        self.assertEqual(sum(result.as_o), 11)
+        self.assertGreater(result.games_per_second, 0)
+        self.assertIn("random vs random: 21 games", result.report())
+        self.assertNotIn("Prediction cache:", result.report())
+        self.assertIn("Openings: 2 random moves", result.report())
+        self.assertIn("Openings: none", run_tournament("random", "random", 1,
+                                                       opening_moves=0).report())
+
+    def test_cache_statistics(self):
+        """Test that the AI players' prediction cache lookups are reported."""
+        result = run_tournament("ai:base", "random", 4, seed=0)
+
+        self.assertGreater(result.cache_misses, 0)
+        self.assertIn("Prediction cache:", result.report())
+
+    def test_workers_match_single_process(self):
+        """Test that worker processes play the same seeded games as a single process."""
+        single = run_tournament("random", "random", 40, seed=3)
+        parallel = run_tournament("random", "random", 40, workers=2, seed=3)
+
+        self.assertEqual((single.wins, single.draws, single.losses, single.as_o),
+                         (parallel.wins, parallel.draws, parallel.losses, parallel.as_o))
+
+    def test_wilson_interval(self):
+        """Test the Wilson score interval against known values."""
+        low, high = wilson_interval(50, 100)
+        self.assertAlmostEqual(low, 0.4038, places=4)
+        self.assertAlmostEqual(high, 0.5962, places=4)
+
+        self.assertEqual(wilson_interval(0, 10)[0], 0.0)
+        self.assertEqual(wilson_interval(0, 0), (0.0, 1.0))
+
+if __name__ == "__main__":
+    unittest.main()
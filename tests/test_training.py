@@ -0,0 +1,101 @@
+"""This module provides unit tests for the training environments and checkpoints."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from src.agent.masked_dqn import MaskedDQN
+from src.agent.tictactoe_env import TicTacToeEnv
+from src.agent.training import get_checkpoint_path, latest_checkpoint, load_base_model, \
+    make_training_env, train_model
+
+class TestTrainingEnv(unittest.TestCase):
+    """Test cases for the environments created by make_training_env"""
+
+    def test_worker_processes(self):
+        """Test that every worker process plays its own game."""
+        env = make_training_env(True, n_workers=2, seed=0)
+
+        try:
+            observations = env.reset()
+            self.assertEqual(observations.shape, (2, 92))
+
+            _, rewards, dones, _ = env.step(np.array([1, 1]))
+            self.assertTrue((rewards > 0).all())
+            self.assertFalse(dones.any())
+        finally:
+            env.close()
+
+    def test_environments_and_workers_are_exclusive(self):
+        """Test that a vectorized environment can't be split across workers."""
+        with self.assertRaises(ValueError):
+            make_training_env(False, n_envs=4, n_workers=2)
+
+class TestCheckpoints(unittest.TestCase):
+    """Test cases for training checkpoints"""
+
+    def setUp(self):
+        """Train in a temporary models directory."""
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.patch = mock.patch("src.agent.training.MODELS_PATH", self.directory.name)
+        self.patch.start()
+
+    def tearDown(self):
+        """Remove the temporary models directory."""
+        self.patch.stop()
+        self.directory.cleanup()
+
+    def test_resume_from_latest_checkpoint(self):
+        """Test that training is resumed with the timesteps and replay buffer of a checkpoint."""
+        train_model("test", 400, True, n_envs=4, checkpoint_interval=200)
+
+        checkpoint_path = get_checkpoint_path("o_test")
+        model_path, buffer_path = latest_checkpoint(checkpoint_path)
+
+        self.assertTrue(model_path.endswith("model_400_steps.zip"))
+        self.assertIsNotNone(buffer_path)
+        self.assertEqual(sum(file.endswith(".pkl") for file in os.listdir(checkpoint_path)), 1)
+
+        train_model("test", 800, True, n_envs=4, checkpoint_interval=200, resume=True)
+        model = MaskedDQN.load(os.path.join(self.directory.name, "o_test"))
+
+        self.assertEqual(model.num_timesteps, 800)
+        self.assertTrue(latest_checkpoint(checkpoint_path)[0].endswith("model_800_steps.zip"))
+
+    def test_final_checkpoint(self):
+        """Test that the end of training is checkpointed and a fresh run clears old checkpoints."""
+        train_model("test", 320, True, n_envs=4, checkpoint_interval=200)
+        checkpoint_path = get_checkpoint_path("o_test")
+
+        self.assertTrue(latest_checkpoint(checkpoint_path)[0].endswith("model_320_steps.zip"))
+
+        train_model("test", 128, True, n_envs=4, checkpoint_interval=200)
+        self.assertEqual(latest_checkpoint(checkpoint_path),
+                         (os.path.join(checkpoint_path, "model_128_steps.zip"),
+                          os.path.join(checkpoint_path, "model_replay_buffer_128_steps.pkl")))
+
+    def test_resume_with_other_environments(self):
+        """Test that a checkpoint is resumed with another number of environments."""
+        train_model("test", 400, True, n_envs=4, checkpoint_interval=200)
+        train_model("test", 600, True, n_envs=2, checkpoint_interval=200, resume=True)
+
+        model = MaskedDQN.load(os.path.join(self.directory.name, "o_test"))
+        self.assertEqual(model.num_timesteps, 600)
+
+    def test_base_model(self):
+        """Test that the base model is trained further only if its observations fit."""
+        base_path = os.path.join(self.directory.name, "o_base")
+        MaskedDQN("MlpPolicy", TicTacToeEnv()).save(base_path)
+
+        self.assertIsNotNone(load_base_model(base_path, TicTacToeEnv(), 1000))
+        self.assertIsNone(load_base_model(base_path, TicTacToeEnv(mask_observation=True), 1000))
+
+        train_model("masked", 200, True, n_envs=2, mask_observation=True)
+        model = MaskedDQN.load(os.path.join(self.directory.name, "o_masked"))
+
+        self.assertEqual(model.observation_space.shape, (173,))
+
+    def test_no_checkpoint(self):
+        """Test that there is no latest checkpoint of an untrained model."""
+        self.assertIsNone(latest_checkpoint(get_checkpoint_path("o_untrained")))